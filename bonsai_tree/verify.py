@@ -1,5 +1,4 @@
-import os
-from typing import List
+from typing import List, Optional
 
 from git_autograder import (
     GitAutograderExercise,
@@ -7,6 +6,9 @@ from git_autograder import (
     GitAutograderStatus,
 )
 
+from exercise_utils.branch_containment import BranchContainment
+from exercise_utils.revision_files import RevisionFileReader
+
 MAIN_MISSING_DANGERS = "The main branch is missing the dangers-to-bonsais.txt file"
 MAIN_WRONG_TEXT = "The dangers-to-bonsais.txt file on the main branch does not have the right contents"
 MAIN_DANGERS_NOT_PARENT = (
@@ -66,12 +68,11 @@ def are_files_equal(given: str, expected: str) -> bool:
         return contents == expected_contents
 
 
-def is_file_content_equal(given: str, expected: str) -> bool:
-    with (
-        open(given, "r") as given_file,
-    ):
-        contents = given_file.read().replace("\n", "")
-        return contents == expected.strip().replace("\n", "")
+def is_file_content_equal(given: Optional[str], expected: str) -> bool:
+    if given is None:
+        return False
+    contents = given.replace("\n", "")
+    return contents == expected.strip().replace("\n", "")
 
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
@@ -79,8 +80,11 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     if origin_remote is not None:
         origin_remote.track_branches(["history", "care"])
 
+    # Files are read from each branch without checking it out
+    files = RevisionFileReader(exercise.repo.repo)
+    containment = BranchContainment.load(exercise.repo.repo)
+
     main_branch = exercise.repo.branches.branch("main")
-    main_branch.checkout()
     # Verify step 1
     added_danger_commits = []
     for commit in main_branch.user_commits:
@@ -90,21 +94,18 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     if not added_danger_commits:
         raise exercise.wrong_answer([MAIN_MISSING_DANGERS])
 
-    if not is_file_content_equal(
-        os.path.join(exercise.repo.repo.working_dir, DANGER_FILENAME), DANGER_FILE
-    ):
+    if not is_file_content_equal(files.read_text("main", DANGER_FILENAME), DANGER_FILE):
         raise exercise.wrong_answer([MAIN_WRONG_TEXT])
 
     history_branch = exercise.repo.branches.branch("history")
 
-    history_branch.checkout()
     # Verify step 2
     added_history_commits = []
     for commit in history_branch.user_commits:
         if (
             commit.file_change_type(HISTORY_FILENAME) == "A"
             and len(commit.parents) == 1
-            and "main" not in commit.branches
+            and not containment.contains("main", commit.hexsha)
         ):
             added_history_commits.append(commit)
 
@@ -112,21 +113,21 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
         raise exercise.wrong_answer([HISTORY_MISSING_HISTORY])
 
     if not is_file_content_equal(
-        os.path.join(exercise.repo.repo.working_dir, HISTORY_FILENAME),
+        files.read_text("history", HISTORY_FILENAME),
         HISTORY_FILE,
     ):
         raise exercise.wrong_answer([HISTORY_WRONG_TEXT])
 
     care_branch = exercise.repo.branches.branch("care")
 
-    care_branch.checkout()
     # Verify step 3
     edited_care_commits = []
     for commit in care_branch.user_commits:
         if (
             commit.file_change_type(CARE_FILENAME) == "M"
             and len(commit.parents) == 1
-            and (len({"main", "history"} & set(commit.branches)) == 0)
+            and not containment.contains("main", commit.hexsha)
+            and not containment.contains("history", commit.hexsha)
         ):
             edited_care_commits.append(commit)
 
@@ -134,7 +135,7 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
         raise exercise.wrong_answer([CARE_MISSING_CARE])
 
     if not is_file_content_equal(
-        os.path.join(exercise.repo.repo.working_dir, CARE_FILENAME),
+        files.read_text("care", CARE_FILENAME),
         CARE_FILE,
     ):
         raise exercise.wrong_answer([CARE_WRONG_TEXT])
@@ -4,6 +4,9 @@ from git_autograder import (
     GitAutograderStatus,
 )
 
+from exercise_utils.reflog_index import ReflogIndex
+from exercise_utils.status import RepoStatus
+
 UNCOMMITTED_CHANGES = "You still have uncommitted changes. Commit them first on the appropriate branch first!"
 NOT_ON_MAIN = (
     "You aren't currently on the main branch. Checkout to that branch and try again!"
@@ -21,48 +24,48 @@ RESET_MESSAGE = 'Reset the repository using "gitmastery progress reset" and star
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     main_branch = exercise.repo.branches.branch("main")
-    if exercise.repo.repo.is_dirty():
+    status = RepoStatus.load(exercise.repo.repo)
+    if status.is_dirty:
         raise exercise.wrong_answer([UNCOMMITTED_CHANGES])
 
-    try:
-        if exercise.repo.repo.active_branch.name != "main":
-            raise exercise.wrong_answer([NOT_ON_MAIN])
-    except TypeError:
+    if status.detached:
         raise exercise.wrong_answer([DETACHED_HEAD])
 
-    main_reflog = main_branch.reflog
-    merge_logs = [entry for entry in main_reflog if entry.action.startswith("merge")]
-    messages = [entry.message for entry in merge_logs][::-1]
-    merge_order = [entry.action[len("merge ") :] for entry in merge_logs][::-1]
+    if status.branch != "main":
+        raise exercise.wrong_answer([NOT_ON_MAIN])
+
+    merges = ReflogIndex.load(exercise.repo.repo, refs=[main_branch.name]).merges(
+        "main"
+    )
 
-    if len(merge_order) == 0:
+    if len(merges) == 0:
         raise exercise.wrong_answer([NO_MERGES])
 
-    if len(merge_order) < 3:
+    if len(merges) < 3:
         raise exercise.wrong_answer([MISSING_MERGES])
 
     # Use negative indexing to check the last 3 merges (most recent)
     # This allows users to undo mistakes (e.g., reset --hard after accidental ff) and redo properly
-    if merge_order[-3] != "feature/login":
+    if merges[-3].branch != "feature/login":
         raise exercise.wrong_answer([FEATURE_LOGIN_MERGE_MISSING, RESET_MESSAGE])
 
-    if messages[-3] == "Fast-forward":
+    if merges[-3].fast_forward:
         raise exercise.wrong_answer(
             [NO_FAST_FORWARDING.format(branch_name="feature/login"), RESET_MESSAGE]
         )
 
-    if merge_order[-2] != "feature/dashboard":
+    if merges[-2].branch != "feature/dashboard":
         raise exercise.wrong_answer([FEATURE_DASHBOARD_MERGE_MISSING, RESET_MESSAGE])
 
-    if messages[-2] == "Fast-forward":
+    if merges[-2].fast_forward:
         raise exercise.wrong_answer(
             [NO_FAST_FORWARDING.format(branch_name="feature/dashboard"), RESET_MESSAGE]
         )
 
-    if merge_order[-1] != "feature/payments":
+    if merges[-1].branch != "feature/payments":
         raise exercise.wrong_answer([FEATURE_PAYMENTS_MERGE_MISSING, RESET_MESSAGE])
 
-    if messages[-1] == "Fast-forward":
+    if merges[-1].fast_forward:
         raise exercise.wrong_answer(
             [NO_FAST_FORWARDING.format(branch_name="feature/payments"), RESET_MESSAGE]
         )
@@ -1,3 +1,4 @@
+from exercise_utils.determinism import exercise_seed
 from exercise_utils.git import add, commit, checkout
 from exercise_utils.file import append_to_file, create_or_update_file
 
@@ -29,8 +30,9 @@ def get_modified_sequence(seq, digits=8, idx=None, seed=None):
 
 
 def setup(verbose: bool = False):
-    orig_data = get_sequence()
-    modified_data = get_modified_sequence(orig_data)
+    seed = exercise_seed()
+    orig_data = get_sequence(seed=seed)
+    modified_data = get_modified_sequence(orig_data, seed=seed)
 
     create_or_update_file("data.txt", "")
     add(["data.txt"], verbose)
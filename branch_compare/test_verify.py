@@ -55,6 +55,19 @@ def test_base():
         assert_output(output, GitAutograderStatus.SUCCESSFUL)
 
 
+def test_working_tree_untouched():
+    with base_setup(
+        mock_answers={
+            QUESTION_ONE: "12345",
+            QUESTION_TWO: "98765",
+        },
+    ) as (test, rs):
+        rs.git.checkout("stream-2")
+        output = test.run()
+        assert_output(output, GitAutograderStatus.SUCCESSFUL)
+        assert rs.repo.active_branch.name == "stream-2"
+
+
 def test_wrong_stream1_diff():
     with base_setup(
         mock_answers={
@@ -7,6 +7,8 @@ from git_autograder import (
 
 from git_autograder.answers.rules import HasExactValueRule, NotEmptyRule
 
+from exercise_utils.revision_files import RevisionFileReader
+
 
 QUESTION_ONE = "Which numbers are present in stream-1 but not in stream-2?"
 QUESTION_TWO = "Which numbers are present in stream-2 but not in stream-1?"
@@ -28,18 +30,9 @@ def has_made_changes(branch: GitAutograderBranch, expected_commits: int) -> bool
 
 def get_branch_diff(exercise: GitAutograderExercise, branch1: str, branch2: str) -> str:
     """Get a value present in branch1 but not in branch2."""
-    exercise.repo.branches.branch(branch1).checkout()
-    with exercise.repo.files.file(FILE_PATH) as f1:
-        contents1 = f1.read()
-
-    exercise.repo.branches.branch(branch2).checkout()
-    with exercise.repo.files.file(FILE_PATH) as f2:
-        contents2 = f2.read()
-
-    exercise.repo.branches.branch("main").checkout()
-
-    set1 = {line.strip() for line in contents1.splitlines() if line.strip()}
-    set2 = {line.strip() for line in contents2.splitlines() if line.strip()}
+    files = RevisionFileReader(exercise.repo.repo)
+    set1 = set(files.read_lines(branch1, FILE_PATH) or [])
+    set2 = set(files.read_lines(branch2, FILE_PATH) or [])
     diff = set1 - set2
     return str(diff.pop())
 
@@ -4,6 +4,8 @@ from git_autograder import (
     GitAutograderStatus,
 )
 
+from exercise_utils.reflog_index import ReflogIndex
+
 OPTIMIZATION_APPROACH_1_EXISTS = (
     "Branch 'optimization-approach-1' still exists! Remember to delete it"
 )
@@ -23,12 +25,12 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     if exercise.repo.branches.has_branch("optimization-approach-2"):
         raise exercise.wrong_answer([OPTIMIZATION_APPROACH_2_EXISTS])
 
-    main_reflog = exercise.repo.branches.branch("main").reflog
-    merge_logs = [entry for entry in main_reflog if entry.action.startswith("merge")]
-    merge_order = [entry.action[len("merge ") :] for entry in merge_logs][::-1]
-    for merge in merge_order:
-        if merge == "optimization-approach-2":
-            raise exercise.wrong_answer([OPTIMIZATION_APPROACH_2_MERGED])
+    main_branch = exercise.repo.branches.branch("main")
+    merges = ReflogIndex.load(exercise.repo.repo, refs=[main_branch.name]).merges(
+        "main"
+    )
+    if any(merge.branch == "optimization-approach-2" for merge in merges):
+        raise exercise.wrong_answer([OPTIMIZATION_APPROACH_2_MERGED])
 
     return exercise.to_output(
         ["Great job using git branch to delete both merged and unmerged branches!"],
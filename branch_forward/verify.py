@@ -1,11 +1,11 @@
-from typing import List, Optional
 from git_autograder import (
-    GitAutograderCommit,
     GitAutograderExercise,
     GitAutograderOutput,
     GitAutograderStatus,
 )
 
+from exercise_utils.commit_index import CommitIndex
+
 FAST_FORWARD_REQUIRED = (
     "You must use a fast-forward merge to bring a branch into 'main'."
 )
@@ -21,21 +21,14 @@ EXPECTED_MAIN_COMMIT_MESSAGES = {
 }
 
 
-def get_commit_from_message(
-    commits: List[GitAutograderCommit], message: str
-) -> Optional[GitAutograderCommit]:
-    """Find a commit with the given message from a list of commits."""
-    for commit in commits:
-        if message.strip() == commit.commit.message.strip():
-            return commit
-    return None
-
-
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
-    main_commits = exercise.repo.branches.branch("main").commits
-    head_commit = exercise.repo.branches.branch("main").latest_commit
+    # Fails with the usual message if main is missing
+    exercise.repo.branches.branch("main")
+    commits = CommitIndex.load(exercise.repo.repo)
+    main_commits = commits.history("main")
+    head_commit = main_commits[0]
 
-    sally_commit = get_commit_from_message(main_commits, "Mention Sally")
+    sally_commit = commits.by_message("Mention Sally", reachable_from="main")
     if sally_commit is None:
         raise exercise.wrong_answer([ONLY_WITH_SALLY_MERGED])
 
@@ -44,7 +37,7 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     if len(head_commit.parents) != 1:
         raise exercise.wrong_answer([FAST_FORWARD_REQUIRED])
 
-    if head_commit.commit.message.strip() != "Mention Sally":
+    if head_commit.message.strip() != "Mention Sally":
         raise exercise.wrong_answer([ONLY_WITH_SALLY_MERGED])
 
     if any(len(commit.parents) > 1 for commit in main_commits):
@@ -53,7 +46,7 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     if len(main_commits) != len(EXPECTED_MAIN_COMMIT_MESSAGES):
         raise exercise.wrong_answer([ONLY_WITH_SALLY_MERGED])
 
-    commit_messages = {commit.commit.message.strip() for commit in main_commits}
+    commit_messages = {commit.message.strip() for commit in main_commits}
     if not commit_messages.issubset(EXPECTED_MAIN_COMMIT_MESSAGES):
         raise exercise.wrong_answer([ONLY_WITH_SALLY_MERGED])
 
@@ -1,12 +1,12 @@
-from typing import List, Optional
-
 from git_autograder import (
-    GitAutograderCommit,
     GitAutograderExercise,
     GitAutograderOutput,
     GitAutograderStatus,
 )
 
+from exercise_utils.commit_index import CommitIndex, IndexedCommit
+from exercise_utils.revision_files import RevisionFileReader
+
 MISSING_LOCATION_COMMIT = "The commit with message 'Describe location' is not found."
 MISSING_STORY_FILE = "The file 'story.txt' is not found."
 MISSING_BRANCH = "The '{branch_name}' branch is missing."
@@ -25,67 +25,63 @@ SUCCESS_MESSAGE = (
 )
 
 
-def get_commit_from_message(
-    commits: List[GitAutograderCommit], message: str
-) -> Optional[GitAutograderCommit]:
-    """Find a commit with the given message from a list of commits."""
-    for commit in commits:
-        if message.strip() == commit.commit.message.strip():
-            return commit
-    return None
-
-
 def verify_branch(
     branch_name: str,
-    expected_start_commit: GitAutograderCommit,
+    expected_start_commit: IndexedCommit,
     expected_content: str,
     exercise: GitAutograderExercise,
+    commits: CommitIndex,
+    files: RevisionFileReader,
 ) -> None:
     """
     Check that the given branch exists, starts from the expected commit,
     and contains the expected content in story.txt.
     """
-    branch_helper = exercise.repo.branches
-    if not branch_helper.has_branch(branch_name):
+    latest_sha = commits.resolve(f"refs/heads/{branch_name}")
+    latest_commit = commits.get(latest_sha) if latest_sha is not None else None
+    if latest_commit is None:
         raise exercise.wrong_answer([MISSING_BRANCH.format(branch_name=branch_name)])
 
-    branch = branch_helper.branch(branch_name)
-    latest_commit = branch.latest_commit
-
     if latest_commit.hexsha == expected_start_commit.hexsha:
         raise exercise.wrong_answer([MISSING_COMMIT.format(branch_name=branch_name)])
 
-    if expected_start_commit.hexsha not in [
-        parent.hexsha for parent in latest_commit.commit.parents
-    ]:
+    if expected_start_commit.hexsha not in latest_commit.parents:
         raise exercise.wrong_answer([WRONG_START.format(branch_name=branch_name)])
 
-    with latest_commit.file("story.txt") as content:
-        if content is None:
-            raise exercise.wrong_answer([MISSING_STORY_FILE])
+    content = files.read_text(latest_commit.hexsha, "story.txt")
+    if content is None:
+        raise exercise.wrong_answer([MISSING_STORY_FILE])
 
-        if expected_content not in content:
-            raise exercise.wrong_answer(
-                [
-                    WRONG_CONTENT.format(
-                        branch_name=branch_name, expected_content=expected_content
-                    )
-                ]
-            )
+    if expected_content not in content:
+        raise exercise.wrong_answer(
+            [
+                WRONG_CONTENT.format(
+                    branch_name=branch_name, expected_content=expected_content
+                )
+            ]
+        )
 
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
-    commits = exercise.repo.branches.branch("main").commits
-    describe_location_commit = get_commit_from_message(commits, "Describe location")
+    # Fails with the usual message if main is missing
+    exercise.repo.branches.branch("main")
+    commits = CommitIndex.load(exercise.repo.repo)
+    describe_location_commit = commits.by_message(
+        "Describe location", reachable_from="main"
+    )
 
     if describe_location_commit is None:
         raise exercise.wrong_answer([MISSING_LOCATION_COMMIT])
 
+    files = RevisionFileReader(exercise.repo.repo)
+
     verify_branch(
         branch_name="visitor-line",
         expected_start_commit=describe_location_commit,
         expected_content="I heard someone knocking at the door.",
         exercise=exercise,
+        commits=commits,
+        files=files,
     )
 
     verify_branch(
@@ -93,6 +89,8 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
         expected_start_commit=describe_location_commit,
         expected_content="I fell asleep on the couch.",
         exercise=exercise,
+        commits=commits,
+        files=files,
     )
 
     return exercise.to_output(
@@ -4,6 +4,8 @@ from git_autograder import (
     GitAutograderStatus,
 )
 
+from exercise_utils.status import RepoStatus
+
 UNCOMMITTED_CHANGES = "You still have uncommitted changes. Commit them first on the appropriate branch first!"
 NOT_ON_MAIN = (
     "You aren't currently on the main branch. Checkout to that branch and try again!"
@@ -14,15 +16,16 @@ RESET_MESSAGE = 'Reset the repository using "gitmastery progress reset" and star
 
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
-    if exercise.repo.repo.is_dirty():
+    status = RepoStatus.load(exercise.repo.repo)
+    if status.is_dirty:
         raise exercise.wrong_answer([UNCOMMITTED_CHANGES])
 
-    try:
-        if exercise.repo.repo.active_branch.name != "main":
-            raise exercise.wrong_answer([NOT_ON_MAIN])
-    except TypeError:
+    if status.detached:
         raise exercise.wrong_answer([DETACHED_HEAD])
 
+    if status.branch != "main":
+        raise exercise.wrong_answer([NOT_ON_MAIN])
+
     with exercise.repo.files.file("script.py") as script_file:
         contents = script_file.read().strip()
         if (
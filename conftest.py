@@ -0,0 +1,13 @@
+from exercise_utils.test import TRACK_SETUPS_ENV, duplicate_setups
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    duplicates = duplicate_setups()
+    if not duplicates:
+        return
+
+    terminalreporter.section(f"Identical setups ({TRACK_SETUPS_ENV})")
+    for tests in duplicates:
+        terminalreporter.write_line(f"{len(tests)} tests share a setup:")
+        for test in tests:
+            terminalreporter.write_line(f"    {test}")
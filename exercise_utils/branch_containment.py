@@ -0,0 +1,71 @@
+"""Which branches contain each commit, computed in one pass.
+
+Asking git which branches contain a commit costs one process and a walk of
+the history per commit. BranchContainment instead gives every local and
+remote-tracking branch a bit and pushes the bits of each branch tip down to
+its ancestors, visiting commits from the highest generation to the lowest so
+that every child is done before its parents:
+
+    containment = BranchContainment.load(exercise.repo.repo)
+    containment.contains("main", commit.hexsha)
+    containment.branches_containing(commit.hexsha)  # frozenset({"main", "origin/main"})
+
+Local branches are named as in git branch, and remote-tracking branches as
+<remote>/<branch>.
+"""
+
+from typing import Dict, FrozenSet, List
+
+from git import Repo
+
+from exercise_utils.commit_graph import CommitGraph
+
+_LOCAL_PREFIX = "refs/heads/"
+_REMOTE_PREFIX = "refs/remotes/"
+
+
+class BranchContainment:
+    def __init__(self, graph: CommitGraph) -> None:
+        self.branches: List[str] = []
+        tips: Dict[str, int] = {}
+        for ref, sha in sorted(graph.index.refs.items()):
+            if ref.startswith(_LOCAL_PREFIX):
+                name = ref.removeprefix(_LOCAL_PREFIX)
+            elif ref.startswith(_REMOTE_PREFIX) and not ref.endswith("/HEAD"):
+                name = ref.removeprefix(_REMOTE_PREFIX)
+            else:
+                continue
+            tips[sha] = tips.get(sha, 0) | (1 << len(self.branches))
+            self.branches.append(name)
+        self.__bits = {name: 1 << i for i, name in enumerate(self.branches)}
+
+        self.__masks: Dict[str, int] = dict(tips)
+        commits = sorted(
+            (commit.hexsha for commit in graph.index.commits),
+            key=graph.generation,
+            reverse=True,
+        )
+        for sha in commits:
+            mask = self.__masks.get(sha, 0)
+            if not mask:
+                continue
+            for parent in graph.parents(sha):
+                self.__masks[parent] = self.__masks.get(parent, 0) | mask
+        self.__names: Dict[int, FrozenSet[str]] = {}
+
+    @classmethod
+    def load(cls, repo: Repo) -> "BranchContainment":
+        return cls(CommitGraph.load(repo))
+
+    def contains(self, branch: str, hexsha: str) -> bool:
+        """Returns whether the commit is reachable from the branch."""
+        bit = self.__bits.get(branch, 0)
+        return bool(self.__masks.get(hexsha, 0) & bit)
+
+    def branches_containing(self, hexsha: str) -> FrozenSet[str]:
+        mask = self.__masks.get(hexsha, 0)
+        if mask not in self.__names:
+            self.__names[mask] = frozenset(
+                name for name, bit in self.__bits.items() if mask & bit
+            )
+        return self.__names[mask]
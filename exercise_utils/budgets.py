@@ -0,0 +1,124 @@
+"""Performance budgets declared in .gitmastery-exercise.json.
+
+An exercise can declare any of the following under "budgets":
+
+    "budgets": {
+      "max_download_seconds": 10,
+      "max_verify_seconds": 2,
+      "max_subprocesses": 40,
+      "max_peak_memory_mb": 64
+    }
+
+Subprocess and memory limits apply to the download and the verify separately.
+Peak memory is the Python heap as traced by tracemalloc, so memory used by git
+itself is not counted.
+"""
+
+import json
+import subprocess
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Literal, Optional
+
+from exercise_utils.exercise_config import EXERCISE_CONFIG_FILE_NAME
+
+BUDGETS_KEY = "budgets"
+
+
+@dataclass
+class ExerciseBudgets:
+    max_download_seconds: Optional[float] = None
+    max_verify_seconds: Optional[float] = None
+    max_subprocesses: Optional[int] = None
+    max_peak_memory_mb: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ExerciseBudgets":
+        budgets = config.get(BUDGETS_KEY) or {}
+        return cls(**{f.name: budgets.get(f.name) for f in fields(cls)})
+
+    def is_empty(self) -> bool:
+        return all(getattr(self, f.name) is None for f in fields(self))
+
+
+@dataclass
+class BudgetUsage:
+    seconds: float = 0.0
+    subprocesses: int = 0
+    peak_memory_bytes: int = 0
+
+
+def load_budgets(exercise_dir: str | Path) -> ExerciseBudgets:
+    """Reads the budgets of the exercise in the given folder, if any."""
+    config_path = Path(exercise_dir) / EXERCISE_CONFIG_FILE_NAME
+    if not config_path.is_file():
+        return ExerciseBudgets()
+    with open(config_path, "r") as config_file:
+        return ExerciseBudgets.from_config(json.load(config_file))
+
+
+@contextmanager
+def measure_usage() -> Iterator[BudgetUsage]:
+    """Measures the wall time, subprocesses spawned and peak memory of a block."""
+    usage = BudgetUsage()
+    execute_child = subprocess.Popen._execute_child  # type: ignore[attr-defined]
+
+    def counting_execute_child(popen: subprocess.Popen, *args, **kwargs) -> None:
+        usage.subprocesses += 1
+        execute_child(popen, *args, **kwargs)
+
+    was_tracing = tracemalloc.is_tracing()
+    if was_tracing:
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.start()
+    started_at = time.perf_counter()
+    # Patched by hand, as importing unittest.mock would slow every download down
+    subprocess.Popen._execute_child = counting_execute_child  # type: ignore[attr-defined]
+    try:
+        yield usage
+    finally:
+        subprocess.Popen._execute_child = execute_child  # type: ignore[attr-defined]
+        usage.seconds = time.perf_counter() - started_at
+        usage.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+        if not was_tracing:
+            tracemalloc.stop()
+
+
+def budget_violations(
+    budgets: ExerciseBudgets,
+    usage: BudgetUsage,
+    phase: Literal["download", "verify"],
+) -> List[str]:
+    """Returns a description of every budget the usage exceeded."""
+    violations: List[str] = []
+    max_seconds = (
+        budgets.max_download_seconds
+        if phase == "download"
+        else budgets.max_verify_seconds
+    )
+    if max_seconds is not None and usage.seconds > max_seconds:
+        violations.append(
+            f"{phase} took {usage.seconds:.2f}s, over the budget of {max_seconds}s"
+        )
+    if (
+        budgets.max_subprocesses is not None
+        and usage.subprocesses > budgets.max_subprocesses
+    ):
+        violations.append(
+            f"{phase} spawned {usage.subprocesses} subprocesses, "
+            f"over the budget of {budgets.max_subprocesses}"
+        )
+    peak_memory_mb = usage.peak_memory_bytes / (1024 * 1024)
+    if (
+        budgets.max_peak_memory_mb is not None
+        and peak_memory_mb > budgets.max_peak_memory_mb
+    ):
+        violations.append(
+            f"{phase} peaked at {peak_memory_mb:.1f}MB, "
+            f"over the budget of {budgets.max_peak_memory_mb}MB"
+        )
+    return violations
@@ -0,0 +1,141 @@
+"""Runs every check of a verifier and reports all failures at once.
+
+A verifier that raises on its first failing check makes students verify once
+per mistake. With a CheckRunner, the verifier instead registers named checks,
+each listing the checks it depends on, and gets the comments of every failing
+check in one pass:
+
+    checks = CheckRunner(exercise)
+
+    @checks.check("remote_branches", io_bound=True)
+    def remote_branches(results):
+        fetch_remotes(repo)
+        return get_remotes(repo)
+
+    @checks.check("old_remote_removed", requires=["remote_branches"])
+    def old_remote_removed(results):
+        if "old" in results["remote_branches"]:
+            raise exercise.wrong_answer([OLD_REMOTE_PRESENT])
+
+    checks.run()
+
+Checks fail by raising the exercise's wrong answer exception, and whatever a
+check returns is shared with the checks that depend on it through results. A
+check is skipped when one of its dependencies fails, as its own comment would
+only repeat the problem. Checks whose dependencies are met run in rounds, with
+the io_bound ones of a round, such as fetches and GitHub calls, run in
+parallel threads while the others run on the calling thread.
+
+Any other exception, such as an invalid state, is raised once the round it
+happened in has finished, since nothing else can be graded.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from git_autograder import (
+    GitAutograderExercise,
+    GitAutograderWrongAnswerException,
+)
+
+CheckFunction = Callable[[Dict[str, Any]], Any]
+
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class Check:
+    name: str
+    function: CheckFunction
+    requires: Sequence[str] = ()
+    io_bound: bool = False
+
+
+class CheckRunner:
+    def __init__(
+        self, exercise: GitAutograderExercise, max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> None:
+        self.exercise = exercise
+        self.max_workers = max_workers
+        self.checks: Dict[str, Check] = {}
+        self.results: Dict[str, Any] = {}
+        self.failures: Dict[str, List[str]] = {}
+
+    def check(
+        self, name: str, requires: Sequence[str] = (), io_bound: bool = False
+    ) -> Callable[[CheckFunction], CheckFunction]:
+        """Registers the decorated function as a check."""
+
+        def register(function: CheckFunction) -> CheckFunction:
+            self.add(Check(name, function, tuple(requires), io_bound))
+            return function
+
+        return register
+
+    def add(self, check: Check) -> None:
+        if check.name in self.checks:
+            raise ValueError(f"Check {check.name} is already registered")
+        for dependency in check.requires:
+            if dependency not in self.checks:
+                raise ValueError(
+                    f"Check {check.name} depends on unknown check {dependency}"
+                )
+        self.checks[check.name] = check
+
+    def run(self) -> Dict[str, Any]:
+        """Runs every check and returns their results.
+
+        Raises a wrong answer with the comments of every failing check, in the
+        order the checks were registered.
+        """
+        pending = list(self.checks.values())
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending:
+                ready = [
+                    check
+                    for check in pending
+                    if all(dependency in self.results for dependency in check.requires)
+                ]
+                if not ready:
+                    # Everything left depends on a check that failed
+                    break
+                self.__run_round(executor, ready)
+                pending = [check for check in pending if check not in ready]
+
+        if self.failures:
+            raise self.exercise.wrong_answer(
+                [
+                    comment
+                    for name in self.checks
+                    for comment in self.failures.get(name, [])
+                ]
+            )
+        return self.results
+
+    def __run_round(self, executor: ThreadPoolExecutor, ready: List[Check]) -> None:
+        futures: Dict[str, Future] = {
+            check.name: executor.submit(check.function, self.results)
+            for check in ready
+            if check.io_bound
+        }
+        error: Optional[BaseException] = None
+        # Checks on this thread run while the io_bound ones are in flight
+        for check in sorted(ready, key=lambda check: check.io_bound):
+            try:
+                if check.io_bound:
+                    result = futures[check.name].result()
+                else:
+                    result = check.function(self.results)
+            except GitAutograderWrongAnswerException as e:
+                self.failures[check.name] = (
+                    [e.message] if isinstance(e.message, str) else list(e.message)
+                )
+                continue
+            except BaseException as e:
+                # Let the rest of the round finish before giving up
+                error = error or e
+                continue
+            self.results[check.name] = result
+        if error is not None:
+            raise error
@@ -64,7 +64,9 @@ def run(
     return CommandResult(result=result)
 
 
-def run_command(command: List[str], verbose: bool) -> Optional[str]:
+def run_command(
+    command: List[str], verbose: bool, env: Dict[str, str] = {}
+) -> Optional[str]:
     """Runs the given command, logging the output if verbose is turned on.
 
     Exits if the command fails.
@@ -75,6 +77,7 @@ def run_command(command: List[str], verbose: bool) -> Optional[str]:
             capture_output=True,
             text=True,
             check=True,
+            env=dict(os.environ, **env),
         )
         if verbose:
             print(result.stdout)
@@ -0,0 +1,134 @@
+"""In-process commit graph for ancestry queries.
+
+The graph is built from the parent lists of a CommitIndex, so it costs no more
+than the index's single git log pass and can share an index that a verifier
+already loaded. Every query after that runs in-process:
+
+    graph = CommitGraph.load(exercise.repo.repo)
+    if graph.is_ancestor("alice-upstream/main", "main"):
+        ...
+
+Each commit is given a generation number, one more than the highest generation
+of its parents, as in git's commit-graph file. A commit can only be an ancestor
+of commits with a higher generation, which lets ancestry walks stop early.
+Results are memoised, so verifiers can ask many questions of the same graph.
+"""
+
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from git import Repo
+
+from exercise_utils.commit_index import CommitIndex, IndexedCommit
+
+
+class CommitGraph:
+    def __init__(self, index: CommitIndex) -> None:
+        self.index = index
+        self.__generations: Dict[str, int] = {}
+        self.__ancestors: Dict[str, FrozenSet[str]] = {}
+        self.__is_ancestor: Dict[Tuple[str, str], bool] = {}
+
+    @classmethod
+    def load(cls, repo: Repo) -> "CommitGraph":
+        return cls(CommitIndex.load(repo))
+
+    def resolve(self, revision: str) -> Optional[str]:
+        """Returns the SHA of a ref, short ref name or SHA in the graph."""
+        return self.index.resolve(revision)
+
+    def parents(self, sha: str) -> Tuple[str, ...]:
+        commit = self.index.get(sha)
+        return commit.parents if commit is not None else ()
+
+    def generation(self, revision: str) -> int:
+        """Returns the generation number of a commit, 1 for root commits.
+
+        Commits missing from the graph, such as those cut off by a shallow
+        clone, have generation 0.
+        """
+        sha = self.resolve(revision)
+        if sha is None:
+            return 0
+        pending = [sha]
+        while pending:
+            current = pending[-1]
+            if current in self.__generations:
+                pending.pop()
+                continue
+            if self.index.get(current) is None:
+                self.__generations[current] = 0
+                pending.pop()
+                continue
+            missing = [p for p in self.parents(current) if p not in self.__generations]
+            if missing:
+                pending.extend(missing)
+                continue
+            self.__generations[current] = 1 + max(
+                (self.__generations[p] for p in self.parents(current)), default=0
+            )
+            pending.pop()
+        return self.__generations[sha]
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """Returns whether ancestor is reachable from descendant, or is descendant."""
+        ancestor_sha = self.resolve(ancestor)
+        descendant_sha = self.resolve(descendant)
+        if ancestor_sha is None or descendant_sha is None:
+            return False
+        key = (ancestor_sha, descendant_sha)
+        if key not in self.__is_ancestor:
+            self.__is_ancestor[key] = self.__walk_to(ancestor_sha, descendant_sha)
+        return self.__is_ancestor[key]
+
+    def ancestors(self, revision: str) -> FrozenSet[str]:
+        """Returns the SHAs of a commit and every commit reachable from it."""
+        sha = self.resolve(revision)
+        if sha is None:
+            return frozenset()
+        if sha not in self.__ancestors:
+            self.__ancestors[sha] = frozenset(self.index.reachable(sha))
+        return self.__ancestors[sha]
+
+    def merge_base(self, first: str, second: str) -> Optional[str]:
+        """Returns a best common ancestor of two commits, like git merge-base."""
+        common = self.ancestors(first) & self.ancestors(second)
+        if not common:
+            return None
+        # A common ancestor with the highest generation cannot be an ancestor of
+        # another common ancestor, so it is always one of the best
+        return max(
+            common,
+            key=lambda sha: (self.generation(sha), -self.__position(sha)),
+        )
+
+    def only_in(self, included: str, excluded: str) -> List[IndexedCommit]:
+        """Returns the commits reachable from included but not from excluded.
+
+        This is the equivalent of git log excluded..included, in the same order.
+        """
+        shas = self.ancestors(included) - self.ancestors(excluded)
+        commits = [self.index.get(sha) for sha in shas]
+        return sorted(
+            (commit for commit in commits if commit is not None),
+            key=lambda commit: commit.position,
+        )
+
+    def __walk_to(self, ancestor: str, descendant: str) -> bool:
+        if descendant in self.__ancestors:
+            return ancestor in self.__ancestors[descendant]
+        floor = self.generation(ancestor)
+        seen = set()
+        pending = [descendant]
+        while pending:
+            sha = pending.pop()
+            if sha == ancestor:
+                return True
+            if sha in seen or self.generation(sha) <= floor:
+                continue
+            seen.add(sha)
+            pending.extend(self.parents(sha))
+        return False
+
+    def __position(self, sha: str) -> int:
+        commit = self.index.get(sha)
+        return commit.position if commit is not None else len(self.index.commits)
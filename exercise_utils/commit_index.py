@@ -0,0 +1,198 @@
+"""Index of every commit in a repository, built from a single git log pass.
+
+Verifiers that look commits up by SHA or by message should load the index once
+and share it between lookups instead of scanning commit lists each time:
+
+    commits = CommitIndex.load(exercise.repo.repo)
+    march_commit = commits.by_message("Update roster for March", reachable_from="main")
+
+Commits are kept in git log order, newest first, so when several commits share
+a message the one a scan of git log would find first is returned.
+"""
+
+import bisect
+import heapq
+import re
+import subprocess
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from git import Repo
+
+_WHITESPACE_REGEX = re.compile(r"\s+")
+_REF_PREFIXES = ["", "refs/", "refs/tags/", "refs/heads/", "refs/remotes/"]
+
+
+@dataclass(frozen=True)
+class IndexedCommit:
+    hexsha: str
+    parents: Tuple[str, ...]
+    message: str
+    position: int
+
+
+def normalise_message(message: str) -> str:
+    """Collapses whitespace and ignores case, for lenient message matching."""
+    return _WHITESPACE_REGEX.sub(" ", message).strip().casefold()
+
+
+class CommitIndex:
+    def __init__(self, commits: List[IndexedCommit], refs: Dict[str, str]) -> None:
+        self.commits = commits
+        self.refs = refs
+        self.__by_sha = {commit.hexsha: commit for commit in commits}
+        self.__sorted_shas = sorted(self.__by_sha)
+        self.__by_message: Dict[str, List[IndexedCommit]] = {}
+        self.__by_normalised_message: Dict[str, List[IndexedCommit]] = {}
+        for commit in commits:
+            self.__by_message.setdefault(commit.message.strip(), []).append(commit)
+            self.__by_normalised_message.setdefault(
+                normalise_message(commit.message), []
+            ).append(commit)
+        self.__reachable: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def load(cls, repo: Repo) -> "CommitIndex":
+        """Indexes every commit reachable from any ref or HEAD."""
+        log = subprocess.run(
+            [
+                "git",
+                "log",
+                "--all",
+                "--decorate=full",
+                "-z",
+                "--format=%H%x1f%P%x1f%D%x1f%B",
+            ],
+            cwd=repo.working_dir,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        # An empty repository has no commits to log
+        if log.returncode != 0:
+            return cls([], {})
+
+        commits: List[IndexedCommit] = []
+        refs: Dict[str, str] = {}
+        for record in log.stdout.split("\0"):
+            if not record:
+                continue
+            sha, parents, decorations, message = record.lstrip("\n").split("\x1f", 3)
+            commits.append(
+                IndexedCommit(
+                    hexsha=sha,
+                    parents=tuple(parents.split()),
+                    message=message,
+                    position=len(commits),
+                )
+            )
+            for decoration in decorations.split(", "):
+                if not decoration:
+                    continue
+                if decoration.startswith("HEAD -> "):
+                    refs["HEAD"] = sha
+                    decoration = decoration.removeprefix("HEAD -> ")
+                refs[decoration.removeprefix("tag: ")] = sha
+        return cls(commits, refs)
+
+    def get(self, hexsha: str) -> Optional[IndexedCommit]:
+        """Returns the commit with the given full SHA."""
+        return self.__by_sha.get(hexsha.strip().lower())
+
+    def by_prefix(self, prefix: str) -> Optional[IndexedCommit]:
+        """Returns the commit whose SHA starts with prefix, if exactly one does."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return None
+        start = bisect.bisect_left(self.__sorted_shas, prefix)
+        matches = self.__sorted_shas[start : start + 2]
+        matches = [sha for sha in matches if sha.startswith(prefix)]
+        return self.__by_sha[matches[0]] if len(matches) == 1 else None
+
+    def find(self, sha: str) -> Optional[IndexedCommit]:
+        """Returns the commit with the given full or abbreviated SHA."""
+        return self.get(sha) or self.by_prefix(sha)
+
+    def resolve(self, ref: str) -> Optional[str]:
+        """Returns the SHA a ref points to, accepting short names and SHAs."""
+        for prefix in _REF_PREFIXES:
+            if prefix + ref in self.refs:
+                return self.refs[prefix + ref]
+        commit = self.find(ref)
+        return commit.hexsha if commit is not None else None
+
+    def reachable(self, ref: str) -> Set[str]:
+        """Returns the SHAs of the commits reachable from ref."""
+        tip = self.resolve(ref)
+        if tip is None:
+            return set()
+        if tip not in self.__reachable:
+            seen: Set[str] = set()
+            pending = [tip]
+            while pending:
+                sha = pending.pop()
+                if sha in seen or sha not in self.__by_sha:
+                    continue
+                seen.add(sha)
+                pending.extend(self.__by_sha[sha].parents)
+            self.__reachable[tip] = seen
+        return self.__reachable[tip]
+
+    def history(self, ref: str) -> List[IndexedCommit]:
+        """Returns the commits reachable from ref, newest first, like git log ref.
+
+        Every commit comes before its parents, even when the log of all refs
+        listed an ancestor first, such as one with the same commit date.
+        """
+        reachable = self.reachable(ref)
+        children: Dict[str, int] = {}
+        for sha in reachable:
+            for parent in self.__by_sha[sha].parents:
+                if parent in reachable:
+                    children[parent] = children.get(parent, 0) + 1
+
+        ready = [
+            (self.__by_sha[sha].position, sha)
+            for sha in reachable
+            if sha not in children
+        ]
+        heapq.heapify(ready)
+        history: List[IndexedCommit] = []
+        while ready:
+            _, sha = heapq.heappop(ready)
+            commit = self.__by_sha[sha]
+            history.append(commit)
+            for parent in commit.parents:
+                if parent not in reachable:
+                    continue
+                children[parent] -= 1
+                if children[parent] == 0:
+                    heapq.heappush(ready, (self.__by_sha[parent].position, parent))
+        return history
+
+    def by_message(
+        self, message: str, reachable_from: Optional[str] = None
+    ) -> Optional[IndexedCommit]:
+        """Returns the newest commit whose message matches, ignoring outer whitespace.
+
+        With reachable_from, only commits reachable from that ref are considered.
+        """
+        return self.__first(self.__by_message.get(message.strip(), []), reachable_from)
+
+    def by_normalised_message(
+        self, message: str, reachable_from: Optional[str] = None
+    ) -> Optional[IndexedCommit]:
+        """Returns the newest commit whose message matches, ignoring case and spacing."""
+        return self.__first(
+            self.__by_normalised_message.get(normalise_message(message), []),
+            reachable_from,
+        )
+
+    def __first(
+        self, commits: List[IndexedCommit], reachable_from: Optional[str]
+    ) -> Optional[IndexedCommit]:
+        if reachable_from is None:
+            return commits[0] if commits else None
+        reachable = self.reachable(reachable_from)
+        return next((c for c in commits if c.hexsha in reachable), None)
@@ -0,0 +1,71 @@
+"""Deterministic downloads, so identical inputs give byte-identical repositories.
+
+A download is deterministic when it has a seed: GITMASTERY_SEED, which lets a
+student be given their own variant of an exercise, or else the "seed" of the
+exercise's .gitmastery-exercise.json. Setups take their randomness from
+seeded_random rather than the random module:
+
+    rng = seeded_random()
+    chosen_sha = rng.choice(commits)
+
+and the commits and tags created through exercise_utils.git are dated from a
+fixed point instead of the wall clock, each a minute after the latest commit.
+Without a seed, both behave as before, with fresh randomness and current dates.
+"""
+
+import json
+import os
+import random
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional
+
+from exercise_utils.exercise_config import EXERCISE_CONFIG_FILE_NAME
+
+SEED_ENV = "GITMASTERY_SEED"
+SEED_CONFIG_KEY = "seed"
+# 2024-01-01T00:00:00+00:00, the default date of repo specs
+PINNED_TIMESTAMP = 1704067200
+COMMIT_INTERVAL_SECONDS = 60
+
+
+def exercise_seed() -> Optional[int]:
+    """Returns the seed of the download, or None when it is not deterministic.
+
+    The exercise config is looked for in the current folder and its parents, as
+    setups run from inside the exercise repository.
+    """
+    if os.environ.get(SEED_ENV):
+        return int(os.environ[SEED_ENV])
+    for folder in [Path.cwd(), *Path.cwd().parents]:
+        config_path = folder / EXERCISE_CONFIG_FILE_NAME
+        if config_path.is_file():
+            with open(config_path, "r") as config_file:
+                seed = json.load(config_file).get(SEED_CONFIG_KEY)
+            return int(seed) if seed is not None else None
+    return None
+
+
+def seeded_random() -> random.Random:
+    """Returns a generator seeded with the download's seed, if it has one."""
+    return random.Random(exercise_seed())
+
+
+def commit_env() -> Dict[str, str]:
+    """Returns the environment that pins the dates of the next commit or tag.
+
+    Empty when the download is not deterministic.
+    """
+    if exercise_seed() is None:
+        return {}
+    latest = subprocess.run(
+        ["git", "log", "-1", "--all", "--format=%ct"], capture_output=True, text=True
+    )
+    last_timestamp = latest.stdout.strip() if latest.returncode == 0 else ""
+    timestamp = (
+        int(last_timestamp) + COMMIT_INTERVAL_SECONDS
+        if last_timestamp
+        else PINNED_TIMESTAMP
+    )
+    date = f"{timestamp} +0000"
+    return {"GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date}
@@ -0,0 +1,394 @@
+"""Local stand-in for GitHub pull request data.
+
+FakeGitHub holds pull requests for any number of repositories and serves them
+both to git_autograder, in place of the GraphQL query made by
+fetch_pull_request_data, and to the PR functions in exercise_utils.github_cli,
+in place of the gh commands they run. Tests populate it declaratively:
+
+    github = FakeGitHub.from_dict(
+        {
+            "username": "student",
+            "repos": {
+                "git-mastery/samplerepo": [
+                    {
+                        "number": 1,
+                        "title": "Add search",
+                        "head": "feature-search",
+                        "comments": [
+                            {"body": "Looks good", "role": "teammate-bob"},
+                        ],
+                        "reviews": [
+                            {"body": "Please fix", "state": "CHANGES_REQUESTED"},
+                        ],
+                    }
+                ]
+            },
+        }
+    )
+    with github.patch():
+        ...
+
+Authors default to the configured username. Giving a role formats the title,
+body or comment with a role marker, as RoleMarker does for scripted teammates.
+"""
+
+import json
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from subprocess import CompletedProcess
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+from unittest import mock
+
+from exercise_utils import github_cli
+from exercise_utils.cli import CommandResult
+from exercise_utils.roles import RoleMarker
+from git_autograder.exception import GitAutograderInvalidStateException
+
+DEFAULT_USERNAME = "student"
+_CLOCK_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class FakeComment:
+    body: str
+    author: str
+    created_at: str
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "author": {"login": self.author},
+            "body": self.body,
+            "createdAt": self.created_at,
+        }
+
+
+@dataclass
+class FakeReview:
+    body: str
+    state: str
+    author: str
+    submitted_at: str
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "author": {"login": self.author},
+            "body": self.body,
+            "state": self.state,
+            "submittedAt": self.submitted_at,
+            "createdAt": self.submitted_at,
+        }
+
+
+@dataclass
+class FakePullRequest:
+    number: int
+    title: str
+    body: str
+    author: str
+    base: str
+    head: str
+    created_at: str
+    state: str = "OPEN"
+    is_draft: bool = False
+    merged_at: Optional[str] = None
+    merged_by: Optional[str] = None
+    commits: List[str] = field(default_factory=list)
+    comments: List[FakeComment] = field(default_factory=list)
+    reviews: List[FakeReview] = field(default_factory=list)
+
+    def latest_reviews(self) -> List[FakeReview]:
+        """Returns the latest review of each author, as GitHub does."""
+        latest: Dict[str, FakeReview] = {}
+        for review in sorted(self.reviews, key=lambda r: r.submitted_at):
+            latest[review.author] = review
+        return list(latest.values())
+
+    def to_graphql(self) -> Dict[str, Any]:
+        """Returns the PR in the shape returned by fetch_pull_request_data."""
+        return {
+            "number": self.number,
+            "title": self.title,
+            "body": self.body,
+            "createdAt": self.created_at,
+            "state": self.state,
+            "author": {"login": self.author},
+            "baseRefName": self.base,
+            "headRefName": self.head,
+            "isDraft": self.is_draft,
+            "mergedAt": self.merged_at,
+            "mergedBy": {"login": self.merged_by} if self.merged_by else None,
+            "commits": {"nodes": [{"commit": {"oid": sha}} for sha in self.commits]},
+            "latestReviews": {
+                "nodes": [review.to_json() for review in self.latest_reviews()]
+            },
+            "comments": {"nodes": [comment.to_json() for comment in self.comments]},
+        }
+
+    def to_gh_json(self, fields: List[str]) -> Dict[str, Any]:
+        """Returns the given fields in the shape printed by gh pr --json."""
+        values = {
+            "number": self.number,
+            "title": self.title,
+            "body": self.body,
+            "state": self.state,
+            "author": {"login": self.author},
+            "headRefName": self.head,
+            "baseRefName": self.base,
+            "isDraft": self.is_draft,
+            "createdAt": self.created_at,
+            "mergedAt": self.merged_at,
+            "comments": [comment.to_json() for comment in self.comments],
+            "reviews": [review.to_json() for review in self.reviews],
+        }
+        return {name: values.get(name) for name in fields}
+
+
+class FakeGitHub:
+    def __init__(self, username: str = DEFAULT_USERNAME) -> None:
+        self.username = username
+        self.repos: Dict[str, Dict[int, FakePullRequest]] = {}
+        self.__ticks = 0
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "FakeGitHub":
+        github = cls(data.get("username", DEFAULT_USERNAME))
+        for repo_full_name, prs in (data.get("repos") or {}).items():
+            for pr in prs:
+                github.add_pr(repo_full_name, **pr)
+        return github
+
+    def add_pr(
+        self,
+        repo_full_name: str,
+        title: str = "",
+        body: str = "",
+        *,
+        number: Optional[int] = None,
+        author: Optional[str] = None,
+        role: Optional[str] = None,
+        base: str = "main",
+        head: str = "feature",
+        state: str = "OPEN",
+        is_draft: bool = False,
+        created_at: Optional[str] = None,
+        merged_at: Optional[str] = None,
+        merged_by: Optional[str] = None,
+        commits: Optional[List[str]] = None,
+        comments: Optional[List[Mapping[str, Any]]] = None,
+        reviews: Optional[List[Mapping[str, Any]]] = None,
+    ) -> FakePullRequest:
+        """Adds a pull request, numbering it after the existing ones if needed."""
+        prs = self.repos.setdefault(repo_full_name, {})
+        if number is None:
+            number = max(prs, default=0) + 1
+        pr = FakePullRequest(
+            number=number,
+            title=_with_role(title, role),
+            body=_with_role(body, role),
+            author=author or self.username,
+            base=base,
+            head=head,
+            created_at=created_at or self.__tick(),
+            state=state.upper(),
+            is_draft=is_draft,
+            merged_at=merged_at,
+            merged_by=merged_by,
+            commits=list(commits or []),
+        )
+        prs[number] = pr
+        for comment in comments or []:
+            self.add_comment(repo_full_name, number, **comment)
+        for review in reviews or []:
+            self.add_review(repo_full_name, number, **review)
+        return pr
+
+    def add_comment(
+        self,
+        repo_full_name: str,
+        number: int,
+        body: str,
+        author: Optional[str] = None,
+        role: Optional[str] = None,
+        created_at: Optional[str] = None,
+    ) -> FakeComment:
+        comment = FakeComment(
+            body=_with_role(body, role),
+            author=author or self.username,
+            created_at=created_at or self.__tick(),
+        )
+        self.pr(repo_full_name, number).comments.append(comment)
+        return comment
+
+    def add_review(
+        self,
+        repo_full_name: str,
+        number: int,
+        body: str,
+        state: str = "COMMENTED",
+        author: Optional[str] = None,
+        role: Optional[str] = None,
+        submitted_at: Optional[str] = None,
+    ) -> FakeReview:
+        review = FakeReview(
+            body=_with_role(body, role),
+            state=state.upper(),
+            author=author or self.username,
+            submitted_at=submitted_at or self.__tick(),
+        )
+        self.pr(repo_full_name, number).reviews.append(review)
+        return review
+
+    def pr(self, repo_full_name: str, number: int) -> FakePullRequest:
+        pr = self.repos.get(repo_full_name, {}).get(number)
+        if pr is None:
+            raise GitAutograderInvalidStateException(
+                f"Failed to load PR #{number} from {repo_full_name}"
+            )
+        return pr
+
+    def fetch_pull_request_data(
+        self, pr_number: int, pr_repo_full_name: str
+    ) -> Dict[str, Any]:
+        """Stands in for git_autograder.pr_gateway.fetch_pull_request_data."""
+        return self.pr(pr_repo_full_name, pr_number).to_graphql()
+
+    def run(
+        self,
+        command: List[str],
+        verbose: bool,
+        env: Dict[str, str] = {},
+        exit_on_error: bool = False,
+    ) -> CommandResult:
+        """Stands in for exercise_utils.cli.run for gh commands on PRs."""
+        if command[:4] == ["gh", "api", "user", "-q"]:
+            return _result(command, 0, self.username)
+        if command[:2] != ["gh", "pr"] or len(command) < 3:
+            return _result(command, 1, stderr=f"Unsupported command: {command}")
+
+        positional, flags = _parse_flags(command[3:])
+        repo_full_name = str(flags.get("repo", ""))
+        try:
+            return self.__run_pr_command(command, repo_full_name, positional, flags)
+        except GitAutograderInvalidStateException as e:
+            return _result(command, 1, stderr=str(e.message))
+
+    @contextmanager
+    def patch(self) -> Iterator["FakeGitHub"]:
+        """Serves PR data from this fake to git_autograder and github_cli."""
+        with (
+            mock.patch(
+                "git_autograder.pr.fetch_pull_request_data",
+                side_effect=self.fetch_pull_request_data,
+            ),
+            mock.patch.object(github_cli, "run", side_effect=self.run),
+        ):
+            yield self
+
+    def __run_pr_command(
+        self,
+        command: List[str],
+        repo_full_name: str,
+        positional: List[str],
+        flags: Dict[str, str | bool],
+    ) -> CommandResult:
+        subcommand = command[2]
+        fields = str(flags.get("json", "")).split(",") if "json" in flags else []
+
+        if subcommand == "create":
+            pr = self.add_pr(
+                repo_full_name,
+                str(flags.get("title", "")),
+                str(flags.get("body", "")),
+                base=str(flags.get("base", "main")),
+                head=str(flags.get("head", "")),
+                is_draft=bool(flags.get("draft", False)),
+            )
+            url = f"https://github.com/{repo_full_name}/pull/{pr.number}"
+            return _result(command, 0, url)
+
+        if subcommand == "list":
+            state = str(flags.get("state", "open")).upper()
+            author = flags.get("author")
+            search = str(flags.get("search", "")).lower()
+            limit = int(flags.get("limit", 30))
+            prs = sorted(
+                self.repos.get(repo_full_name, {}).values(),
+                key=lambda pr: pr.number,
+                reverse=True,
+            )
+            matching = [
+                pr.to_gh_json(fields)
+                for pr in prs
+                if (state == "ALL" or pr.state == state)
+                and (author is None or pr.author == author)
+                and (search in pr.title.lower() or search in pr.body.lower())
+            ]
+            return _result(command, 0, json.dumps(matching[:limit]))
+
+        pr = self.pr(repo_full_name, int(positional[0]))
+        if subcommand == "view":
+            return _result(command, 0, json.dumps(pr.to_gh_json(fields)))
+        if subcommand == "comment":
+            self.add_comment(repo_full_name, pr.number, str(flags.get("body", "")))
+        elif subcommand == "review":
+            state = "COMMENTED"
+            if flags.get("request-changes"):
+                state = "CHANGES_REQUESTED"
+            elif flags.get("approve"):
+                state = "APPROVED"
+            self.add_review(
+                repo_full_name, pr.number, str(flags.get("body", "")), state
+            )
+        elif subcommand == "merge":
+            if pr.state != "OPEN":
+                raise GitAutograderInvalidStateException(
+                    f"Pull request #{pr.number} is not open"
+                )
+            pr.state = "MERGED"
+            pr.merged_at = self.__tick()
+            pr.merged_by = self.username
+        elif subcommand == "close":
+            if "comment" in flags:
+                self.add_comment(repo_full_name, pr.number, str(flags["comment"]))
+            pr.state = "CLOSED"
+        else:
+            return _result(command, 1, stderr=f"Unsupported command: {command}")
+        return _result(command, 0)
+
+    def __tick(self) -> str:
+        # Items added without a timestamp are ordered by when they were added
+        self.__ticks += 1
+        when = _CLOCK_START + timedelta(minutes=self.__ticks)
+        return when.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _with_role(text: str, role: Optional[str]) -> str:
+    if role is None or RoleMarker.has_role_marker(text):
+        return text
+    return RoleMarker.format(role, text)
+
+
+def _parse_flags(args: List[str]) -> Tuple[List[str], Dict[str, str | bool]]:
+    positional: List[str] = []
+    flags: Dict[str, str | bool] = {}
+    remaining = iter(args)
+    for arg in remaining:
+        if not arg.startswith("--"):
+            positional.append(arg)
+        elif "=" in arg:
+            name, value = arg[2:].split("=", 1)
+            flags[name] = value
+        elif arg == "--repo":
+            flags["repo"] = next(remaining, "")
+        else:
+            flags[arg[2:]] = True
+    return positional, flags
+
+
+def _result(
+    command: List[str], returncode: int, stdout: str = "", stderr: str = ""
+) -> CommandResult:
+    return CommandResult(
+        result=CompletedProcess(command, returncode, stdout=stdout, stderr=stderr)
+    )
@@ -0,0 +1,186 @@
+"""Canonical fingerprints of the state of a repository.
+
+A fingerprint covers HEAD, every ref, the index and the content of the working
+tree (tracked and untracked files that are not ignored). It is computed with
+two git plumbing calls, plus one more for structural fingerprints, and hashes
+file contents in-process the same way git hashes blobs.
+
+Exact fingerprints identify commits by SHA, so they are only stable across
+machines when commit dates and identities are pinned, as they are for repo
+specs. Structural fingerprints replace SHAs with a hash of each commit's tree,
+parents and message, which lets identical setups built at different times be
+recognised as the same.
+"""
+
+import hashlib
+import json
+import os
+import re
+import stat
+import subprocess
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+START_TAG_PREFIX = "refs/tags/git-mastery-start-"
+
+_STAGED_ENTRY_REGEX = re.compile(r"^(\d{6}) ([0-9a-f]+) (\d)\t(.*)$", re.DOTALL)
+
+
+@dataclass(frozen=True)
+class RepoFingerprint:
+    head: str
+    refs: Tuple[Tuple[str, str], ...]
+    index: Tuple[Tuple[str, str], ...]
+    worktree: Tuple[Tuple[str, str], ...]
+    extra: Tuple[Tuple[str, str], ...] = ()
+
+    @property
+    def digest(self) -> str:
+        payload = json.dumps(asdict(self), sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def hash_blob(data: bytes) -> str:
+    """Returns the SHA git would give a blob with the given contents."""
+    header = f"blob {len(data)}\0".encode("utf-8")
+    return hashlib.sha1(header + data).hexdigest()
+
+
+def fingerprint_repo(
+    repo_path: str | Path = ".",
+    extra_files: Optional[List[str | Path]] = None,
+    structural: bool = False,
+) -> RepoFingerprint:
+    """Computes the fingerprint of the repository at repo_path.
+
+    extra_files are files outside of the repository, such as answers.txt, whose
+    contents should also be part of the fingerprint. Missing files are recorded
+    as absent.
+    """
+    repo_path = Path(repo_path)
+    refs = _git(
+        repo_path, ["for-each-ref", "--format=%(refname) %(objectname) %(*objectname)"]
+    )
+    ref_entries: List[Tuple[str, str]] = []
+    peeled: Dict[str, str] = {}
+    for line in refs.splitlines():
+        ref, sha, peeled_sha = line.split(" ", 2)
+        ref_entries.append((ref, sha))
+        peeled[ref] = peeled_sha or sha
+    head = _read_head(repo_path)
+
+    if structural:
+        # Annotated tags are compared by the commit they point to, and the start
+        # tag by the commit alone as its name embeds a SHA
+        commit_ids = _structural_commit_ids(repo_path)
+        ref_entries = [
+            (
+                START_TAG_PREFIX + "*" if ref.startswith(START_TAG_PREFIX) else ref,
+                commit_ids.get(peeled[ref], sha),
+            )
+            for ref, sha in ref_entries
+        ]
+        head = commit_ids.get(head, head)
+
+    index: List[Tuple[str, str]] = []
+    paths: List[str] = []
+    listing = _git(
+        repo_path, ["ls-files", "-z", "--stage", "--others", "--exclude-standard"]
+    )
+    for entry in listing.split("\0"):
+        if not entry:
+            continue
+        match = _STAGED_ENTRY_REGEX.match(entry)
+        if match is None:
+            paths.append(entry)
+            continue
+        mode, sha, stage, path = match.groups()
+        index.append((path, f"{mode} {sha} {stage}"))
+        if mode != "160000":
+            paths.append(path)
+
+    worktree = [
+        (path, _hash_worktree_file(repo_path / path)) for path in sorted(set(paths))
+    ]
+
+    extra: List[Tuple[str, str]] = []
+    for extra_file in extra_files or []:
+        extra_path = Path(extra_file)
+        extra.append(
+            (
+                extra_path.name,
+                hash_blob(extra_path.read_bytes()) if extra_path.is_file() else "",
+            )
+        )
+
+    return RepoFingerprint(
+        head=head,
+        refs=tuple(sorted((ref, sha) for ref, sha in ref_entries)),
+        index=tuple(sorted(index)),
+        worktree=tuple(worktree),
+        extra=tuple(extra),
+    )
+
+
+def _hash_worktree_file(path: Path) -> str:
+    try:
+        file_stat = path.lstat()
+    except FileNotFoundError:
+        return "deleted"
+    if stat.S_ISLNK(file_stat.st_mode):
+        return "120000 " + hash_blob(os.readlink(path).encode("utf-8"))
+    if not stat.S_ISREG(file_stat.st_mode):
+        return "other"
+    mode = "100755" if file_stat.st_mode & stat.S_IXUSR else "100644"
+    return f"{mode} {hash_blob(path.read_bytes())}"
+
+
+def git_dir(repo_path: str | Path) -> Path:
+    """Returns the git directory of the repository at repo_path."""
+    git_path = Path(repo_path) / ".git"
+    if git_path.is_file():
+        # Worktrees and submodules point to their git directory from a .git file
+        linked_dir = git_path.read_text().strip().removeprefix("gitdir:").strip()
+        git_path = (Path(repo_path) / linked_dir).resolve()
+    return git_path
+
+
+def _read_head(repo_path: Path) -> str:
+    return (git_dir(repo_path) / "HEAD").read_text().strip()
+
+
+def _structural_commit_ids(repo_path: Path) -> Dict[str, str]:
+    log = _git(
+        repo_path,
+        [
+            "log",
+            "--all",
+            "--topo-order",
+            "--reverse",
+            "-z",
+            "--format=%H%x1f%T%x1f%P%x1f%B",
+        ],
+    )
+    commit_ids: Dict[str, str] = {}
+    for record in log.split("\0"):
+        if not record:
+            continue
+        sha, tree, parents, message = record.split("\x1f", 3)
+        parent_ids = [commit_ids.get(parent, parent) for parent in parents.split()]
+        payload = "\n".join([tree, *parent_ids, message.strip()])
+        commit_ids[sha] = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    return commit_ids
+
+
+def _git(repo_path: Path, args: List[str]) -> str:
+    result = subprocess.run(
+        ["git", *args],
+        cwd=repo_path,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed: {result.stderr.strip()}")
+    return result.stdout
@@ -3,6 +3,7 @@
 from typing import List, Optional
 
 from exercise_utils.cli import run, run_command
+from exercise_utils.determinism import commit_env
 
 
 def tag(tag_name: str, verbose: bool) -> None:
@@ -12,7 +13,7 @@ def tag(tag_name: str, verbose: bool) -> None:
 
 def tag_with_options(tag_name: str, options: List[str], verbose: bool) -> None:
     """Tags with the given tag_name with specified options."""
-    run_command(["git", "tag", tag_name, *options], verbose)
+    run_command(["git", "tag", tag_name, *options], verbose, env=commit_env())
 
 
 def add(files: List[str], verbose: bool) -> None:
@@ -24,12 +25,14 @@ def add(files: List[str], verbose: bool) -> None:
 # option
 def commit(message: str, verbose: bool) -> None:
     """Creates a commit with the given message."""
-    run_command(["git", "commit", "-m", message], verbose)
+    run_command(["git", "commit", "-m", message], verbose, env=commit_env())
 
 
 def empty_commit(message: str, verbose: bool) -> None:
     """Creates an empty commit with the given message."""
-    run_command(["git", "commit", "-m", message, "--allow-empty"], verbose)
+    run_command(
+        ["git", "commit", "-m", message, "--allow-empty"], verbose, env=commit_env()
+    )
 
 
 def checkout(branch: str, create_branch: bool, verbose: bool) -> None:
@@ -47,9 +50,15 @@ def merge(target_branch: str, ff: bool, verbose: bool) -> None:
     message.
     """
     if ff:
-        run_command(["git", "merge", target_branch, "--no-edit"], verbose)
+        run_command(
+            ["git", "merge", target_branch, "--no-edit"], verbose, env=commit_env()
+        )
     else:
-        run_command(["git", "merge", target_branch, "--no-edit", "--no-ff"], verbose)
+        run_command(
+            ["git", "merge", target_branch, "--no-edit", "--no-ff"],
+            verbose,
+            env=commit_env(),
+        )
 
 
 def merge_with_message(
@@ -57,9 +66,15 @@ def merge_with_message(
 ) -> None:
     """Merges the current branch with the target one."""
     if ff:
-        run_command(["git", "merge", target_branch, "-m", message], verbose)
+        run_command(
+            ["git", "merge", target_branch, "-m", message], verbose, env=commit_env()
+        )
     else:
-        run_command(["git", "merge", target_branch, "-m", message, "--no-ff"], verbose)
+        run_command(
+            ["git", "merge", target_branch, "-m", message, "--no-ff"],
+            verbose,
+            env=commit_env(),
+        )
 
 
 def init(verbose: bool) -> None:
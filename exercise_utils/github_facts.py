@@ -0,0 +1,91 @@
+"""Facts about the student's GitHub account from a single GraphQL query.
+
+Verifiers of GitHub exercises need the student's username and a few facts about
+repositories on their account, such as whether a repository is a fork and of
+whose. Asking for each one through gh is a process and a network round trip
+per fact. github_facts fetches all of them in one query and remembers the
+answer, so every helper of a verify can ask again for free:
+
+    facts = github_facts("gm-shapes")
+    facts.username  # None when gh is not set up
+    facts.repo("gm-shapes").is_fork
+    facts.repo("gm-shapes").parent_owner  # "git-mastery"
+
+Repositories are looked up on the authenticated user's account. The answer is
+kept until github_facts.cache_clear() is called, which exercise_utils.grading.grade
+does before every verify, so processes that grade many folders never see the
+facts of an earlier one.
+"""
+
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from exercise_utils.cli import run
+
+_REPO_FIELDS = "isFork visibility parent { owner { login } }"
+
+
+@dataclass(frozen=True)
+class GitHubRepoFacts:
+    name: str
+    exists: bool = False
+    is_fork: bool = False
+    parent_owner: Optional[str] = None
+    visibility: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class GitHubFacts:
+    username: Optional[str] = None
+    repos: Dict[str, GitHubRepoFacts] = field(default_factory=dict)
+
+    def repo(self, name: str) -> GitHubRepoFacts:
+        """Returns the facts of a repository on the user's account."""
+        return self.repos.get(name, GitHubRepoFacts(name))
+
+
+@lru_cache(maxsize=None)
+def github_facts(*repo_names: str) -> GitHubFacts:
+    """Returns the username and the facts of the given repositories."""
+    command = ["gh", "api", "graphql", "-f", f"query={_build_query(repo_names)}"]
+    for i, name in enumerate(repo_names):
+        command.extend(["-f", f"repo{i}={name}"])
+    # gh exits with an error when a repository is missing, but still prints
+    # the data it could resolve
+    result = run(command, verbose=False, env={"GH_PAGER": "cat"})
+    try:
+        data = json.loads(result.stdout).get("data") or {}
+    except (ValueError, AttributeError):
+        return GitHubFacts()
+
+    viewer = data.get("viewer") or {}
+    repos: Dict[str, GitHubRepoFacts] = {}
+    for i, name in enumerate(repo_names):
+        repos[name] = _parse_repo(name, viewer.get(f"repo{i}"))
+    return GitHubFacts(username=viewer.get("login"), repos=repos)
+
+
+def _build_query(repo_names: Tuple[str, ...]) -> str:
+    # Names are passed as variables rather than spliced into the query
+    variables = ", ".join(f"$repo{i}: String!" for i in range(len(repo_names)))
+    repositories = "".join(
+        f" repo{i}: repository(name: $repo{i}) {{ {_REPO_FIELDS} }}"
+        for i in range(len(repo_names))
+    )
+    signature = f"query({variables})" if repo_names else "query"
+    return f"{signature} {{ viewer {{ login{repositories} }} }}"
+
+
+def _parse_repo(name: str, raw: Optional[Dict[str, Any]]) -> GitHubRepoFacts:
+    if not raw:
+        return GitHubRepoFacts(name)
+    parent = raw.get("parent") or {}
+    return GitHubRepoFacts(
+        name=name,
+        exists=True,
+        is_fork=bool(raw.get("isFork")),
+        parent_owner=(parent.get("owner") or {}).get("login"),
+        visibility=raw.get("visibility"),
+    )
@@ -0,0 +1,271 @@
+"""In-memory evaluation of .gitignore rules.
+
+GitIgnore applies git's matching rules to hypothetical paths without creating
+them on disk or running git:
+
+    gitignore = GitIgnore.from_text("many/*\\n!many/file22.txt\\n")
+    gitignore.is_ignored("many/file1.txt")  # True
+    gitignore.is_ignored("many/file22.txt")  # False
+
+The rules follow gitignore(5): blank lines and comments are skipped, "!"
+re-includes, a trailing "/" only matches directories, a "/" anywhere else
+anchors the pattern to the directory of its .gitignore, "**" matches across
+directories, later rules override earlier ones and deeper .gitignore files
+override shallower ones. A path inside an ignored directory stays ignored, as
+git never looks inside such a directory for files to re-include.
+
+check_ignored runs the same evaluation through a single git check-ignore call,
+which is useful for validating the in-memory results.
+"""
+
+import re
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Mapping, Optional, Set
+
+_CHARACTER_CLASSES = {
+    "alnum": "a-zA-Z0-9",
+    "alpha": "a-zA-Z",
+    "blank": " \\t",
+    "cntrl": "\\x00-\\x1f\\x7f",
+    "digit": "0-9",
+    "graph": "!-~",
+    "lower": "a-z",
+    "print": " -~",
+    "punct": "!-/:-@\\[-`{-~",
+    "space": " \\t\\n\\r\\f\\v",
+    "upper": "A-Z",
+    "xdigit": "0-9a-fA-F",
+}
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    pattern: str
+    base: str
+    negated: bool
+    directory_only: bool
+    anchored: bool
+    regex: re.Pattern
+
+    def matches(self, path: str, is_dir: bool) -> bool:
+        """Returns whether the rule matches a path relative to the repository."""
+        if self.directory_only and not is_dir:
+            return False
+        if self.base:
+            if not path.startswith(self.base + "/"):
+                return False
+            path = path[len(self.base) + 1 :]
+        if not self.anchored:
+            path = path.rsplit("/", 1)[-1]
+        return self.regex.fullmatch(path) is not None
+
+
+def parse_gitignore(text: str, base: str = "") -> List[IgnoreRule]:
+    """Parses the rules of a .gitignore file in the directory base."""
+    rules: List[IgnoreRule] = []
+    for line in text.splitlines():
+        rule = _parse_line(line, base.strip("/"))
+        if rule is not None:
+            rules.append(rule)
+    return rules
+
+
+class GitIgnore:
+    def __init__(self, rules: List[IgnoreRule]) -> None:
+        # Rules from deeper directories come last so that they take precedence
+        self.rules = sorted(
+            rules, key=lambda rule: rule.base.count("/") + bool(rule.base)
+        )
+
+    @classmethod
+    def from_text(cls, text: str) -> "GitIgnore":
+        """Builds the rules of a single .gitignore at the root of a repository."""
+        return cls(parse_gitignore(text))
+
+    @classmethod
+    def from_files(cls, gitignores: Mapping[str, str]) -> "GitIgnore":
+        """Builds the rules of several .gitignore files keyed by their path."""
+        rules: List[IgnoreRule] = []
+        for path, text in gitignores.items():
+            base = path.replace("\\", "/").rpartition("/")[0]
+            rules.extend(parse_gitignore(text, base))
+        return cls(rules)
+
+    def is_ignored(self, path: str, is_dir: bool = False) -> bool:
+        path = path.replace("\\", "/").strip("/")
+        parts = path.split("/")
+        # An excluded directory hides everything below it, even negated files
+        for i in range(1, len(parts)):
+            if self.__is_excluded("/".join(parts[:i]), True):
+                return True
+        return self.__is_excluded(path, is_dir)
+
+    def ignored(self, paths: Iterable[str]) -> Set[str]:
+        """Returns the given file paths that are ignored."""
+        return {path for path in paths if self.is_ignored(path)}
+
+    def __is_excluded(self, path: str, is_dir: bool) -> bool:
+        for rule in reversed(self.rules):
+            if rule.matches(path, is_dir):
+                return not rule.negated
+        return False
+
+
+def check_ignored(gitignores: Mapping[str, str], paths: Iterable[str]) -> Set[str]:
+    """Returns the ignored paths as reported by git check-ignore.
+
+    The .gitignore files are written to an empty temporary repository and all
+    paths are checked with one git call, without creating the paths themselves.
+    """
+    paths = list(paths)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_path = Path(temp_dir)
+        subprocess.run(["git", "init", "-q"], cwd=repo_path, check=True)
+        for gitignore_path, text in gitignores.items():
+            (repo_path / gitignore_path).parent.mkdir(parents=True, exist_ok=True)
+            (repo_path / gitignore_path).write_text(text, encoding="utf-8")
+        result = subprocess.run(
+            ["git", "check-ignore", "--no-index", "--stdin", "-z"],
+            cwd=repo_path,
+            input="\0".join(paths) + "\0",
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+        )
+    # check-ignore exits with 1 when none of the paths are ignored
+    if result.returncode not in (0, 1):
+        raise RuntimeError(f"git check-ignore failed: {result.stderr.strip()}")
+    return {path for path in result.stdout.split("\0") if path}
+
+
+def _parse_line(line: str, base: str) -> Optional[IgnoreRule]:
+    if not line or line.startswith("#"):
+        return None
+    line = _strip_trailing_spaces(line)
+    if not line:
+        return None
+
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith("\\!") or line.startswith("\\#"):
+        line = line[1:]
+
+    directory_only = line.endswith("/")
+    pattern = line.rstrip("/")
+    if not pattern:
+        return None
+    anchored = "/" in pattern
+    pattern = pattern.removeprefix("/")
+
+    return IgnoreRule(
+        pattern=line,
+        base=base,
+        negated=negated,
+        directory_only=directory_only,
+        anchored=anchored,
+        regex=re.compile(_translate(pattern), re.DOTALL),
+    )
+
+
+def _strip_trailing_spaces(line: str) -> str:
+    # Trailing spaces are ignored unless they are escaped with a backslash
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        return stripped + " "
+    return stripped
+
+
+def _translate(pattern: str) -> str:
+    """Translates a wildmatch pattern, where only ** crosses "/", to a regex."""
+    regex: List[str] = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**", i):
+            at_start = i == 0 or pattern[i - 1] == "/"
+            at_end = i + 2 == len(pattern)
+            followed_by_slash = pattern.startswith("/", i + 2)
+            if at_start and followed_by_slash:
+                # "**/" matches zero or more leading directories
+                regex.append("(?:.*/)?")
+                i += 3
+                continue
+            if at_start and at_end:
+                # A trailing "/**" matches everything inside the directory
+                regex.append(".*")
+                i += 2
+                continue
+            regex.append("[^/]*")
+            i += 2
+            continue
+        if char == "*":
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = _find_class_end(pattern, i)
+            if end is None:
+                regex.append(re.escape(char))
+            else:
+                regex.append(_translate_class(pattern[i + 1 : end]))
+                i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return "".join(regex)
+
+
+def _find_class_end(pattern: str, start: int) -> Optional[int]:
+    i = start + 1
+    if i < len(pattern) and pattern[i] in "!^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1
+    while i < len(pattern):
+        if pattern.startswith("[:", i):
+            end = pattern.find(":]", i + 2)
+            if end != -1:
+                i = end + 2
+                continue
+        if pattern[i] == "\\":
+            i += 2
+            continue
+        if pattern[i] == "]":
+            return i
+        i += 1
+    return None
+
+
+def _translate_class(body: str) -> str:
+    negated = body[:1] in ("!", "^")
+    if negated:
+        body = body[1:]
+    parts: List[str] = []
+    i = 0
+    while i < len(body):
+        if body.startswith("[:", i):
+            end = body.find(":]", i + 2)
+            if end != -1 and body[i + 2 : end] in _CHARACTER_CLASSES:
+                parts.append(_CHARACTER_CLASSES[body[i + 2 : end]])
+                i = end + 2
+                continue
+        char = body[i]
+        if char == "\\" and i + 1 < len(body):
+            i += 1
+            char = body[i]
+        if char == "-" and parts and i + 1 < len(body):
+            parts.append("-")
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    # Classes never match "/" when matching paths
+    if negated:
+        return f"[^/{''.join(parts)}]"
+    return f"(?!/)[{''.join(parts)}]"
@@ -0,0 +1,183 @@
+"""Grades a downloaded exercise outside of the Git-Mastery app.
+
+grade runs an exercise's verify on an exercise folder and always returns its
+output, turning the exceptions a verify raises into the output the app would
+show, the same way the exercise tests do:
+
+    output = grade("/submissions/alice/branch-bender")
+    output.status  # GitAutograderStatus.UNSUCCESSFUL
+    output_record(output)  # {"status": "UNSUCCESSFUL", "comments": [...], ...}
+
+The verify of each exercise is imported the first time it is needed and kept
+for the life of the process, so grading many folders of the same exercise only
+pays for the import once. The exercise is read from the folder's
+.gitmastery-exercise.json, and results are reused for a folder whose state has
+not changed, as set out in exercise_utils.verify_cache. GitHub facts are
+fetched afresh for every folder.
+
+A long-lived grader can pass open_repo to read each exercise repository through
+a Repo it keeps open between calls, instead of one opened for every verify:
+
+    output = grade(exercise_path, open_repo=warm_repos.open)
+"""
+
+import importlib
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from git import Repo
+from git_autograder import (
+    GitAutograderExercise,
+    GitAutograderInvalidStateException,
+    GitAutograderOutput,
+    GitAutograderRepo,
+    GitAutograderStatus,
+    GitAutograderWrongAnswerException,
+)
+from git_autograder.helpers.branch_helper import BranchHelper
+from git_autograder.helpers.commit_helper import CommitHelper
+from git_autograder.helpers.file_helper import FileHelper
+from git_autograder.helpers.pr_helper.null_pr_helper import NullPrHelper
+from git_autograder.helpers.pr_helper.pr_helper import PrContext, PrHelper
+from git_autograder.helpers.remote_helper import RemoteHelper
+from git_autograder.helpers.tag_helper import TagHelper
+
+from exercise_utils.github_facts import github_facts
+from exercise_utils.verify_cache import cached_verify
+
+EXERCISE_CONFIG_FILE_NAME = ".gitmastery-exercise.json"
+
+Verify = Callable[[GitAutograderExercise], GitAutograderOutput]
+OpenRepo = Callable[[str | os.PathLike], Repo]
+
+_VERIFIERS: Dict[str, Verify] = {}
+
+
+def exercise_name_of(exercise_path: str | Path) -> str:
+    """Returns the name of the exercise downloaded into the folder."""
+    with open(Path(exercise_path) / EXERCISE_CONFIG_FILE_NAME, "r") as config_file:
+        return json.load(config_file)["exercise_name"]
+
+
+def load_verify(exercise_name: str) -> Verify:
+    """Returns the verify of the exercise, importing it on first use."""
+    module_name = f"{exercise_name.replace('-', '_')}.verify"
+    if module_name not in _VERIFIERS:
+        _VERIFIERS[module_name] = importlib.import_module(module_name).verify
+    return _VERIFIERS[module_name]
+
+
+class _OpenedGitAutograderRepo(GitAutograderRepo):
+    """A GitAutograderRepo that reads through a Repo the caller already opened."""
+
+    def __init__(
+        self,
+        exercise_name: str,
+        repo_path: str | os.PathLike,
+        repo: Repo,
+        pr_context: Optional[PrContext] = None,
+    ) -> None:
+        # Sets up the same helpers as GitAutograderRepo, which always opens its own Repo
+        self.exercise_name = exercise_name
+        self.repo_path = repo_path
+
+        self._repo = repo
+
+        self._branches = BranchHelper(self._repo)
+        self._commits = CommitHelper(self._repo)
+        self._remotes = RemoteHelper(self._repo)
+        self._files = FileHelper(self._repo)
+        self._tags = TagHelper(self._repo)
+        self._prs = PrHelper(pr_context, self._repo) if pr_context else NullPrHelper()
+
+
+def load_exercise(
+    exercise_path: str | Path, open_repo: Optional[OpenRepo] = None
+) -> GitAutograderExercise:
+    """Loads the exercise folder, opening its repository with open_repo if given."""
+    exercise = GitAutograderExercise(exercise_path=exercise_path)
+    if open_repo is not None and isinstance(exercise.repo, GitAutograderRepo):
+        repo_path = exercise.repo.repo_path
+        exercise.repo.repo.close()
+        exercise.repo = _OpenedGitAutograderRepo(
+            exercise.exercise_name,
+            repo_path,
+            open_repo(repo_path),
+            GitAutograderRepo.read_pr_context_from_config(config=exercise.config),
+        )
+    return exercise
+
+
+def grade(
+    exercise_path: str | Path,
+    verify: Optional[Verify] = None,
+    open_repo: Optional[OpenRepo] = None,
+) -> GitAutograderOutput:
+    """Verifies the exercise folder and returns the output, even on failure.
+
+    The exercise repository is opened with open_repo when given, and is left open
+    for the caller to reuse.
+    """
+    exercise_path = Path(exercise_path).absolute()
+    exercise_name: Optional[str] = None
+    started_at = datetime.now(tz=timezone.utc)
+    try:
+        exercise_name = exercise_name_of(exercise_path)
+        if verify is None:
+            verify = load_verify(exercise_name)
+        # Facts from an earlier verify in the same process may be stale
+        github_facts.cache_clear()
+        # Verifiers expect to be run from the exercise folder, as they are by the app
+        with _working_directory(exercise_path):
+            return cached_verify(load_exercise(exercise_path, open_repo), verify)
+    except (
+        GitAutograderInvalidStateException,
+        GitAutograderWrongAnswerException,
+    ) as e:
+        return GitAutograderOutput(
+            exercise_name=exercise_name,
+            started_at=started_at,
+            completed_at=datetime.now(tz=timezone.utc),
+            comments=[e.message] if isinstance(e.message, str) else e.message,
+            status=(
+                GitAutograderStatus.ERROR
+                if isinstance(e, GitAutograderInvalidStateException)
+                else GitAutograderStatus.UNSUCCESSFUL
+            ),
+        )
+    except Exception as e:
+        # Unexpected exception
+        return GitAutograderOutput(
+            exercise_name=exercise_name,
+            started_at=None,
+            completed_at=None,
+            comments=[str(e)],
+            status=GitAutograderStatus.ERROR,
+        )
+
+
+def output_record(output: GitAutograderOutput) -> Dict[str, Any]:
+    """Returns the output as a JSON serializable dictionary."""
+    return {
+        "exercise": output.exercise_name,
+        "status": str(output.status),
+        "comments": list(output.comments or []),
+        "started_at": output.started_at.isoformat() if output.started_at else None,
+        "completed_at": (
+            output.completed_at.isoformat() if output.completed_at else None
+        ),
+    }
+
+
+@contextmanager
+def _working_directory(path: Path) -> Iterator[None]:
+    current_dir = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(current_dir)
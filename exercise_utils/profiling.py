@@ -0,0 +1,184 @@
+"""Opt-in profiling of downloads and verifies.
+
+Setting GITMASTERY_PROFILE=1 makes every block wrapped in profile() record
+where its time went, without any change to the exercise itself:
+
+    with profile("verify", exercise_dir):
+        output = verify(exercise)
+
+Three files are written to a gitmastery-profile folder in the given directory,
+or to GITMASTERY_PROFILE_DIR when it is set:
+
+    verify.pstats           cProfile statistics, for pstats or snakeviz
+    verify.collapsed        stacks sampled every few milliseconds, one
+                            "frame;frame;frame count" line per stack, ready for
+                            flamegraph.pl or speedscope
+    verify.subprocesses.json  every process started, such as git and gh, with
+                            its arguments, working directory and duration
+
+The sampled stacks are of the thread that entered the block and are measured in
+wall time, so time spent waiting on git shows up in them, unlike in cProfile's
+CPU-bound view. When profiling is off, profile() does nothing.
+"""
+
+import cProfile
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import FrameType
+from typing import Any, Counter as CounterType, Dict, Iterator, List, Optional
+
+PROFILE_ENV = "GITMASTERY_PROFILE"
+PROFILE_DIR_ENV = "GITMASTERY_PROFILE_DIR"
+PROFILE_FOLDER_NAME = "gitmastery-profile"
+DEFAULT_SAMPLE_INTERVAL_SECONDS = 0.005
+
+
+@dataclass
+class SubprocessRecord:
+    args: List[str]
+    cwd: Optional[str]
+    started_at: float
+    seconds: Optional[float] = None
+
+
+@dataclass
+class Profile:
+    phase: str
+    output_dir: Path
+    subprocesses: List[SubprocessRecord] = field(default_factory=list)
+    stacks: CounterType[str] = field(default_factory=Counter)
+
+    @property
+    def pstats_path(self) -> Path:
+        return self.output_dir / f"{self.phase}.pstats"
+
+    @property
+    def collapsed_path(self) -> Path:
+        return self.output_dir / f"{self.phase}.collapsed"
+
+    @property
+    def subprocesses_path(self) -> Path:
+        return self.output_dir / f"{self.phase}.subprocesses.json"
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes")
+
+
+@contextmanager
+def profile(
+    phase: str,
+    directory: str | Path,
+    interval: float = DEFAULT_SAMPLE_INTERVAL_SECONDS,
+) -> Iterator[Optional[Profile]]:
+    """Profiles the block when GITMASTERY_PROFILE is set, and yields None if not."""
+    if not profiling_enabled():
+        yield None
+        return
+
+    output_dir = Path(
+        os.environ.get(PROFILE_DIR_ENV) or Path(directory) / PROFILE_FOLDER_NAME
+    ).resolve()
+    result = Profile(phase=_safe_name(phase), output_dir=output_dir)
+    profiler = cProfile.Profile()
+    sampler = _StackSampler(threading.get_ident(), interval, result.stacks)
+    try:
+        with _record_subprocesses(result.subprocesses):
+            sampler.start()
+            profiler.enable()
+            try:
+                yield result
+            finally:
+                profiler.disable()
+                sampler.stop()
+    finally:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(result.pstats_path)
+        with open(result.collapsed_path, "w", encoding="utf-8") as collapsed:
+            for stack, count in sorted(result.stacks.items()):
+                collapsed.write(f"{stack} {count}\n")
+        with open(result.subprocesses_path, "w", encoding="utf-8") as records:
+            json.dump([asdict(record) for record in result.subprocesses], records)
+
+
+@contextmanager
+def _record_subprocesses(records: List[SubprocessRecord]) -> Iterator[None]:
+    execute_child = subprocess.Popen._execute_child  # type: ignore[attr-defined]
+    wait = subprocess.Popen.wait
+    started: Dict[int, SubprocessRecord] = {}
+
+    def recording_execute_child(popen: subprocess.Popen, args: Any, *rest, **kwargs):
+        record = SubprocessRecord(
+            args=[str(arg) for arg in args]
+            if isinstance(args, (list, tuple))
+            else [str(args)],
+            # args is followed by executable, preexec_fn, close_fds, pass_fds and cwd
+            cwd=str(rest[4]) if len(rest) > 4 and rest[4] is not None else None,
+            started_at=time.perf_counter(),
+        )
+        records.append(record)
+        started[id(popen)] = record
+        return execute_child(popen, args, *rest, **kwargs)
+
+    def recording_wait(popen: subprocess.Popen, *args, **kwargs):
+        returncode = wait(popen, *args, **kwargs)
+        record = started.pop(id(popen), None)
+        if record is not None:
+            record.seconds = time.perf_counter() - record.started_at
+        return returncode
+
+    subprocess.Popen._execute_child = recording_execute_child  # type: ignore[attr-defined]
+    subprocess.Popen.wait = recording_wait  # type: ignore[method-assign,assignment]
+    try:
+        yield
+    finally:
+        subprocess.Popen._execute_child = execute_child  # type: ignore[attr-defined]
+        subprocess.Popen.wait = wait  # type: ignore[method-assign]
+
+
+class _StackSampler:
+    def __init__(
+        self, thread_id: int, interval: float, stacks: CounterType[str]
+    ) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = stacks
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+
+    def start(self) -> None:
+        self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stopped.set()
+        self.__thread.join()
+
+    def __run(self) -> None:
+        while not self.__stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+
+
+def _collapse(frame: Optional[FrameType]) -> str:
+    frames: List[str] = []
+    while frame is not None:
+        code = frame.f_code
+        name = f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+        # Semicolons separate the frames of a collapsed stack
+        frames.append(name.replace(";", ":"))
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
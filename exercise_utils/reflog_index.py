@@ -0,0 +1,214 @@
+"""Typed events from the reflogs of a repository, read in one pass.
+
+Verifiers look for evidence of how a student got to the final state, such as
+the order branches were merged into main or a branch being renamed. ReflogIndex
+reads the reflog files under .git/logs once, line by line, and turns each entry
+into an event:
+
+    reflogs = ReflogIndex.load(exercise.repo.repo)
+    [merge.branch for merge in reflogs.last_merges("main", 3)]
+    reflogs.was_renamed("login", "feature/login")
+
+Merges record the merged branch and whether they fast-forwarded, renames the
+old and new branch names, resets their target and checkouts the branches moved
+between. Other entries, such as commits, are kept as plain events.
+
+Branches can be given by name or as full refs, and HEAD as "HEAD". Only the
+latest max_events events and merges of each ref are kept, so a huge reflog
+never has to be held in memory. Events are always returned oldest first.
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional
+
+from git import Repo
+
+DEFAULT_MAX_EVENTS = 1000
+
+_RENAME_REGEX = re.compile("^renamed refs/heads/(.+) to refs/heads/(.+)$")
+_CHECKOUT_REGEX = re.compile("^moving from (.+) to (.+)$")
+
+
+@dataclass(frozen=True)
+class ReflogEvent:
+    ref: str
+    old_sha: str
+    new_sha: str
+    timestamp: int
+    action: str
+    message: str
+
+
+@dataclass(frozen=True)
+class MergeEvent(ReflogEvent):
+    branch: str
+    fast_forward: bool
+
+
+@dataclass(frozen=True)
+class RenameEvent(ReflogEvent):
+    old_branch: str
+    new_branch: str
+
+
+@dataclass(frozen=True)
+class ResetEvent(ReflogEvent):
+    target: str
+
+
+@dataclass(frozen=True)
+class CheckoutEvent(ReflogEvent):
+    from_branch: str
+    to_branch: str
+
+
+class ReflogIndex:
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS) -> None:
+        self.max_events = max_events
+        self.__events: Dict[str, Deque[ReflogEvent]] = {}
+        self.__merges: Dict[str, Deque[MergeEvent]] = {}
+        # The name each branch name was eventually renamed to, per ref
+        self.__renamed_to: Dict[str, Dict[str, str]] = {}
+        self.__rename_chains: Dict[str, List[str]] = {}
+
+    @classmethod
+    def load(
+        cls,
+        repo: Repo,
+        refs: Optional[Iterable[str]] = None,
+        max_events: int = DEFAULT_MAX_EVENTS,
+    ) -> "ReflogIndex":
+        """Reads the reflogs of the given refs, or of every ref when None."""
+        index = cls(max_events)
+        git_dir = Path(repo.git_dir)
+        common_dir = Path(repo.common_dir)
+        if refs is None:
+            logs_dir = common_dir / "logs"
+            paths = {
+                path.relative_to(logs_dir).as_posix(): path
+                for path in logs_dir.glob("refs/**/*")
+                if path.is_file()
+            }
+            paths["HEAD"] = git_dir / "logs" / "HEAD"
+        else:
+            paths = {}
+            for ref in map(_full_ref, refs):
+                base_dir = git_dir if ref == "HEAD" else common_dir
+                paths[ref] = base_dir / "logs" / ref
+
+        for ref, path in paths.items():
+            try:
+                with open(path, "r", encoding="utf-8", errors="replace") as log:
+                    for line in log:
+                        index.add(ref, line)
+            except FileNotFoundError:
+                continue
+        return index
+
+    def add(self, ref: str, line: str) -> None:
+        """Adds a raw reflog line of the ref, given in the order git wrote them."""
+        event = _parse_line(_full_ref(ref), line)
+        if event is None:
+            return
+        self.__events.setdefault(event.ref, deque(maxlen=self.max_events)).append(event)
+        if isinstance(event, MergeEvent):
+            self.__merges.setdefault(event.ref, deque(maxlen=self.max_events)).append(
+                event
+            )
+        elif isinstance(event, RenameEvent):
+            self.__add_rename(event)
+
+    def events(self, ref: str) -> List[ReflogEvent]:
+        return list(self.__events.get(_full_ref(ref), ()))
+
+    def merges(self, branch: str) -> List[MergeEvent]:
+        """Returns the merges into a branch, excluding merge commits made
+        after resolving conflicts, which git records as commits."""
+        return list(self.__merges.get(_full_ref(branch), ()))
+
+    def last_merges(self, branch: str, count: int) -> List[MergeEvent]:
+        merges = self.__merges.get(_full_ref(branch), deque())
+        return [merges[i] for i in range(max(len(merges) - count, 0), len(merges))]
+
+    def resets(self, ref: str) -> List[ResetEvent]:
+        return [
+            event
+            for event in self.__events.get(_full_ref(ref), ())
+            if isinstance(event, ResetEvent)
+        ]
+
+    def checkouts(self) -> List[CheckoutEvent]:
+        return [
+            event
+            for event in self.__events.get("HEAD", ())
+            if isinstance(event, CheckoutEvent)
+        ]
+
+    def rename_chain(self, branch: str) -> List[str]:
+        """Returns the names the branch was renamed through, ending with its own.
+
+        For a branch renamed from login to feat/login and then to feature/login,
+        this is ["login", "feat/login", "feature/login"].
+        """
+        return list(self.__rename_chains.get(_full_ref(branch), []))
+
+    def was_renamed(self, old_branch: str, new_branch: str) -> bool:
+        """Returns whether old_branch was renamed, in one or more steps, to the
+        branch that is now new_branch."""
+        renamed_to = self.__renamed_to.get(_full_ref(new_branch), {})
+        return renamed_to.get(old_branch) == new_branch
+
+    def __add_rename(self, event: RenameEvent) -> None:
+        # A renamed branch keeps its reflog, so its renames are all in one file
+        renamed_to = self.__renamed_to.setdefault(event.ref, {})
+        for name, current in renamed_to.items():
+            if current == event.old_branch:
+                renamed_to[name] = event.new_branch
+        renamed_to.setdefault(event.old_branch, event.new_branch)
+
+        chain = self.__rename_chains.setdefault(event.ref, [])
+        if chain and chain[-1] == event.old_branch:
+            chain.append(event.new_branch)
+        else:
+            chain[:] = [event.old_branch, event.new_branch]
+
+
+def _full_ref(name: str) -> str:
+    if name == "HEAD" or name.startswith("refs/"):
+        return name
+    return "refs/heads/" + name
+
+
+def _parse_line(ref: str, line: str) -> Optional[ReflogEvent]:
+    # <old sha> <new sha> <name> <<email>> <timestamp> <timezone>\t<message>
+    header, separator, text = line.rstrip("\n").partition("\t")
+    fields = header.split(" ")
+    if not separator or len(fields) < 4:
+        return None
+    try:
+        timestamp = int(fields[-2])
+    except ValueError:
+        return None
+    action, _, message = text.partition(": ")
+    base = (ref, fields[0], fields[1], timestamp, action, message)
+
+    if action.startswith("merge "):
+        return MergeEvent(
+            *base,
+            branch=action[len("merge ") :],
+            fast_forward=message == "Fast-forward",
+        )
+    if action.lower() == "branch":
+        match = _RENAME_REGEX.match(message)
+        if match is not None:
+            return RenameEvent(*base, old_branch=match[1], new_branch=match[2])
+    elif action == "reset":
+        return ResetEvent(*base, target=message.removeprefix("moving to "))
+    elif action == "checkout":
+        match = _CHECKOUT_REGEX.match(message)
+        if match is not None:
+            return CheckoutEvent(*base, from_branch=match[1], to_branch=match[2])
+    return ReflogEvent(*base)
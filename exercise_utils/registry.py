@@ -0,0 +1,220 @@
+"""Index of the exercises and hands-ons in this repository.
+
+Scripts that work on every exercise need the folder and configuration of each.
+ExerciseRegistry lists them from a manifest kept between runs, and only re-reads
+an exercise's .gitmastery-exercise.json or a hands-on's script when its
+modification time has changed:
+
+    registry = ExerciseRegistry.load()
+    registry.exercises["branch_bender"].config["tags"]
+    registry.exercise("branch-bender").verify_module().verify
+    registry.hands_on("hp-add-files").requires_github
+
+Download, verify and hands-on modules are only imported when asked for, so
+listing the exercises does not import GitPython or git-autograder.
+"""
+
+import ast
+import hashlib
+import importlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Optional, Tuple
+
+from exercise_utils.exercise_config import EXERCISE_CONFIG_FILE_NAME
+from exercise_utils.user_cache import user_cache_dir
+
+HANDS_ON_FOLDER_NAME = "hands_on"
+HANDS_ON_PREFIX = "hp-"
+DEFAULT_CACHE_DIR = user_cache_dir("registry")
+# Bumped whenever the manifest format changes
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ExerciseEntry:
+    folder: str
+    path: Path
+    mtime_ns: int
+    config: Optional[Dict[str, Any]] = None
+    # Why the configuration could not be read, when config is None
+    error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        if self.config is not None and "exercise_name" in self.config:
+            return self.config["exercise_name"]
+        return self.folder.replace("_", "-")
+
+    def download_module(self) -> ModuleType:
+        return importlib.import_module(f"{self.folder}.download")
+
+    def verify_module(self) -> ModuleType:
+        return importlib.import_module(f"{self.folder}.verify")
+
+
+@dataclass
+class HandsOnEntry:
+    name: str
+    path: Path
+    mtime_ns: int
+    requires_git: bool = False
+    requires_github: bool = False
+
+    @property
+    def folder(self) -> str:
+        """The folder the hands-on is downloaded into, such as hp-add-files."""
+        return HANDS_ON_PREFIX + self.name.replace("_", "-")
+
+    def module(self) -> ModuleType:
+        return importlib.import_module(f"{HANDS_ON_FOLDER_NAME}.{self.name}")
+
+
+class ExerciseRegistry:
+    def __init__(
+        self,
+        root: Path,
+        exercises: Dict[str, ExerciseEntry],
+        hands_ons: Dict[str, HandsOnEntry],
+    ) -> None:
+        self.root = root
+        self.exercises = exercises
+        self.hands_ons = hands_ons
+
+    @classmethod
+    def load(
+        cls, root: str | Path = ".", cache_dir: Optional[Path] = DEFAULT_CACHE_DIR
+    ) -> "ExerciseRegistry":
+        """Lists the exercises and hands-ons under root, reusing the cached
+        manifest for every file that has not changed since it was written.
+
+        Passing None as the cache_dir reads every file again.
+        """
+        root = Path(root).resolve()
+        cache_path = (
+            cache_dir / f"{hashlib.sha256(str(root).encode()).hexdigest()[:16]}.json"
+            if cache_dir is not None
+            else None
+        )
+        manifest = _read_manifest(cache_path) if cache_path is not None else {}
+        cached_exercises = manifest.get("exercises", {})
+        cached_hands_ons = manifest.get("hands_ons", {})
+
+        exercises: Dict[str, ExerciseEntry] = {}
+        for folder in sorted(os.listdir(root)):
+            config_path = root / folder / EXERCISE_CONFIG_FILE_NAME
+            try:
+                mtime_ns = os.stat(config_path).st_mtime_ns
+            except OSError:
+                continue
+            cached = cached_exercises.get(folder)
+            if cached is not None and cached["mtime_ns"] == mtime_ns:
+                config, error = cached["config"], cached["error"]
+            else:
+                config, error = _read_config(config_path)
+            exercises[folder] = ExerciseEntry(
+                folder, root / folder, mtime_ns, config, error
+            )
+
+        hands_ons: Dict[str, HandsOnEntry] = {}
+        hands_on_dir = root / HANDS_ON_FOLDER_NAME
+        for file_name in sorted(os.listdir(hands_on_dir)):
+            name, extension = os.path.splitext(file_name)
+            if extension != ".py" or name.startswith("_"):
+                continue
+            path = hands_on_dir / file_name
+            mtime_ns = os.stat(path).st_mtime_ns
+            cached = cached_hands_ons.get(name)
+            if cached is not None and cached["mtime_ns"] == mtime_ns:
+                requires_git, requires_github = (
+                    cached["requires_git"],
+                    cached["requires_github"],
+                )
+            else:
+                requires_git, requires_github = _read_hands_on_requirements(path)
+            hands_ons[name] = HandsOnEntry(
+                name, path, mtime_ns, requires_git, requires_github
+            )
+
+        registry = cls(root, exercises, hands_ons)
+        if cache_path is not None and registry.__manifest() != manifest:
+            _write_manifest(cache_path, registry.__manifest())
+        return registry
+
+    def exercise(self, name: str) -> Optional[ExerciseEntry]:
+        """Returns the exercise with the given name or folder name."""
+        return self.exercises.get(name.replace("-", "_"))
+
+    def hands_on(self, name: str) -> Optional[HandsOnEntry]:
+        """Returns the hands-on with the given name, with or without hp-."""
+        return self.hands_ons.get(name.removeprefix(HANDS_ON_PREFIX).replace("-", "_"))
+
+    def __manifest(self) -> Dict[str, Any]:
+        def entry(value: Any) -> Dict[str, Any]:
+            fields = asdict(value)
+            del fields["path"]
+            return fields
+
+        return {
+            "version": MANIFEST_VERSION,
+            "exercises": {
+                folder: entry(exercise) for folder, exercise in self.exercises.items()
+            },
+            "hands_ons": {
+                name: entry(hands_on) for name, hands_on in self.hands_ons.items()
+            },
+        }
+
+
+def _read_config(config_path: Path) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    try:
+        with open(config_path, "r") as config_file:
+            return json.load(config_file), None
+    except (OSError, ValueError) as e:
+        return None, str(e)
+
+
+def _read_hands_on_requirements(path: Path) -> Tuple[bool, bool]:
+    # Read from the source, as importing the hands-on would import its helpers
+    values: Dict[str, bool] = {}
+    with open(path, "r") as hands_on_file:
+        for node in ast.parse(hands_on_file.read()).body:
+            if (
+                isinstance(node, ast.Assign)
+                and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and isinstance(node.value, ast.Constant)
+            ):
+                values[node.targets[0].id] = bool(node.value.value)
+    return values.get("__requires_git__", False), values.get(
+        "__requires_github__", False
+    )
+
+
+def _read_manifest(cache_path: Path) -> Dict[str, Any]:
+    try:
+        with open(cache_path, "r") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def _write_manifest(cache_path: Path, manifest: Dict[str, Any]) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Written to a temporary file first so that a concurrent read never
+        # sees a partial manifest
+        fd, temp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as temp_file:
+            json.dump(manifest, temp_file)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # Without a manifest, the next run only has to read every file again
+        pass
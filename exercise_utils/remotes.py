@@ -0,0 +1,159 @@
+"""Snapshot of the branches and tags on a repository's remotes.
+
+Verifiers that only need to know which branches or tags exist on a remote do
+not need to fetch. RemoteSnapshot lists the heads and tags of each remote with
+a single git ls-remote and keeps the answer for as long as the snapshot lives,
+which is normally one verify:
+
+    remotes = RemoteSnapshot(exercise.repo.repo)
+    "feature/login" in remotes.heads("origin")  # {"main": "<sha>", ...}
+    remotes.tags("origin")  # {"v1.0": "<sha of the tagged commit>", ...}
+
+Remotes are listed on first use. RemoteSnapshot.load lists several remotes at
+once, in parallel, for verifiers that look at every remote.
+
+Verifiers that do need a remote's commits fetch only the refs they read with
+fetch_refs, rather than every branch and tag of the remote:
+
+    fetch_refs(repo, "origin", ["main"], negotiation_tips=["main"])
+    repo.refs["origin/main"]
+"""
+
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from git import Repo
+
+_HEADS_PREFIX = "refs/heads/"
+_TAGS_PREFIX = "refs/tags/"
+_PEELED_SUFFIX = "^{}"
+
+
+@dataclass(frozen=True)
+class RemoteRefs:
+    remote: str
+    heads: Dict[str, str] = field(default_factory=dict)
+    tags: Dict[str, str] = field(default_factory=dict)
+
+
+def fetch_refs(
+    repo: Repo,
+    remote: str,
+    refspecs: List[str],
+    negotiation_tips: Optional[List[str]] = None,
+    filter_blobs: bool = True,
+) -> None:
+    """Fetches only the given refspecs of the remote, without tags.
+
+    A plain branch name, such as "main", is fetched into its remote-tracking
+    ref. Blobs are left out when the remote is already a partial clone remote,
+    as git only allows filters for those. negotiation_tips limits the local
+    commits offered to the remote as common ancestors, which keeps negotiation
+    short in repositories with many branches.
+    """
+    command = ["git", "fetch", "--no-tags", "--quiet"]
+    if filter_blobs and _is_promisor(repo, remote):
+        command.append("--filter=blob:none")
+    for tip in negotiation_tips or []:
+        command.append(f"--negotiation-tip={tip}")
+    command.append(remote)
+    command.extend(_expand_refspec(remote, refspec) for refspec in refspecs)
+    result = subprocess.run(
+        command,
+        cwd=repo.working_dir,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git fetch failed: {result.stderr.strip()}")
+
+
+class RemoteSnapshot:
+    def __init__(self, repo: Repo) -> None:
+        self.repo = repo
+        self.__refs: Dict[str, RemoteRefs] = {}
+
+    @classmethod
+    def load(
+        cls, repo: Repo, remotes: Optional[Iterable[str]] = None
+    ) -> "RemoteSnapshot":
+        """Lists the given remotes, or every remote when None, in parallel."""
+        snapshot = cls(repo)
+        names = (
+            list(remotes)
+            if remotes is not None
+            else [remote.name for remote in repo.remotes]
+        )
+        if names:
+            with ThreadPoolExecutor(max_workers=len(names)) as executor:
+                for refs in executor.map(snapshot.__list_remote, names):
+                    snapshot.__refs[refs.remote] = refs
+        return snapshot
+
+    @property
+    def remotes(self) -> Dict[str, RemoteRefs]:
+        """The remotes listed so far."""
+        return dict(self.__refs)
+
+    def refs(self, remote: str) -> RemoteRefs:
+        if remote not in self.__refs:
+            self.__refs[remote] = self.__list_remote(remote)
+        return self.__refs[remote]
+
+    def heads(self, remote: str) -> Dict[str, str]:
+        """Returns the SHA of each branch on the remote, keyed by branch name."""
+        return self.refs(remote).heads
+
+    def tags(self, remote: str) -> Dict[str, str]:
+        """Returns the SHA of the object each tag on the remote points to.
+
+        Annotated tags are peeled, so every SHA is that of the tagged commit.
+        """
+        return self.refs(remote).tags
+
+    def __list_remote(self, remote: str) -> RemoteRefs:
+        result = subprocess.run(
+            ["git", "ls-remote", "--heads", "--tags", remote],
+            cwd=self.repo.working_dir,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"git ls-remote failed: {result.stderr.strip()}")
+        return parse_ls_remote(remote, result.stdout)
+
+
+def parse_ls_remote(remote: str, output: str) -> RemoteRefs:
+    """Parses the output of git ls-remote --heads --tags."""
+    heads: Dict[str, str] = {}
+    tags: Dict[str, str] = {}
+    peeled: Dict[str, str] = {}
+    for line in output.splitlines():
+        sha, _, ref = line.partition("\t")
+        if ref.startswith(_HEADS_PREFIX):
+            heads[ref.removeprefix(_HEADS_PREFIX)] = sha
+        elif ref.startswith(_TAGS_PREFIX) and ref.endswith(_PEELED_SUFFIX):
+            peeled[ref.removeprefix(_TAGS_PREFIX).removesuffix(_PEELED_SUFFIX)] = sha
+        elif ref.startswith(_TAGS_PREFIX):
+            tags[ref.removeprefix(_TAGS_PREFIX)] = sha
+    tags.update((name, sha) for name, sha in peeled.items() if name in tags)
+    return RemoteRefs(remote=remote, heads=heads, tags=tags)
+
+
+def _expand_refspec(remote: str, refspec: str) -> str:
+    if ":" in refspec or refspec.startswith("refs/"):
+        return refspec
+    return f"+{_HEADS_PREFIX}{refspec}:refs/remotes/{remote}/{refspec}"
+
+
+def _is_promisor(repo: Repo, remote: str) -> bool:
+    with repo.config_reader() as config:
+        promisor = config.get_value(f'remote "{remote}"', "promisor", False)
+        partial_clone = config.get_value("extensions", "partialclone", "")
+    return (
+        promisor is True or str(promisor).lower() == "true" or partial_clone == remote
+    )
@@ -0,0 +1,529 @@
+"""Declarative repository state specs, compiled into a single git fast-import.
+
+A spec describes the history of a repository in YAML (or as an equivalent
+mapping):
+
+    head: main
+    start_tag: true
+    history:
+      - commit: Add features.md
+        id: features
+        files:
+          features.md: |
+            # Features
+      - commit: Add search
+        branch: feature-search
+        files:
+          features.md: |
+            # Features
+            ## Search
+      - merge: feature-search
+        tag: v1.0
+    branches:
+      stale: features
+    tags:
+      v0.9:
+        target: features
+        message: First preview
+    remotes:
+      origin:
+        url: https://github.com/git-mastery/example
+        branches:
+          main: main
+
+Every commit, merge, branch, tag and remote-tracking ref is emitted into one
+`git fast-import` stream. Only the start tag, whose name depends on a SHA, is
+written afterwards with `git update-ref --stdin`, and the working tree is reset
+once at the end. Dates and identities
+are pinned, so the same spec always produces the same commit SHAs, which lets
+built repositories be cached by the content hash of the spec.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+DEFAULT_AUTHOR = "Git-Mastery <git-mastery@example.com>"
+DEFAULT_DATE = "2024-01-01T00:00:00+00:00"
+DEFAULT_HEAD = "main"
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / "gitmastery-repo-specs"
+
+RepoSpec = Mapping[str, Any]
+
+
+@dataclass
+class CompiledSpec:
+    """Result of compiling a spec against the refs that already exist."""
+
+    stream: bytes
+    head: str
+    labels: Dict[str, str]
+    remotes: Dict[str, str]
+    start_tag_target: Optional[str]
+
+
+@dataclass
+class _Node:
+    token: str
+    parents: List[str]
+    files: Dict[str, str]
+    generation: int
+
+
+def load_spec(path: str | Path) -> Dict[str, Any]:
+    """Loads a YAML repo spec from the given path."""
+    import yaml
+
+    with open(path, "r") as spec_file:
+        spec = yaml.safe_load(spec_file)
+    if not isinstance(spec, dict):
+        raise ValueError(f"Repo spec {path} must be a mapping")
+    return spec
+
+
+def spec_digest(spec: RepoSpec, existing_refs: Optional[Dict[str, str]] = None) -> str:
+    """Returns the content hash of a spec applied on top of the given refs."""
+    payload = json.dumps(
+        {"spec": spec, "base": existing_refs or {}}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def compile_spec(
+    spec: RepoSpec, existing_refs: Optional[Dict[str, str]] = None
+) -> CompiledSpec:
+    """Compiles a spec into a fast-import stream.
+
+    existing_refs maps full ref names to SHAs of refs already in the target
+    repository, so that history can be appended to branches that exist.
+    """
+    return _SpecCompiler(spec, existing_refs or {}).compile()
+
+
+def apply_spec(
+    spec: str | Path | RepoSpec,
+    verbose: bool,
+    repo_path: str | Path = ".",
+    cache_dir: Optional[str | Path] = None,
+) -> Dict[str, str]:
+    """Builds the state described by the spec in the repository at repo_path.
+
+    The repository is initialised if needed. Returns the SHAs of the commits
+    that were given an id in the spec. When cache_dir is given, the built
+    repository is stored under the hash of the spec and restored from there on
+    subsequent calls.
+    """
+    if not isinstance(spec, Mapping):
+        spec = load_spec(spec)
+
+    repo_path = Path(repo_path).absolute()
+    git_dir = repo_path / ".git"
+    if not git_dir.exists():
+        repo_path.mkdir(parents=True, exist_ok=True)
+        _git(repo_path, ["init", "--quiet", f"--initial-branch={DEFAULT_HEAD}"])
+
+    existing_refs = _list_refs(repo_path)
+    cached_path: Optional[Path] = None
+    if cache_dir is not None:
+        cached_path = Path(cache_dir) / spec_digest(spec, existing_refs)
+        if (cached_path / "labels.json").exists():
+            shutil.copytree(cached_path / "git", git_dir, dirs_exist_ok=True)
+            _git(repo_path, ["reset", "--hard", "--quiet"])
+            with open(cached_path / "labels.json", "r") as labels_file:
+                return json.load(labels_file)
+
+    compiled = compile_spec(spec, existing_refs)
+    labels = _import(repo_path, compiled, verbose)
+
+    if cached_path is not None:
+        _store_in_cache(cached_path, git_dir, labels)
+
+    return labels
+
+
+def _import(repo_path: Path, compiled: CompiledSpec, verbose: bool) -> Dict[str, str]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        marks_path = Path(temp_dir) / "marks"
+        _git(
+            repo_path,
+            ["fast-import", "--quiet", "--force", f"--export-marks={marks_path}"],
+            stdin=compiled.stream,
+        )
+        marks: Dict[str, str] = {}
+        if marks_path.exists():
+            for line in marks_path.read_text().splitlines():
+                mark, sha = line.split()
+                marks[mark] = sha
+
+    def resolve(token: str) -> str:
+        return marks[token] if token.startswith(":") else token
+
+    if compiled.start_tag_target is not None:
+        start_sha = compiled.start_tag_target
+        if not start_sha.startswith(":"):
+            roots = _git(
+                repo_path, ["rev-list", "--max-parents=0", start_sha]
+            ).splitlines()
+            start_sha = roots[-1]
+        start_sha = resolve(start_sha)
+        command = f"update refs/tags/git-mastery-start-{start_sha[:7]} {start_sha}\n"
+        _git(repo_path, ["update-ref", "--stdin"], stdin=command.encode("utf-8"))
+
+    for name, url in compiled.remotes.items():
+        _git(repo_path, ["remote", "add", name, url])
+
+    _git(repo_path, ["symbolic-ref", "HEAD", f"refs/heads/{compiled.head}"])
+    _git(repo_path, ["reset", "--hard", "--quiet"])
+
+    if verbose:
+        print(f"\tImported {len(marks)} commits")
+
+    return {label: resolve(token) for label, token in compiled.labels.items()}
+
+
+def _store_in_cache(cached_path: Path, git_dir: Path, labels: Dict[str, str]) -> None:
+    cached_path.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=cached_path.parent))
+    shutil.copytree(git_dir, staging / "git", ignore=shutil.ignore_patterns("hooks"))
+    with open(staging / "labels.json", "w") as labels_file:
+        json.dump(labels, labels_file)
+    try:
+        os.replace(staging, cached_path)
+    except OSError:
+        # Another process populated the same entry first
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _list_refs(repo_path: Path) -> Dict[str, str]:
+    output = _git(repo_path, ["for-each-ref", "--format=%(refname) %(objectname)"])
+    refs: Dict[str, str] = {}
+    for line in output.splitlines():
+        ref, sha = line.split(" ", 1)
+        refs[ref] = sha
+    return refs
+
+
+def _git(repo_path: Path, args: List[str], stdin: Optional[bytes] = None) -> str:
+    result = subprocess.run(
+        ["git", *args],
+        cwd=repo_path,
+        input=stdin,
+        capture_output=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"git {args[0]} failed: {result.stderr.decode('utf-8', 'replace').strip()}"
+        )
+    return result.stdout.decode("utf-8")
+
+
+class _SpecCompiler:
+    def __init__(self, spec: RepoSpec, existing_refs: Dict[str, str]) -> None:
+        self.spec = spec
+        self.existing_refs = existing_refs
+        self.head: str = spec.get("head", DEFAULT_HEAD)
+        self.author = _parse_identity(spec.get("author", DEFAULT_AUTHOR))
+        self.base_date = _parse_date(spec.get("date", DEFAULT_DATE))
+        self.nodes: Dict[str, _Node] = {}
+        self.tips: Dict[str, str] = {}
+        self.labels: Dict[str, str] = {}
+        self.chunks: List[bytes] = []
+        self.commit_count = 0
+
+        for ref, sha in existing_refs.items():
+            if ref.startswith("refs/heads/"):
+                self.tips[ref[len("refs/heads/") :]] = sha
+            self.nodes.setdefault(sha, _Node(sha, [], {}, 0))
+
+    def compile(self) -> CompiledSpec:
+        for index, entry in enumerate(self.spec.get("history", []) or []):
+            if not isinstance(entry, Mapping):
+                raise ValueError(f"history[{index}] must be a mapping")
+            if "merge" in entry:
+                self._merge(entry)
+            elif "commit" in entry:
+                self._commit(entry)
+            else:
+                raise ValueError(f"history[{index}] must have a commit or merge key")
+
+        for branch, target in (self.spec.get("branches", {}) or {}).items():
+            self.tips[branch] = self._resolve(target)
+        for branch, token in self.tips.items():
+            self._reset(f"refs/heads/{branch}", token)
+        for name, target in (self.spec.get("tags", {}) or {}).items():
+            if isinstance(target, Mapping):
+                self._annotated_tag(name, target)
+            else:
+                self._reset(f"refs/tags/{name}", self._resolve(target))
+
+        remotes: Dict[str, str] = {}
+        for name, remote in (self.spec.get("remotes", {}) or {}).items():
+            remotes[name] = remote["url"]
+            for branch, target in (remote.get("branches", {}) or {}).items():
+                self._reset(f"refs/remotes/{name}/{branch}", self._resolve(target))
+
+        start_tag_target: Optional[str] = None
+        if self.spec.get("start_tag", False):
+            if self.head not in self.tips:
+                raise ValueError("start_tag requires the head branch to have commits")
+            start_tag_target = self._root_of(self.tips[self.head])
+
+        return CompiledSpec(
+            stream=b"".join(self.chunks),
+            head=self.head,
+            labels=dict(self.labels),
+            remotes=remotes,
+            start_tag_target=start_tag_target,
+        )
+
+    def _commit(self, entry: Mapping[str, Any]) -> None:
+        branch = entry.get("branch", self.head)
+        parents: List[str] = []
+        if branch in self.tips:
+            parents.append(self.tips[branch])
+        elif "from" in entry:
+            parents.append(self._resolve(entry["from"]))
+        elif self.head in self.tips:
+            parents.append(self.tips[self.head])
+
+        files = dict(self.nodes[parents[0]].files) if parents else {}
+        changes = self._file_changes(entry)
+        for path, content in changes.items():
+            if content is None:
+                files.pop(path, None)
+            else:
+                files[path] = content
+
+        self._emit_commit(branch, entry, entry["commit"], parents, files, changes)
+
+    def _merge(self, entry: Mapping[str, Any]) -> None:
+        into = entry.get("into", self.head)
+        if into not in self.tips:
+            raise ValueError(f"Cannot merge into {into}: branch has no commits")
+        ours = self.tips[into]
+        theirs = self._resolve(entry["merge"])
+
+        if entry.get("fast_forward", False):
+            if not self._is_ancestor(ours, theirs):
+                raise ValueError(f"Cannot fast-forward {into} to {entry['merge']}")
+            self.tips[into] = theirs
+            if "id" in entry:
+                self.labels[entry["id"]] = theirs
+            return
+
+        base = self._merge_base(ours, theirs)
+        base_files = self.nodes[base].files if base is not None else {}
+        ours_files = self.nodes[ours].files
+        theirs_files = self.nodes[theirs].files
+        explicit = self._file_changes(entry)
+
+        files: Dict[str, str] = {}
+        for path in set(base_files) | set(ours_files) | set(theirs_files):
+            if path in explicit:
+                continue
+            merged = _merge_file(
+                base_files.get(path), ours_files.get(path), theirs_files.get(path)
+            )
+            if merged is _CONFLICT:
+                raise ValueError(
+                    f"Merging {entry['merge']} into {into} conflicts on {path}; "
+                    "give its merged content under files"
+                )
+            if merged is not None:
+                files[path] = str(merged)
+        for path, content in explicit.items():
+            if content is not None:
+                files[path] = content
+
+        changes: Dict[str, Optional[str]] = {
+            path: content
+            for path, content in files.items()
+            if ours_files.get(path) != content
+        }
+        for path in ours_files:
+            if path not in files:
+                changes[path] = None
+
+        message = entry.get("message")
+        if message is None:
+            message = f"Merge branch '{entry['merge']}'"
+            if into not in ("main", "master"):
+                message += f" into {into}"
+        self._emit_commit(into, entry, message, [ours, theirs], files, changes)
+
+    def _emit_commit(
+        self,
+        branch: str,
+        entry: Mapping[str, Any],
+        message: str,
+        parents: List[str],
+        files: Dict[str, str],
+        changes: Mapping[str, Optional[str]],
+    ) -> None:
+        mark = f":{len(self.nodes) + 1}"
+        when = (
+            _parse_date(entry["date"])
+            if "date" in entry
+            else self.base_date + timedelta(minutes=self.commit_count)
+        )
+        self.commit_count += 1
+        author = _parse_identity(entry["author"]) if "author" in entry else self.author
+        signature = f"{author} {_format_date(when)}"
+
+        lines = [
+            f"commit refs/heads/{branch}",
+            f"mark {mark}",
+            f"author {signature}",
+            f"committer {signature}",
+        ]
+        self.chunks.append(("\n".join(lines) + "\n").encode("utf-8"))
+        self.chunks.append(_data(message if message.endswith("\n") else message + "\n"))
+        if parents:
+            self.chunks.append(f"from {parents[0]}\n".encode("utf-8"))
+        for parent in parents[1:]:
+            self.chunks.append(f"merge {parent}\n".encode("utf-8"))
+        for path, content in sorted(changes.items()):
+            if content is None:
+                self.chunks.append(f"D {_quote_path(path)}\n".encode("utf-8"))
+            else:
+                self.chunks.append(f"M 100644 inline {_quote_path(path)}\n".encode())
+                self.chunks.append(_data(content))
+        self.chunks.append(b"\n")
+
+        generation = 1 + max((self.nodes[p].generation for p in parents), default=0)
+        self.nodes[mark] = _Node(mark, parents, files, generation)
+        self.tips[branch] = mark
+        if "id" in entry:
+            self.labels[entry["id"]] = mark
+        for tag in _as_list(entry.get("tag")) + _as_list(entry.get("tags")):
+            self._reset(f"refs/tags/{tag}", mark)
+
+    def _annotated_tag(self, name: str, target: Mapping[str, Any]) -> None:
+        when = _parse_date(target["date"]) if "date" in target else self.base_date
+        tagger = (
+            _parse_identity(target["tagger"]) if "tagger" in target else self.author
+        )
+        lines = [
+            f"tag {name}",
+            f"from {self._resolve(target['target'])}",
+            f"tagger {tagger} {_format_date(when)}",
+        ]
+        self.chunks.append(("\n".join(lines) + "\n").encode("utf-8"))
+        message = target.get("message", name)
+        self.chunks.append(_data(message if message.endswith("\n") else message + "\n"))
+
+    def _reset(self, ref: str, token: str) -> None:
+        self.chunks.append(f"reset {ref}\nfrom {token}\n\n".encode("utf-8"))
+
+    def _file_changes(self, entry: Mapping[str, Any]) -> Dict[str, Optional[str]]:
+        changes: Dict[str, Optional[str]] = {}
+        for path, content in (entry.get("files", {}) or {}).items():
+            changes[path] = "" if content is None else str(content)
+        for path in _as_list(entry.get("delete")):
+            changes[path] = None
+        return changes
+
+    def _resolve(self, target: str) -> str:
+        if target in self.labels:
+            return self.labels[target]
+        if target in self.tips:
+            return self.tips[target]
+        for prefix in ("", "refs/heads/", "refs/tags/", "refs/remotes/"):
+            if f"{prefix}{target}" in self.existing_refs:
+                return self.existing_refs[f"{prefix}{target}"]
+        if target in self.nodes:
+            return target
+        raise ValueError(f"Unknown commit, branch or id in repo spec: {target}")
+
+    def _ancestors(self, token: str) -> Dict[str, int]:
+        seen: Dict[str, int] = {}
+        stack = [token]
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            node = self.nodes[current]
+            seen[current] = node.generation
+            stack.extend(node.parents)
+        return seen
+
+    def _is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        return ancestor in self._ancestors(descendant)
+
+    def _merge_base(self, first: str, second: str) -> Optional[str]:
+        first_ancestors = self._ancestors(first)
+        common = [
+            (generation, token)
+            for token, generation in self._ancestors(second).items()
+            if token in first_ancestors
+        ]
+        return max(common)[1] if common else None
+
+    def _root_of(self, token: str) -> str:
+        node = self.nodes[token]
+        while node.parents:
+            node = self.nodes[node.parents[0]]
+        return node.token
+
+
+_CONFLICT = object()
+
+
+def _merge_file(
+    base: Optional[str], ours: Optional[str], theirs: Optional[str]
+) -> object:
+    if ours == theirs or theirs == base:
+        return ours
+    if ours == base:
+        return theirs
+    return _CONFLICT
+
+
+def _data(content: str) -> bytes:
+    encoded = content.encode("utf-8")
+    return f"data {len(encoded)}\n".encode("utf-8") + encoded + b"\n"
+
+
+def _quote_path(path: str) -> str:
+    if "\n" in path:
+        raise ValueError(f"Unsupported file path in repo spec: {path!r}")
+    if path.startswith('"'):
+        return '"' + path.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return path
+
+
+def _parse_identity(identity: str) -> str:
+    if "<" not in identity or not identity.rstrip().endswith(">"):
+        raise ValueError(f"Identity must look like 'Name <email>': {identity}")
+    return identity.strip()
+
+
+def _parse_date(value: Any) -> datetime:
+    when = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when
+
+
+def _format_date(when: datetime) -> str:
+    offset = when.utcoffset() or timedelta()
+    minutes = int(offset.total_seconds()) // 60
+    sign = "+" if minutes >= 0 else "-"
+    minutes = abs(minutes)
+    return f"{int(when.timestamp())} {sign}{minutes // 60:02d}{minutes % 60:02d}"
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
@@ -0,0 +1,119 @@
+"""Runs functions from student code in an isolated subprocess.
+
+Every case of a check runs in one child Python process, which compiles the
+student's file once and calls the function once per case:
+
+    results = run_function_cases("greet.py", "greet", [{"name": "Alice"}])
+    results[0].stdout  # "Hi Alice\\n"
+
+The child runs in isolated mode without writing bytecode, under a time limit
+and, on POSIX, an address space limit, so a runaway loop or allocation in
+student code cannot hang or bloat the grader. A case that raises, or every
+case when the child is killed, comes back with an error instead of a value.
+"""
+
+import json
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_TIMEOUT_SECONDS = 5.0
+DEFAULT_MEMORY_LIMIT_MB = 256
+
+# Executed by the child with -c. The request is read from stdin and the results
+# are written to the original stdout, after student output has been captured.
+_RUNNER = """
+import io, json, sys
+from contextlib import redirect_stdout
+
+request = json.load(sys.stdin)
+if request["memory_limit"]:
+    try:
+        import resource
+        resource.setrlimit(
+            resource.RLIMIT_AS, (request["memory_limit"], request["memory_limit"])
+        )
+    except (ImportError, ValueError, OSError):
+        pass
+
+out = sys.stdout
+with open(request["path"], "r", encoding="utf-8") as file:
+    code = compile(file.read(), request["path"], "exec")
+
+results = []
+for args in request["cases"]:
+    buffer = io.StringIO()
+    result = {"value": None, "stdout": "", "error": None}
+    try:
+        with redirect_stdout(buffer):
+            namespace = {"__name__": "__sandbox__"}
+            exec(code, namespace)
+            value = namespace[request["function"]](**args)
+        try:
+            json.dumps(value)
+            result["value"] = value
+        except (TypeError, ValueError):
+            result["value"] = repr(value)
+    except BaseException as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["stdout"] = buffer.getvalue()
+    results.append(result)
+
+out.write(json.dumps(results))
+"""
+
+
+@dataclass
+class CaseResult:
+    value: Any = None
+    stdout: str = ""
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_function_cases(
+    filepath: str | Path,
+    func_name: str,
+    cases: List[Dict[str, Any]],
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+    memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB,
+) -> List[CaseResult]:
+    """Calls func_name from the file with each case's keyword arguments.
+
+    Arguments and return values must be JSON serialisable; other return values
+    are given as their repr.
+    """
+    filepath = Path(filepath).resolve()
+    request = {
+        "path": str(filepath),
+        "function": func_name,
+        "cases": cases,
+        "memory_limit": memory_limit_mb * 1024 * 1024 if memory_limit_mb else None,
+    }
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-I", "-B", "-c", _RUNNER],
+            cwd=filepath.parent,
+            input=json.dumps(request),
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return _failed(cases, f"Timed out after {timeout}s")
+
+    try:
+        results = json.loads(completed.stdout)
+    except ValueError:
+        stderr = completed.stderr.strip().splitlines()
+        return _failed(cases, stderr[-1] if stderr else "Failed to run")
+    return [CaseResult(**result) for result in results]
+
+
+def _failed(cases: List[Dict[str, Any]], error: str) -> List[CaseResult]:
+    return [CaseResult(error=error) for _ in cases]
@@ -0,0 +1,142 @@
+"""Snapshot of the working tree and index from a single git status call.
+
+Checking whether a repository is dirty, which branch is checked out, what is
+staged and what is untracked each walk the working tree when asked through
+GitPython. RepoStatus answers all of them from one call to
+git status --porcelain=v2:
+
+    status = RepoStatus.load(exercise.repo.repo)
+    if status.is_dirty:
+        ...
+    if status.detached or status.branch != "main":
+        ...
+
+Renames are not detected, so a renamed file is staged as a deletion of the old
+path and an addition of the new one, as in GitPython's index diffs.
+"""
+
+import subprocess
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from git import Repo
+
+
+@dataclass(frozen=True)
+class StatusEntry:
+    path: str
+    index_status: str
+    worktree_status: str
+    orig_path: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class RepoStatus:
+    branch: Optional[str] = None
+    head: Optional[str] = None
+    upstream: Optional[str] = None
+    ahead: int = 0
+    behind: int = 0
+    entries: Tuple[StatusEntry, ...] = ()
+    conflicted: Tuple[str, ...] = ()
+    untracked: Tuple[str, ...] = ()
+    ignored: Tuple[str, ...] = ()
+
+    @classmethod
+    def load(cls, repo: Repo, include_ignored: bool = False) -> "RepoStatus":
+        command = [
+            "git",
+            "status",
+            "--porcelain=v2",
+            "-z",
+            "--branch",
+            "--untracked-files=all",
+            "--no-renames",
+        ]
+        if include_ignored:
+            command.append("--ignored=matching")
+        result = subprocess.run(
+            command,
+            cwd=repo.working_dir,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"git status failed: {result.stderr.strip()}")
+        return parse_status(result.stdout)
+
+    @property
+    def detached(self) -> bool:
+        return self.branch is None
+
+    @property
+    def staged(self) -> List[str]:
+        """Paths whose index differs from HEAD."""
+        return [entry.path for entry in self.entries if entry.index_status != "."]
+
+    @property
+    def unstaged(self) -> List[str]:
+        """Paths whose working tree differs from the index."""
+        return [entry.path for entry in self.entries if entry.worktree_status != "."]
+
+    @property
+    def is_dirty(self) -> bool:
+        """Whether tracked files have changes, like GitPython's Repo.is_dirty()."""
+        return bool(self.entries or self.conflicted)
+
+
+def parse_status(output: str) -> RepoStatus:
+    """Parses the output of git status --porcelain=v2 -z --branch."""
+    branch: Optional[str] = None
+    head: Optional[str] = None
+    upstream: Optional[str] = None
+    ahead = behind = 0
+    entries: List[StatusEntry] = []
+    conflicted: List[str] = []
+    untracked: List[str] = []
+    ignored: List[str] = []
+
+    records = iter(output.split("\0"))
+    for record in records:
+        if not record:
+            continue
+        kind = record[0]
+        if kind == "#":
+            _, key, value = record.split(" ", 2)
+            if key == "branch.oid" and value != "(initial)":
+                head = value
+            elif key == "branch.head" and value != "(detached)":
+                branch = value
+            elif key == "branch.upstream":
+                upstream = value
+            elif key == "branch.ab":
+                ahead_text, behind_text = value.split(" ")
+                ahead, behind = int(ahead_text), -int(behind_text)
+        elif kind == "1":
+            fields = record.split(" ", 8)
+            entries.append(StatusEntry(fields[8], fields[1][0], fields[1][1]))
+        elif kind == "2":
+            # Renamed or copied entries are followed by their original path
+            fields = record.split(" ", 9)
+            entries.append(
+                StatusEntry(fields[9], fields[1][0], fields[1][1], next(records, None))
+            )
+        elif kind == "u":
+            conflicted.append(record.split(" ", 10)[10])
+        elif kind == "?":
+            untracked.append(record[2:])
+        elif kind == "!":
+            ignored.append(record[2:])
+
+    return RepoStatus(
+        branch=branch,
+        head=head,
+        upstream=upstream,
+        ahead=ahead,
+        behind=behind,
+        entries=tuple(entries),
+        conflicted=tuple(conflicted),
+        untracked=tuple(untracked),
+        ignored=tuple(ignored),
+    )
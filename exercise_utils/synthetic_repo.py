@@ -0,0 +1,92 @@
+"""Synthetic bulk history for measuring how exercise code scales."""
+
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from exercise_utils.repo_spec import DEFAULT_AUTHOR, DEFAULT_DATE, apply_spec
+
+SYNTHETIC_BRANCH_PREFIX = "synthetic"
+
+
+def synthetic_spec(
+    head: str, commits: int, branches: int, files: int
+) -> Dict[str, Any]:
+    """Returns a repo spec that appends the given amount of history to head."""
+    history: List[Dict[str, Any]] = []
+    if files:
+        history.append(
+            {
+                "commit": "Add synthetic files",
+                "branch": head,
+                "files": {
+                    f"synthetic/file-{i}.txt": f"Synthetic file {i}\n"
+                    for i in range(files)
+                },
+            }
+        )
+    for i in range(commits):
+        path = f"synthetic/file-{i % files}.txt" if files else "synthetic.txt"
+        history.append(
+            {
+                "commit": f"Synthetic change {i}",
+                "id": f"synthetic-{i}",
+                "branch": head,
+                "files": {path: f"Synthetic change {i}\n"},
+            }
+        )
+
+    spec_branches: Dict[str, str] = {}
+    for i in range(branches):
+        target = f"synthetic-{i * commits // branches}" if commits else head
+        spec_branches[f"{SYNTHETIC_BRANCH_PREFIX}-{i}"] = target
+
+    return {"head": head, "history": history, "branches": spec_branches}
+
+
+def add_synthetic_history(
+    repo_path: str | Path,
+    commits: int = 0,
+    branches: int = 0,
+    files: int = 0,
+    reflog_entries: int = 0,
+) -> None:
+    """Appends synthetic commits, branches, files and reflog entries.
+
+    The history is added on top of the branch HEAD points to, so anything
+    created afterwards by an exercise setup sits on top of the bulk.
+    """
+    repo_path = Path(repo_path)
+    head = _git(repo_path, ["symbolic-ref", "--short", "HEAD"]).strip()
+    if commits or branches or files:
+        apply_spec(synthetic_spec(head, commits, branches, files), False, repo_path)
+    if reflog_entries:
+        _append_reflog(repo_path, head, reflog_entries)
+
+
+def _append_reflog(repo_path: Path, head: str, entries: int) -> None:
+    tip = _git(repo_path, ["rev-parse", "HEAD"]).strip()
+    timestamp = int(datetime.fromisoformat(DEFAULT_DATE).timestamp())
+    messages = [
+        "commit: Synthetic change",
+        f"checkout: moving from {head} to {SYNTHETIC_BRANCH_PREFIX}-0",
+        f"checkout: moving from {SYNTHETIC_BRANCH_PREFIX}-0 to {head}",
+        "reset: moving to HEAD",
+    ]
+    lines = [
+        f"{tip} {tip} {DEFAULT_AUTHOR} {timestamp + i} +0000\t{messages[i % 4]}\n"
+        for i in range(entries)
+    ]
+
+    logs_path = repo_path / ".git" / "logs"
+    for log_path in [logs_path / "HEAD", logs_path / "refs" / "heads" / head]:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "a") as log_file:
+            log_file.writelines(lines)
+
+
+def _git(repo_path: Path, args: List[str]) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=repo_path, capture_output=True, text=True, check=True
+    ).stdout
@@ -1,8 +1,9 @@
+import inspect
 import json
 import os
 import tempfile
-from contextlib import contextmanager
-from datetime import datetime
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import (
     Any,
@@ -19,7 +20,6 @@ from typing import (
 )
 from unittest import mock
 
-import pytz
 from git import Repo
 from git_autograder import (
     GitAutograderExercise,
@@ -33,8 +33,21 @@ from git_autograder.exercise_config import ExerciseConfig
 from repo_smith.helpers.helper import Helper
 from repo_smith.repo_smith import RepoSmith, create_repo_smith
 
+from exercise_utils.budgets import budget_violations, load_budgets, measure_usage
+from exercise_utils.fake_github import FakeGitHub
+from exercise_utils.fingerprint import RepoFingerprint, fingerprint_repo
+from exercise_utils.profiling import profile
+from exercise_utils.repo_spec import DEFAULT_CACHE_DIR, RepoSpec, apply_spec
+
 """Stores the test utils for exercises."""
 
+EXERCISES_ROOT = Path(__file__).parent.parent
+
+# Set to record the structural fingerprint of every setup so that tests building
+# identical repositories can be found and moved to a shared repo spec
+TRACK_SETUPS_ENV = "GITMASTERY_TRACK_SETUPS"
+SETUP_FINGERPRINTS: Dict[str, List[str]] = {}
+
 
 class GitMasteryHelper(Helper):
     def __init__(self, repo: Repo, verbose: bool) -> None:
@@ -59,12 +72,17 @@ class GitAutograderTest:
         clone_from: Optional[str] = None,
         mock_answers: Optional[Dict[str, str]] = None,
         include_remote_repo: bool = False,
+        spec: Optional[str | Path | RepoSpec] = None,
     ) -> None:
         self.exercise_name = exercise_name
         self.grade_func = grade_func
         self.clone_from = clone_from
         self.mock_answers = mock_answers
         self.include_remote_repo = include_remote_repo
+        # Spec paths are resolved before the test changes into the repo
+        self.spec = Path(spec).absolute() if isinstance(spec, (str, Path)) else spec
+        self.spec_commits: Dict[str, str] = {}
+        self.budgets = load_budgets(EXERCISES_ROOT / exercise_name.replace("-", "_"))
         self.__rs: Optional[RepoSmith] = None
         self.__rs_remote: Optional[RepoSmith] = None
         self.__rs_context: Optional[ContextManager[RepoSmith]] = None
@@ -82,41 +100,78 @@ class GitAutograderTest:
     def rs_remote(self) -> Optional[RepoSmith]:
         return self.__rs_remote
 
+    def fingerprint(self, structural: bool = False) -> RepoFingerprint:
+        """Returns the fingerprint of the exercise repository."""
+        return fingerprint_repo(Path(self.rs.repo.working_dir), structural=structural)
+
     def run(self) -> GitAutograderOutput:
+        if os.environ.get(TRACK_SETUPS_ENV):
+            self.__track_setup()
+
         output: Optional[GitAutograderOutput] = None
-        started_at = datetime.now(tz=pytz.UTC)
-        try:
-            assert self.__temp_dir is not None
-            autograder = GitAutograderExercise(exercise_path=self.__temp_dir.name)
-            output = self.grade_func(autograder)
-        except (
-            GitAutograderInvalidStateException,
-            GitAutograderWrongAnswerException,
-        ) as e:
-            output = GitAutograderOutput(
-                exercise_name=self.exercise_name,
-                started_at=started_at,
-                completed_at=datetime.now(tz=pytz.UTC),
-                comments=[e.message] if isinstance(e.message, str) else e.message,
-                status=(
-                    GitAutograderStatus.ERROR
-                    if isinstance(e, GitAutograderInvalidStateException)
-                    else GitAutograderStatus.UNSUCCESSFUL
-                ),
-            )
-        except Exception as e:
-            # Unexpected exception
-            output = GitAutograderOutput(
-                exercise_name=self.exercise_name,
-                started_at=None,
-                completed_at=None,
-                comments=[str(e)],
-                status=GitAutograderStatus.ERROR,
-            )
+        started_at = datetime.now(tz=timezone.utc)
+        # Usage is only measured for exercises that declare budgets as tracing
+        # memory slows the verification down
+        with measure_usage() if not self.budgets.is_empty() else nullcontext() as usage:
+            try:
+                assert self.__temp_dir is not None
+                autograder = GitAutograderExercise(exercise_path=self.__temp_dir.name)
+                # Profiles are kept next to verify.py, as the temporary
+                # exercise folder is deleted, with one per test
+                test_id = os.environ.get("PYTEST_CURRENT_TEST", "").split(" ")[0]
+                phase = f"verify-{test_id.rpartition('::')[2]}".rstrip("-")
+                verify_path = inspect.getsourcefile(self.grade_func)
+                with profile(phase, Path(verify_path or ".").parent):
+                    output = self.grade_func(autograder)
+            except (
+                GitAutograderInvalidStateException,
+                GitAutograderWrongAnswerException,
+            ) as e:
+                output = GitAutograderOutput(
+                    exercise_name=self.exercise_name,
+                    started_at=started_at,
+                    completed_at=datetime.now(tz=timezone.utc),
+                    comments=[e.message] if isinstance(e.message, str) else e.message,
+                    status=(
+                        GitAutograderStatus.ERROR
+                        if isinstance(e, GitAutograderInvalidStateException)
+                        else GitAutograderStatus.UNSUCCESSFUL
+                    ),
+                )
+            except Exception as e:
+                # Unexpected exception
+                output = GitAutograderOutput(
+                    exercise_name=self.exercise_name,
+                    started_at=None,
+                    completed_at=None,
+                    comments=[str(e)],
+                    status=GitAutograderStatus.ERROR,
+                )
+
+        if usage is not None:
+            violations = budget_violations(self.budgets, usage, "verify")
+            if violations:
+                raise AssertionError(
+                    f"{self.exercise_name} exceeded its budgets: "
+                    + "; ".join(violations)
+                )
 
         assert output is not None
         return output
 
+    def __track_setup(self) -> None:
+        try:
+            fingerprint = self.fingerprint(structural=True)
+        except RuntimeError:
+            # Some exercises remove the repository entirely as part of the setup
+            return
+        if not fingerprint.refs:
+            return
+        test_id = os.environ.get("PYTEST_CURRENT_TEST", self.exercise_name)
+        SETUP_FINGERPRINTS.setdefault(fingerprint.digest, []).append(
+            test_id.split(" ")[0]
+        )
+
     def __enter__(self) -> Tuple[Self, RepoSmith, RepoSmith | None]:
         # We will mock all accesses to the config to avoid reading the file itself
         # Only the exercise name and repo_name matters, everything else isn't used
@@ -189,6 +244,11 @@ class GitAutograderTest:
         self.__rs = self.__rs_context.__enter__()
         self.__rs.add_helper(GitMasteryHelper)
 
+        if self.spec is not None:
+            self.spec_commits = apply_spec(
+                self.spec, False, repo_path=repo_path, cache_dir=DEFAULT_CACHE_DIR
+            )
+
         if self.include_remote_repo:
             self.__remote_temp_dir = tempfile.TemporaryDirectory()
             remote_temp_path = Path(self.__remote_temp_dir.name)
@@ -245,6 +305,7 @@ class GitAutograderTestLoader:
         clone_from: Optional[str] = None,
         mock_answers: Optional[Dict[str, str]] = None,
         include_remote_repo: Literal[False] = False,
+        spec: Optional[str | Path | RepoSpec] = None,
     ) -> ContextManager[Tuple[GitAutograderTest, RepoSmith]]: ...
 
     @overload
@@ -254,6 +315,7 @@ class GitAutograderTestLoader:
         mock_answers: Optional[Dict[str, str]] = None,
         *,
         include_remote_repo: Literal[True],
+        spec: Optional[str | Path | RepoSpec] = None,
     ) -> ContextManager[Tuple[GitAutograderTest, RepoSmith, RepoSmith]]: ...
 
     @contextmanager
@@ -262,6 +324,7 @@ class GitAutograderTestLoader:
         clone_from: Optional[str] = None,
         mock_answers: Optional[Dict[str, str]] = None,
         include_remote_repo: bool = False,
+        spec: Optional[str | Path | RepoSpec] = None,
     ) -> Iterator[Any]:
         test = GitAutograderTest(
             self.exercise_name,
@@ -269,6 +332,7 @@ class GitAutograderTestLoader:
             clone_from,
             mock_answers,
             include_remote_repo,
+            spec,
         )
         if include_remote_repo:
             with test as (ctx, rs, rs_remote):
@@ -295,6 +359,7 @@ class GitAutograderTestLoader:
         pr_number: Optional[int] = None,
         pr_repo_full_name: Optional[str] = None,
         downloaded_at: Optional[str] = None,
+        github: Optional[FakeGitHub] = None,
     ) -> Iterator[GitAutograderExercise]:
         with tempfile.TemporaryDirectory() as temp_dir:
             exercise_path = Path(temp_dir)
@@ -334,16 +399,24 @@ class GitAutograderTestLoader:
             with open(exercise_path / ".gitmastery-exercise.json", "w") as f:
                 json.dump(config, f)
 
-            if has_pr_context:
-                with mock.patch(
-                    "git_autograder.pr.fetch_pull_request_data",
-                    return_value={},
-                ):
+            if github is None and has_pr_context:
+                # An open PR without any activity stands in for the PR context
+                github = FakeGitHub()
+                github.add_pr(str(pr_repo_full_name), number=pr_number)
+
+            if github is not None:
+                # PR data and gh PR commands are served from the fake instead
+                with github.patch():
                     yield GitAutograderExercise(exercise_path=exercise_path)
             else:
                 yield GitAutograderExercise(exercise_path=exercise_path)
 
 
+def duplicate_setups() -> List[List[str]]:
+    """Returns the groups of tracked tests whose setups were identical."""
+    return [tests for tests in SETUP_FINGERPRINTS.values() if len(tests) > 1]
+
+
 def assert_output(
     output: GitAutograderOutput,
     expected_status: GitAutograderStatus,
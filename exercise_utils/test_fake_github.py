@@ -0,0 +1,211 @@
+from typing import ContextManager
+
+import pytest
+from git_autograder import (
+    GitAutograderExercise,
+    GitAutograderInvalidStateException,
+    GitAutograderOutput,
+    GitAutograderWrongAnswerException,
+)
+from git_autograder.status import GitAutograderStatus
+
+from exercise_utils import github_cli
+from exercise_utils.fake_github import FakeGitHub
+from exercise_utils.test import GitAutograderTestLoader, assert_output
+
+REPOSITORY_NAME = "pr-review"
+PR_REPO_FULL_NAME = "git-mastery/samplerepo-pr-review"
+
+NO_REVIEW = "You have not reviewed the pull request yet!"
+CHANGES_NOT_REQUESTED = "Request changes on the pull request, as the tests fail."
+NO_REPLY = "Reply to Bob's comment on the pull request."
+SUCCESS_MESSAGE = "Great work reviewing Bob's pull request!"
+
+
+# A verify in the style of a PR review exercise, where only the work of the student
+# counts and the scripted teammate marks their comments with a role
+def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
+    pr = exercise.repo.prs.pr
+
+    if not pr.user_reviews:
+        raise exercise.wrong_answer([NO_REVIEW])
+
+    if pr.last_user_review.state != "CHANGES_REQUESTED":
+        raise exercise.wrong_answer([CHANGES_NOT_REQUESTED])
+
+    if not pr.user_comments:
+        raise exercise.wrong_answer([NO_REPLY])
+
+    return exercise.to_output([SUCCESS_MESSAGE], GitAutograderStatus.SUCCESSFUL)
+
+
+loader = GitAutograderTestLoader(REPOSITORY_NAME, verify)
+
+
+def build_github() -> FakeGitHub:
+    return FakeGitHub.from_dict(
+        {
+            "username": "student",
+            "repos": {
+                PR_REPO_FULL_NAME: [
+                    {
+                        "number": 1,
+                        "title": "Add search",
+                        "head": "feature-search",
+                        "author": "bob",
+                        "role": "teammate-bob",
+                        "comments": [
+                            {"body": "Ready for review", "role": "teammate-bob"},
+                        ],
+                    },
+                    {
+                        "number": 2,
+                        "title": "Fix typo",
+                        "head": "fix-typo",
+                        "state": "merged",
+                        "reviews": [
+                            {"body": "LGTM", "state": "APPROVED", "author": "bob"},
+                        ],
+                    },
+                ]
+            },
+        }
+    )
+
+
+def start_review(github: FakeGitHub) -> ContextManager[GitAutograderExercise]:
+    return loader.start_mock_exercise(
+        has_pr_context=True,
+        pr_number=1,
+        pr_repo_full_name=PR_REPO_FULL_NAME,
+        github=github,
+    )
+
+
+def test_base():
+    github = build_github()
+    github.add_review(PR_REPO_FULL_NAME, 1, "The tests fail", state="CHANGES_REQUESTED")
+    github.add_comment(PR_REPO_FULL_NAME, 1, "Thanks, I will take a look")
+    with start_review(github) as exercise:
+        output = verify(exercise)
+        assert_output(output, GitAutograderStatus.SUCCESSFUL, [SUCCESS_MESSAGE])
+
+
+def test_no_review():
+    with (
+        start_review(build_github()) as exercise,
+        pytest.raises(GitAutograderWrongAnswerException) as exception,
+    ):
+        verify(exercise)
+
+    assert exception.value.message == [NO_REVIEW]
+
+
+def test_teammate_review_not_counted():
+    github = build_github()
+    github.add_review(
+        PR_REPO_FULL_NAME,
+        1,
+        "Changes needed",
+        state="CHANGES_REQUESTED",
+        author="bob",
+        role="teammate-bob",
+    )
+    with (
+        start_review(github) as exercise,
+        pytest.raises(GitAutograderWrongAnswerException) as exception,
+    ):
+        verify(exercise)
+
+    assert exception.value.message == [NO_REVIEW]
+
+
+def test_latest_review_approves():
+    github = build_github()
+    github.add_review(PR_REPO_FULL_NAME, 1, "The tests fail", state="CHANGES_REQUESTED")
+    github.add_review(PR_REPO_FULL_NAME, 1, "Fine by me", state="APPROVED")
+    with (
+        start_review(github) as exercise,
+        pytest.raises(GitAutograderWrongAnswerException) as exception,
+    ):
+        verify(exercise)
+
+    assert exception.value.message == [CHANGES_NOT_REQUESTED]
+
+
+def test_no_reply():
+    github = build_github()
+    github.add_review(PR_REPO_FULL_NAME, 1, "The tests fail", state="CHANGES_REQUESTED")
+    with (
+        start_review(github) as exercise,
+        pytest.raises(GitAutograderWrongAnswerException) as exception,
+    ):
+        verify(exercise)
+
+    assert exception.value.message == [NO_REPLY]
+
+
+def test_missing_pr():
+    with (
+        pytest.raises(GitAutograderInvalidStateException),
+        loader.start_mock_exercise(
+            has_pr_context=True,
+            pr_number=3,
+            pr_repo_full_name=PR_REPO_FULL_NAME,
+            github=build_github(),
+        ),
+    ):
+        pass
+
+
+def test_default_pr_context():
+    with loader.start_mock_exercise(has_pr_context=True) as exercise:
+        pr = exercise.repo.prs.pr
+        assert pr.number == 1
+        assert pr.is_open()
+        assert pr.comments == []
+
+
+def test_github_cli_pr_functions():
+    github = build_github()
+    with github.patch():
+        assert github_cli.get_github_username(False) == "student"
+        assert [
+            pr["number"] for pr in github_cli.list_prs("all", PR_REPO_FULL_NAME, False)
+        ] == [2, 1]
+        assert [
+            pr["number"] for pr in github_cli.list_prs("open", PR_REPO_FULL_NAME, False)
+        ] == [1]
+
+        number = github_cli.create_pr(
+            "Add tests", "Covers search", "main", "add-tests", PR_REPO_FULL_NAME, False
+        )
+        assert number == 3
+        assert (
+            github_cli.get_latest_pr_number_by_author(
+                "student", PR_REPO_FULL_NAME, False
+            )
+            == 3
+        )
+
+        assert github_cli.comment_on_pr(1, "Looks close", PR_REPO_FULL_NAME, False)
+        assert github_cli.review_pr(
+            1, "Please add tests", "request-changes", PR_REPO_FULL_NAME, False
+        )
+        pr = github_cli.view_pr(1, PR_REPO_FULL_NAME, False)
+        assert pr["author"] == {"login": "bob"}
+        assert pr["title"] == "[ROLE:teammate-bob] Add search"
+        assert [comment["body"] for comment in pr["comments"]] == [
+            "[ROLE:teammate-bob] Ready for review",
+            "Looks close",
+        ]
+        assert [review["state"] for review in pr["reviews"]] == ["CHANGES_REQUESTED"]
+
+        assert github_cli.merge_pr(3, "squash", PR_REPO_FULL_NAME)
+        assert not github_cli.merge_pr(3, "squash", PR_REPO_FULL_NAME)
+        assert github_cli.close_pr(1, PR_REPO_FULL_NAME, comment="Superseded")
+        states = {
+            pr["number"]: pr["state"]
+            for pr in github_cli.list_prs("all", PR_REPO_FULL_NAME, False)
+        }
+        assert states == {1: "CLOSED", 2: "MERGED", 3: "MERGED"}
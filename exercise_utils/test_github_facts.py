@@ -0,0 +1,163 @@
+import json
+import os
+from subprocess import CompletedProcess
+from typing import Any, Dict, Iterator, List
+from unittest import mock
+
+import pytest
+from git_autograder import GitAutograderExercise, GitAutograderOutput
+from git_autograder.status import GitAutograderStatus
+
+from exercise_utils.cli import CommandResult
+from exercise_utils.github_facts import (
+    GitHubFacts,
+    GitHubRepoFacts,
+    _build_query,
+    _parse_repo,
+    github_facts,
+)
+from exercise_utils.grading import grade
+from exercise_utils.test import GitAutograderTestLoader
+from exercise_utils.verify_cache import CACHE_ENABLED_ENV
+
+FORK = {
+    "isFork": True,
+    "visibility": "PUBLIC",
+    "parent": {"owner": {"login": "git-mastery"}},
+}
+
+
+def gh_result(stdout: str, returncode: int = 0, stderr: str = "") -> CommandResult:
+    return CommandResult(
+        result=CompletedProcess(["gh"], returncode, stdout=stdout, stderr=stderr)
+    )
+
+
+def gh_json(data: Dict[str, Any], errors: List[Dict[str, Any]] = []) -> str:
+    response: Dict[str, Any] = {"data": data}
+    if errors:
+        response["errors"] = errors
+    return json.dumps(response)
+
+
+@pytest.fixture(autouse=True)
+def fresh_facts() -> Iterator[None]:
+    github_facts.cache_clear()
+    yield
+    github_facts.cache_clear()
+
+
+def test_build_query_without_repos():
+    assert _build_query(()) == "query { viewer { login } }"
+
+
+def test_build_query_passes_names_as_variables():
+    query = _build_query(("gm-shapes", "gm-dummy"))
+    assert query.startswith("query($repo0: String!, $repo1: String!) {")
+    assert "repo0: repository(name: $repo0)" in query
+    assert "repo1: repository(name: $repo1)" in query
+    assert "gm-shapes" not in query
+
+
+def test_parse_repo():
+    assert _parse_repo("gm-shapes", FORK) == GitHubRepoFacts(
+        name="gm-shapes",
+        exists=True,
+        is_fork=True,
+        parent_owner="git-mastery",
+        visibility="PUBLIC",
+    )
+
+
+def test_parse_repo_not_a_fork():
+    raw = {"isFork": False, "visibility": "PRIVATE", "parent": None}
+    assert _parse_repo("notes", raw) == GitHubRepoFacts(
+        name="notes", exists=True, visibility="PRIVATE"
+    )
+
+
+def test_parse_missing_repo():
+    assert _parse_repo("gm-shapes", None) == GitHubRepoFacts("gm-shapes")
+
+
+def test_github_facts():
+    stdout = gh_json({"viewer": {"login": "alice", "repo0": FORK}})
+    with mock.patch(
+        "exercise_utils.github_facts.run", return_value=gh_result(stdout)
+    ) as run:
+        facts = github_facts("gm-shapes")
+        assert github_facts("gm-shapes") is facts
+
+    assert run.call_count == 1
+    command = run.call_args.args[0]
+    assert command[:3] == ["gh", "api", "graphql"]
+    assert command[-2:] == ["-f", "repo0=gm-shapes"]
+    assert facts.username == "alice"
+    assert facts.repo("gm-shapes").is_fork
+    assert facts.repo("gm-shapes").parent_owner == "git-mastery"
+    assert facts.repo("other") == GitHubRepoFacts("other")
+
+
+def test_partial_data_with_errors():
+    # gh exits with an error when a repository is missing, but still prints the rest
+    stdout = gh_json(
+        {"viewer": {"login": "alice", "repo0": FORK, "repo1": None}},
+        errors=[{"type": "NOT_FOUND", "path": ["viewer", "repo1"]}],
+    )
+    with mock.patch(
+        "exercise_utils.github_facts.run",
+        return_value=gh_result(stdout, returncode=1),
+    ):
+        facts = github_facts("gm-shapes", "gm-missing")
+
+    assert facts.username == "alice"
+    assert facts.repo("gm-shapes").exists
+    assert facts.repo("gm-missing") == GitHubRepoFacts("gm-missing")
+
+
+def test_missing_gh():
+    with mock.patch(
+        "exercise_utils.github_facts.run",
+        return_value=gh_result("", returncode=127, stderr="Command not found: gh"),
+    ):
+        facts = github_facts("gm-shapes")
+
+    assert facts == GitHubFacts()
+    assert facts.username is None
+    assert not facts.repo("gm-shapes").exists
+
+
+def test_not_logged_in():
+    with mock.patch(
+        "exercise_utils.github_facts.run",
+        return_value=gh_result(
+            gh_json({}, errors=[{"message": "Bad credentials"}]), returncode=1
+        ),
+    ):
+        facts = github_facts("gm-shapes")
+
+    assert facts.username is None
+    assert not facts.repo("gm-shapes").exists
+
+
+def verify_username(exercise: GitAutograderExercise) -> GitAutograderOutput:
+    username = github_facts().username
+    return exercise.to_output([str(username)], GitAutograderStatus.SUCCESSFUL)
+
+
+def test_grade_fetches_fresh_facts():
+    loader = GitAutograderTestLoader("github-facts", verify_username)
+    with (
+        loader.start_mock_exercise() as exercise,
+        mock.patch.dict(os.environ, {CACHE_ENABLED_ENV: "0"}),
+    ):
+        comments = []
+        for username in ["alice", "bob"]:
+            stdout = gh_json({"viewer": {"login": username}})
+            with mock.patch(
+                "exercise_utils.github_facts.run", return_value=gh_result(stdout)
+            ):
+                output = grade(exercise.exercise_path, verify_username)
+            comments.extend(output.comments)
+
+    assert comments == ["alice", "bob"]
@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+from git import Repo
+from git_autograder import GitAutograderExercise, GitAutograderOutput
+from git_autograder.status import GitAutograderStatus
+
+from exercise_utils.grading import grade
+from exercise_utils.test import GitAutograderTestLoader, assert_output
+from exercise_utils.verify_cache import CACHE_ENABLED_ENV
+
+REPO_NAME = "repo"
+
+
+def verify_branches(exercise: GitAutograderExercise) -> GitAutograderOutput:
+    branches = [branch.name for branch in exercise.repo.repo.branches]
+    return exercise.to_output(branches, GitAutograderStatus.SUCCESSFUL)
+
+
+loader = GitAutograderTestLoader("grading", verify_branches)
+
+
+def test_grade_reads_through_open_repo():
+    with (
+        loader.start_mock_exercise(repo_name=REPO_NAME, requires_github=False) as e,
+        mock.patch.dict(os.environ, {CACHE_ENABLED_ENV: "0"}),
+    ):
+        repo_path = Path(e.exercise_path) / REPO_NAME
+        opened = Repo(repo_path)
+        opened.git.commit(message="Start", allow_empty=True)
+        repos: List[Repo] = []
+
+        def open_repo(path: str | os.PathLike) -> Repo:
+            assert Path(path) == repo_path
+            return opened
+
+        def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
+            repos.append(exercise.repo.repo)
+            assert exercise.repo.branches.repo is opened
+            return verify_branches(exercise)
+
+        first = grade(e.exercise_path, verify, open_repo=open_repo)
+        opened.git.branch("feature")
+        second = grade(e.exercise_path, verify, open_repo=open_repo)
+        opened.close()
+
+    assert repos == [opened, opened]
+    assert_output(first, GitAutograderStatus.SUCCESSFUL, ["main"])
+    assert_output(second, GitAutograderStatus.SUCCESSFUL, ["feature", "main"])
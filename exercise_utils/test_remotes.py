@@ -0,0 +1,115 @@
+import tempfile
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import pytest
+from git import Repo
+
+from exercise_utils.remotes import (
+    RemoteRefs,
+    RemoteSnapshot,
+    fetch_refs,
+    parse_ls_remote,
+)
+
+COMMIT_SHA = "1" * 40
+TAG_OBJECT_SHA = "2" * 40
+OTHER_SHA = "3" * 40
+
+
+@pytest.fixture
+def repos() -> Iterator[Tuple[Repo, Repo]]:
+    """A repository whose origin is a local bare remote with an annotated tag."""
+    with tempfile.TemporaryDirectory() as path:
+        remote = Repo.init(Path(path) / "remote.git", bare=True, initial_branch="main")
+        repo = Repo.init(Path(path) / "repo", initial_branch="main")
+        repo.git.config("user.name", "Test")
+        repo.git.config("user.email", "test@example.com")
+        repo.git.commit(message="Start", allow_empty=True)
+        repo.git.tag("v1.0", annotate=True, message="First release")
+        repo.git.branch("feature")
+        repo.git.commit(message="Next", allow_empty=True)
+        repo.git.tag("latest")
+        repo.git.remote("add", "origin", remote.git_dir)
+        repo.git.push("origin", "main", "feature", "--tags")
+        yield repo, remote
+        repo.close()
+        remote.close()
+
+
+def test_parse_ls_remote():
+    output = "\n".join(
+        [
+            f"{COMMIT_SHA}\trefs/heads/main",
+            f"{OTHER_SHA}\trefs/heads/feature/login",
+            f"{TAG_OBJECT_SHA}\trefs/tags/v1.0",
+            f"{COMMIT_SHA}\trefs/tags/v1.0^{{}}",
+            f"{OTHER_SHA}\trefs/tags/latest",
+        ]
+    )
+    assert parse_ls_remote("origin", output) == RemoteRefs(
+        remote="origin",
+        heads={"main": COMMIT_SHA, "feature/login": OTHER_SHA},
+        tags={"v1.0": COMMIT_SHA, "latest": OTHER_SHA},
+    )
+
+
+def test_parse_ls_remote_ignores_stray_peeled_tags():
+    output = f"{COMMIT_SHA}\trefs/tags/v2.0^{{}}\n"
+    assert parse_ls_remote("origin", output).tags == {}
+
+
+def test_parse_empty_ls_remote():
+    assert parse_ls_remote("origin", "") == RemoteRefs(remote="origin")
+
+
+def test_snapshot_peels_annotated_tags(repos: Tuple[Repo, Repo]):
+    repo, remote = repos
+    snapshot = RemoteSnapshot(repo)
+
+    assert snapshot.heads("origin") == {
+        "main": repo.commit("main").hexsha,
+        "feature": repo.commit("feature").hexsha,
+    }
+    tag_object = remote.git.rev_parse("refs/tags/v1.0")
+    assert tag_object != repo.commit("feature").hexsha
+    assert snapshot.tags("origin") == {
+        "v1.0": repo.commit("feature").hexsha,
+        "latest": repo.commit("main").hexsha,
+    }
+
+
+def test_snapshot_lists_each_remote_once(repos: Tuple[Repo, Repo]):
+    repo, remote = repos
+    snapshot = RemoteSnapshot.load(repo)
+    assert list(snapshot.remotes) == ["origin"]
+
+    # The answer is kept even after the remote changes
+    repo.git.push("origin", ":feature")
+    assert "feature" in snapshot.heads("origin")
+    assert "feature" not in RemoteSnapshot(repo).heads("origin")
+
+
+def test_snapshot_missing_remote(repos: Tuple[Repo, Repo]):
+    repo, _ = repos
+    with pytest.raises(RuntimeError):
+        RemoteSnapshot(repo).heads("upstream")
+
+
+def test_fetch_refs_only_fetches_given_branches(repos: Tuple[Repo, Repo]):
+    repo, remote = repos
+    with tempfile.TemporaryDirectory() as path:
+        clone = Repo.init(path, initial_branch="main")
+        clone.git.remote("add", "origin", remote.git_dir)
+
+        fetch_refs(clone, "origin", ["main"])
+
+        assert [ref.path for ref in clone.refs] == ["refs/remotes/origin/main"]
+        assert clone.commit("origin/main").hexsha == repo.commit("main").hexsha
+        clone.close()
+
+
+def test_fetch_refs_missing_branch(repos: Tuple[Repo, Repo]):
+    repo, _ = repos
+    with pytest.raises(RuntimeError):
+        fetch_refs(repo, "origin", ["missing"])
@@ -0,0 +1,54 @@
+import tempfile
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from git import Repo
+
+from exercise_utils.revision_files import RevisionFileReader
+
+
+@pytest.fixture
+def repo() -> Iterator[Repo]:
+    with tempfile.TemporaryDirectory() as path:
+        repo = Repo.init(path, initial_branch="main")
+        repo.git.config("user.name", "Test")
+        repo.git.config("user.email", "test@example.com")
+        (Path(path) / "notes.txt").write_text("main\n")
+        repo.git.add(all=True)
+        repo.git.commit(message="Add notes")
+        repo.git.tag("care")
+
+        repo.git.checkout("care", b=True)
+        (Path(path) / "notes.txt").write_text("care\n\nwater daily\n")
+        repo.git.commit(all=True, message="Edit notes")
+        repo.git.checkout("main")
+        yield repo
+        repo.close()
+
+
+def test_branch_preferred_over_tag(repo: Repo):
+    files = RevisionFileReader(repo)
+    assert files.read_text("care", "notes.txt") == "care\n\nwater daily\n"
+    assert files.read_lines("care", "notes.txt") == ["care", "water daily"]
+
+
+def test_full_ref(repo: Repo):
+    files = RevisionFileReader(repo)
+    assert files.read_text("refs/tags/care", "notes.txt") == "main\n"
+    assert files.read_text("refs/heads/care", "notes.txt") == "care\n\nwater daily\n"
+
+
+def test_tag_and_sha(repo: Repo):
+    repo.git.tag("v1.0", "refs/heads/care")
+    files = RevisionFileReader(repo)
+    assert files.read_text("v1.0", "notes.txt") == "care\n\nwater daily\n"
+    assert files.read_text(repo.head.commit.hexsha, "notes.txt") == "main\n"
+    assert files.read_text("HEAD~0", "notes.txt") == "main\n"
+
+
+def test_missing_file(repo: Repo):
+    files = RevisionFileReader(repo)
+    assert files.read_bytes("main", "missing.txt") is None
+    with files.open("main", "missing.txt") as file:
+        assert file is None
@@ -0,0 +1,155 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+from unittest import mock
+
+from git import Repo
+from git_autograder import GitAutograderExercise, GitAutograderOutput
+from git_autograder.status import GitAutograderStatus
+
+from branch_rename.verify import NO_RENAME_EVIDENCE_FEATURE_LOGIN, verify
+from exercise_utils.grading import grade
+from exercise_utils.test import GitAutograderTestLoader, assert_output
+from exercise_utils.verify_cache import CACHE_DIR_ENV, CACHE_ENABLED_ENV
+
+REPOSITORY_NAME = "branch-rename"
+REPO_NAME = "rename-this"
+
+loader = GitAutograderTestLoader(REPOSITORY_NAME, verify)
+
+
+class CountingVerify:
+    """Runs the branch_rename verify and counts how often it really ran."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def verify(self, exercise: GitAutograderExercise) -> GitAutograderOutput:
+        self.calls += 1
+        return verify(exercise)
+
+
+@contextmanager
+def start_exercise(
+    verify_cache: Dict[str, Any] | None = None,
+) -> Iterator[Tuple[Path, Repo, CountingVerify]]:
+    with (
+        loader.start_mock_exercise(repo_name=REPO_NAME, requires_github=False) as e,
+        tempfile.TemporaryDirectory() as cache_dir,
+        mock.patch.dict(os.environ, {CACHE_DIR_ENV: cache_dir}),
+    ):
+        exercise_path = Path(e.exercise_path)
+        if verify_cache is not None:
+            config_path = exercise_path / ".gitmastery-exercise.json"
+            config = json.loads(config_path.read_text())
+            config["verify_cache"] = verify_cache
+            config_path.write_text(json.dumps(config))
+        repo = Repo(exercise_path / REPO_NAME)
+        repo.git.commit(message="Empty", allow_empty=True)
+        repo.git.branch("login")
+        repo.git.branch("-m", "login", "feature/login")
+        yield exercise_path, repo, CountingVerify()
+        repo.close()
+
+
+def grade_times(
+    exercise_path: Path, counting_verify: CountingVerify, times: int
+) -> List[GitAutograderOutput]:
+    return [grade(exercise_path, counting_verify.verify) for _ in range(times)]
+
+
+def test_hit_on_unchanged_state():
+    with start_exercise() as (exercise_path, _, counting_verify):
+        first, second = grade_times(exercise_path, counting_verify, 2)
+        assert counting_verify.calls == 1
+        assert_output(first, GitAutograderStatus.SUCCESSFUL)
+        assert_output(second, GitAutograderStatus.SUCCESSFUL)
+        assert second.comments == first.comments
+
+
+def test_miss_after_ref_change():
+    with start_exercise() as (exercise_path, repo, counting_verify):
+        grade(exercise_path, counting_verify.verify)
+        repo.git.branch("login")
+        output = grade(exercise_path, counting_verify.verify)
+        assert counting_verify.calls == 2
+        assert_output(output, GitAutograderStatus.UNSUCCESSFUL)
+
+
+def test_miss_after_index_change():
+    with start_exercise() as (exercise_path, repo, counting_verify):
+        grade(exercise_path, counting_verify.verify)
+        (exercise_path / REPO_NAME / "notes.txt").write_text("Renamed\n")
+        grade(exercise_path, counting_verify.verify)
+        repo.git.add("notes.txt")
+        grade(exercise_path, counting_verify.verify)
+        assert counting_verify.calls == 3
+
+
+def test_miss_after_answers_change():
+    with start_exercise() as (exercise_path, _, counting_verify):
+        grade(exercise_path, counting_verify.verify)
+        (exercise_path / "answers.txt").write_text("Q: Why?\nA: Because\n")
+        grade(exercise_path, counting_verify.verify)
+        assert counting_verify.calls == 2
+
+
+def test_miss_after_reflog_change():
+    with start_exercise() as (exercise_path, repo, counting_verify):
+        repo.git.branch("-m", "feature/login", "feature/logi")
+        repo.git.branch("feature/login")
+        repo.git.branch("-D", "feature/logi")
+        output = grade(exercise_path, counting_verify.verify)
+        assert_output(
+            output, GitAutograderStatus.UNSUCCESSFUL, [NO_RENAME_EVIDENCE_FEATURE_LOGIN]
+        )
+
+        # Every ref ends where it was, and only the reflogs record the rename
+        repo.git.branch("-m", "feature/login", "login")
+        repo.git.branch("-m", "login", "feature/login")
+        output = grade(exercise_path, counting_verify.verify)
+        assert counting_verify.calls == 2
+        assert_output(output, GitAutograderStatus.SUCCESSFUL)
+
+
+def test_wrong_answer_replayed():
+    with start_exercise() as (exercise_path, repo, counting_verify):
+        repo.git.branch("login")
+        first, second = grade_times(exercise_path, counting_verify, 2)
+        assert counting_verify.calls == 1
+        assert_output(first, GitAutograderStatus.UNSUCCESSFUL)
+        assert_output(second, GitAutograderStatus.UNSUCCESSFUL, first.comments or [])
+
+
+def test_ttl_expiry():
+    with (
+        start_exercise({"ttl_seconds": 30}) as (exercise_path, _, counting_verify),
+        mock.patch("exercise_utils.verify_cache.time") as clock,
+    ):
+        clock.time.return_value = 1000.0
+        grade(exercise_path, counting_verify.verify)
+        clock.time.return_value = 1020.0
+        grade(exercise_path, counting_verify.verify)
+        assert counting_verify.calls == 1
+
+        clock.time.return_value = 1031.0
+        grade(exercise_path, counting_verify.verify)
+        assert counting_verify.calls == 2
+
+
+def test_disabled_in_config():
+    with start_exercise({"enabled": False}) as (exercise_path, _, counting_verify):
+        grade_times(exercise_path, counting_verify, 2)
+        assert counting_verify.calls == 2
+
+
+def test_disabled_by_environment():
+    with (
+        start_exercise() as (exercise_path, _, counting_verify),
+        mock.patch.dict(os.environ, {CACHE_ENABLED_ENV: "0"}),
+    ):
+        grade_times(exercise_path, counting_verify, 2)
+        assert counting_verify.calls == 2
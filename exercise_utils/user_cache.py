@@ -0,0 +1,16 @@
+"""Per-user cache folders, kept out of the shared temporary directory.
+
+Caches that later runs trust, such as the exercise manifest or cached verify
+results, must not be somewhere another user of the machine can write to:
+
+    cache_dir = user_cache_dir("registry")  # ~/.cache/gitmastery/registry
+"""
+
+import os
+from pathlib import Path
+
+
+def user_cache_dir(name: str) -> Path:
+    """Returns the named cache folder under $XDG_CACHE_HOME, or ~/.cache."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "gitmastery" / name
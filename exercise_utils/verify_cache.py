@@ -0,0 +1,249 @@
+"""Reuses the result of a verify when nothing it depends on has changed.
+
+Students often run verify several times without changing anything. Wrapping
+the call in cached_verify stores its result, keyed by the exercise folder, a
+hash of verify.py and the fingerprint of the exercise repository (HEAD, refs,
+index and working tree) together with its reflogs, answers.txt and the exercise
+config:
+
+    exercise = GitAutograderExercise(exercise_path=exercise_dir)
+    output = cached_verify(exercise, verify)
+
+exercise_utils.grading.grade, and so the batch grader and grading daemon,
+verify through it.
+
+The wrong answer and invalid state exceptions raised by a verify are cached and
+raised again, so callers handle a cached result exactly like a fresh one. Only
+the latest result of each exercise is kept.
+
+Exercises whose result also depends on state outside of the repository, such as
+a GitHub repository or a remote, can opt out or expire results early in
+.gitmastery-exercise.json:
+
+    "verify_cache": {
+      "enabled": true,
+      "ttl_seconds": 30
+    }
+
+Exercises without a repository of their own are never cached. Setting
+GITMASTERY_VERIFY_CACHE=0 disables the cache everywhere.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from git_autograder import (
+    GitAutograderExercise,
+    GitAutograderInvalidStateException,
+    GitAutograderOutput,
+    GitAutograderStatus,
+    GitAutograderWrongAnswerException,
+)
+
+from exercise_utils.exercise_config import EXERCISE_CONFIG_FILE_NAME
+from exercise_utils.fingerprint import fingerprint_repo, git_dir, hash_blob
+from exercise_utils.user_cache import user_cache_dir
+
+VERIFY_CACHE_KEY = "verify_cache"
+CACHE_DIR_ENV = "GITMASTERY_VERIFY_CACHE_DIR"
+CACHE_ENABLED_ENV = "GITMASTERY_VERIFY_CACHE"
+ANSWERS_FILE_NAME = "answers.txt"
+
+# Repository types where the repository is not part of the exercise state
+_UNCACHED_REPO_TYPES = {"ignore", "local-ignore"}
+
+_EXCEPTIONS = {
+    "invalid_state": GitAutograderInvalidStateException,
+    "wrong_answer": GitAutograderWrongAnswerException,
+}
+
+VerifyFunction = Callable[[GitAutograderExercise], GitAutograderOutput]
+
+
+@dataclass
+class VerifyCachePolicy:
+    enabled: bool = True
+    ttl_seconds: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "VerifyCachePolicy":
+        policy = config.get(VERIFY_CACHE_KEY) or {}
+        return cls(
+            enabled=policy.get("enabled", True),
+            ttl_seconds=policy.get("ttl_seconds"),
+        )
+
+
+def default_cache_dir() -> Path:
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV])
+    return user_cache_dir("verify")
+
+
+def verify_cache_key(
+    exercise: GitAutograderExercise, verify_path: str | Path
+) -> Optional[str]:
+    """Returns the cache key of the exercise's current state.
+
+    The key is None when the exercise has no repository to fingerprint.
+    """
+    if exercise.config.exercise_repo.repo_type in _UNCACHED_REPO_TYPES:
+        return None
+    exercise_path = Path(exercise.exercise_path)
+    repo_path = exercise_path / exercise.config.exercise_repo.repo_name
+    try:
+        fingerprint = fingerprint_repo(
+            repo_path,
+            extra_files=[
+                exercise_path / ANSWERS_FILE_NAME,
+                exercise_path / EXERCISE_CONFIG_FILE_NAME,
+            ],
+        )
+        # Verifiers that look for renames and deletions read the reflogs, which
+        # can change while every ref ends up where it was
+        reflogs = _reflogs_digest(repo_path)
+    except (OSError, RuntimeError):
+        return None
+    verify_hash = hashlib.sha256(Path(verify_path).read_bytes()).hexdigest()
+    payload = "\n".join(
+        [
+            str(exercise_path.resolve()),
+            exercise.exercise_name,
+            verify_hash,
+            fingerprint.digest,
+            reflogs,
+        ]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached_verify(
+    exercise: GitAutograderExercise,
+    verify: VerifyFunction,
+    verify_path: Optional[str | Path] = None,
+    cache_dir: Optional[str | Path] = None,
+) -> GitAutograderOutput:
+    """Runs verify on the exercise, or returns its result for the same state.
+
+    verify_path defaults to the file that defines verify.
+    """
+    policy = _load_policy(exercise)
+    if not policy.enabled or os.environ.get(CACHE_ENABLED_ENV) == "0":
+        return verify(exercise)
+
+    if verify_path is None:
+        verify_path = inspect.getsourcefile(verify) or ""
+    key = verify_cache_key(exercise, verify_path)
+    if key is None:
+        return verify(exercise)
+
+    cache_path = Path(cache_dir or default_cache_dir()) / (
+        _safe_name(exercise.exercise_name) + ".json"
+    )
+    entry = _read_entry(cache_path)
+    if (
+        entry is not None
+        and entry.get("key") == key
+        and (
+            policy.ttl_seconds is None
+            or time.time() - entry.get("stored_at", 0) <= policy.ttl_seconds
+        )
+    ):
+        return _replay(entry, exercise)
+
+    # The key is computed before verify runs, as some verifies fetch and
+    # change the refs they are given
+    try:
+        output = verify(exercise)
+    except (
+        GitAutograderInvalidStateException,
+        GitAutograderWrongAnswerException,
+    ) as e:
+        kind = (
+            "invalid_state"
+            if isinstance(e, GitAutograderInvalidStateException)
+            else "wrong_answer"
+        )
+        _write_entry(cache_path, {"key": key, "kind": kind, "message": e.message})
+        raise
+    _write_entry(
+        cache_path,
+        {
+            "key": key,
+            "kind": "output",
+            "status": str(output.status),
+            "comments": output.comments,
+        },
+    )
+    return output
+
+
+def _reflogs_digest(repo_path: Path) -> str:
+    logs_dir = git_dir(repo_path) / "logs"
+    entries: List[str] = []
+    for root, _, files in os.walk(logs_dir):
+        for file_name in files:
+            path = Path(root) / file_name
+            entries.append(
+                f"{path.relative_to(logs_dir).as_posix()} {hash_blob(path.read_bytes())}"
+            )
+    return hashlib.sha256("\n".join(sorted(entries)).encode("utf-8")).hexdigest()
+
+
+def _load_policy(exercise: GitAutograderExercise) -> VerifyCachePolicy:
+    # ExerciseConfig drops unknown keys, so the raw config is read again
+    try:
+        with open(exercise.exercise_config_path, "r") as config_file:
+            return VerifyCachePolicy.from_config(json.load(config_file))
+    except (OSError, ValueError):
+        return VerifyCachePolicy(enabled=False)
+
+
+def _replay(
+    entry: Dict[str, Any], exercise: GitAutograderExercise
+) -> GitAutograderOutput:
+    if entry["kind"] in _EXCEPTIONS:
+        raise _EXCEPTIONS[entry["kind"]](entry["message"])
+    return GitAutograderOutput(
+        status=GitAutograderStatus(entry["status"]),
+        started_at=exercise.started_at,
+        completed_at=datetime.now(tz=timezone.utc),
+        comments=entry["comments"],
+        exercise_name=exercise.exercise_name,
+    )
+
+
+def _read_entry(cache_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(cache_path, "r") as cache_file:
+            entry = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def _write_entry(cache_path: Path, entry: Dict[str, Any]) -> None:
+    entry["stored_at"] = time.time()
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Written to a temporary file first so that a concurrent read never
+        # sees a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as temp_file:
+            json.dump(entry, temp_file)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # A cache that cannot be written only costs the next verify its speedup
+        pass
+
+
+def _safe_name(name: str) -> str:
+    return "".join(char if char.isalnum() or char in "-_" else "_" for char in name)
@@ -1,9 +1,14 @@
+from typing import Any, Dict
+
 from git_autograder import (
     GitAutograderExercise,
     GitAutograderOutput,
     GitAutograderStatus,
 )
 
+from exercise_utils.checks import CheckRunner
+from exercise_utils.commit_graph import CommitGraph
+
 ALICE_REMOTE_NAME = "alice-upstream"
 ALICE_REMOTE_MISSING = f"Remote '{ALICE_REMOTE_NAME}' is missing! Remember to add it and point it to https://github.com/git-mastery/gm-shapes-alice"
 ALICE_REMOTE_WRONG = f"Remote '{ALICE_REMOTE_NAME}' is not pointing to https://github.com/git-mastery/gm-shapes-alice, fix that!"
@@ -19,39 +24,69 @@ RESET_EXERCISE = "Reset the exercise using 'gitmastery progress reset' to try ag
 
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
-    # Checks for Alice
-    if not exercise.repo.remotes.has_remote(ALICE_REMOTE_NAME):
-        raise exercise.wrong_answer([ALICE_REMOTE_MISSING])
+    checks = CheckRunner(exercise)
 
-    alice_remote = exercise.repo.remotes.remote(ALICE_REMOTE_NAME)
-    if not alice_remote.is_for_repo("git-mastery", "gm-shapes-alice"):
-        raise exercise.wrong_answer([ALICE_REMOTE_WRONG])
+    @checks.check("graph")
+    def graph(results: Dict[str, Any]) -> CommitGraph:
+        return CommitGraph.load(exercise.repo.repo)
 
-    local_main_commit = exercise.repo.commits.commit("main")
+    @checks.check("local_main")
+    def local_main(results: Dict[str, Any]) -> str:
+        return exercise.repo.commits.commit("main").hexsha
 
-    alice_main_commit = exercise.repo.commits.commit_or_none("alice-upstream/main")
-    if not alice_main_commit:
-        raise exercise.wrong_answer([ALICE_NO_FETCH])
+    # Checks for Alice
+    @checks.check("alice_remote")
+    def alice_remote(results: Dict[str, Any]) -> None:
+        if not exercise.repo.remotes.has_remote(ALICE_REMOTE_NAME):
+            raise exercise.wrong_answer([ALICE_REMOTE_MISSING])
 
-    if not local_main_commit.is_child(alice_main_commit):
-        # Did not merge
-        raise exercise.wrong_answer([ALICE_NO_MERGE])
+    @checks.check("alice_remote_url", requires=["alice_remote"])
+    def alice_remote_url(results: Dict[str, Any]) -> None:
+        remote = exercise.repo.remotes.remote(ALICE_REMOTE_NAME)
+        if not remote.is_for_repo("git-mastery", "gm-shapes-alice"):
+            raise exercise.wrong_answer([ALICE_REMOTE_WRONG])
+
+    @checks.check("alice_main", requires=["alice_remote_url"])
+    def alice_main(results: Dict[str, Any]) -> str:
+        commit = exercise.repo.commits.commit_or_none("alice-upstream/main")
+        if not commit:
+            raise exercise.wrong_answer([ALICE_NO_FETCH])
+        return commit.hexsha
+
+    @checks.check("alice_merged", requires=["graph", "local_main", "alice_main"])
+    def alice_merged(results: Dict[str, Any]) -> None:
+        if not results["graph"].is_ancestor(
+            results["alice_main"], results["local_main"]
+        ):
+            # Did not merge
+            raise exercise.wrong_answer([ALICE_NO_MERGE])
 
     # Checks for Bob
-    if not exercise.repo.remotes.has_remote(BOB_REMOTE_NAME):
-        raise exercise.wrong_answer([BOB_REMOTE_MISSING])
+    @checks.check("bob_remote")
+    def bob_remote(results: Dict[str, Any]) -> None:
+        if not exercise.repo.remotes.has_remote(BOB_REMOTE_NAME):
+            raise exercise.wrong_answer([BOB_REMOTE_MISSING])
+
+    @checks.check("bob_remote_url", requires=["bob_remote"])
+    def bob_remote_url(results: Dict[str, Any]) -> None:
+        remote = exercise.repo.remotes.remote(BOB_REMOTE_NAME)
+        if not remote.is_for_repo("git-mastery", "gm-shapes-bob"):
+            raise exercise.wrong_answer([BOB_REMOTE_WRONG])
 
-    bob_remote = exercise.repo.remotes.remote(BOB_REMOTE_NAME)
-    if not bob_remote.is_for_repo("git-mastery", "gm-shapes-bob"):
-        raise exercise.wrong_answer([BOB_REMOTE_WRONG])
+    @checks.check("bob_main", requires=["bob_remote_url"])
+    def bob_main(results: Dict[str, Any]) -> str:
+        commit = exercise.repo.commits.commit_or_none("bob-upstream/main")
+        if not commit:
+            raise exercise.wrong_answer([BOB_NO_FETCH])
+        return commit.hexsha
 
-    bob_main_commit = exercise.repo.commits.commit_or_none("bob-upstream/main")
-    if not bob_main_commit:
-        raise exercise.wrong_answer([BOB_NO_FETCH])
+    @checks.check("bob_not_merged", requires=["graph", "local_main", "bob_main"])
+    def bob_not_merged(results: Dict[str, Any]) -> None:
+        if results["graph"].is_ancestor(results["bob_main"], results["local_main"]):
+            # Merged
+            raise exercise.wrong_answer([BOB_MERGE, RESET_EXERCISE])
 
-    if local_main_commit.is_child(bob_main_commit):
-        # Merged
-        raise exercise.wrong_answer([BOB_MERGE, RESET_EXERCISE])
+    checks.run()
 
     return exercise.to_output(
         ["Great work fetching and pulling different upstreams!"],
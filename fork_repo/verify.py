@@ -1,6 +1,4 @@
-import os
-import subprocess
-from typing import List, Optional
+from typing import Optional
 
 from git_autograder import (
     GitAutograderExercise,
@@ -8,6 +6,8 @@ from git_autograder import (
     GitAutograderStatus,
 )
 
+from exercise_utils.github_facts import github_facts
+
 # NOTE: that we create functions for each command to allow unit testing to mock the
 # return values directly.
 
@@ -17,54 +17,17 @@ NO_FORK_FOUND = f"No fork of git-mastery/{ORIGINAL_FORK_NAME} found. Remember to
 NOT_GIT_MASTERY_FORK = f"Your fork was not from git-mastery/{ORIGINAL_FORK_NAME}. Remember to fork it from https://github.com/git-mastery/gm-shapes and keep the name as gm-shapes"
 
 
-def run_command(command: List[str]) -> Optional[str]:
-    try:
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            check=True,
-            env=dict(os.environ, **{"GH_PAGER": "cat"}),
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError:
-        return None
-
-
 def get_username() -> Optional[str]:
-    return run_command(["gh", "api", "user", "-q", ".login"])
+    return github_facts(ORIGINAL_FORK_NAME).username
 
 
 def has_fork(username: str) -> bool:
-    result = run_command(
-        [
-            "gh",
-            "repo",
-            "view",
-            f"{username}/{ORIGINAL_FORK_NAME}",
-            "--json",
-            "isFork",
-            "--jq",
-            ".isFork",
-        ]
-    )
-    return result is not None and result == "true"
+    return github_facts(ORIGINAL_FORK_NAME).repo(ORIGINAL_FORK_NAME).is_fork
 
 
 def is_parent_git_mastery(username: str) -> bool:
-    result = run_command(
-        [
-            "gh",
-            "repo",
-            "view",
-            f"{username}/{ORIGINAL_FORK_NAME}",
-            "--json",
-            "parent",
-            "--jq",
-            ".parent.owner.login",
-        ]
-    )
-    return result is not None and result == "git-mastery"
+    fork = github_facts(ORIGINAL_FORK_NAME).repo(ORIGINAL_FORK_NAME)
+    return fork.parent_owner == "git-mastery"
 
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
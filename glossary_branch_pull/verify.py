@@ -1,11 +1,11 @@
-from typing import List
 from git_autograder import (
-    GitAutograderCommit,
     GitAutograderOutput,
     GitAutograderExercise,
     GitAutograderStatus,
 )
 
+from exercise_utils.commit_index import CommitIndex
+
 BRANCH_MISSING = "The local {branch} branch is not created."
 BRANCH_NOT_TRACKING = "The local {branch} branch does not track origin/{branch}."
 REMOTE_COMMIT_MISSING = "New commit in the remote {branch} branch is not pulled to the local {branch} branch."
@@ -15,28 +15,9 @@ LOCAL_COMMIT_MISSING = (
 )
 
 
-def get_commit_from_message(
-    commits: List[GitAutograderCommit], message: str
-) -> GitAutograderCommit | None:
-    """Find a commit with the given message from a list of commits."""
-    for commit in commits:
-        if message.strip() == commit.commit.message.strip():
-            return commit
-    return None
-
-
-def get_commit_from_hexsha(
-    commits: List[GitAutograderCommit], hexsha: str
-) -> GitAutograderCommit | None:
-    """Find a commit with the given hexsha from a list of commits."""
-    for commit in commits:
-        if hexsha.strip() == commit.commit.hexsha.strip():
-            return commit
-    return None
-
-
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     repo = exercise.repo
+    commits = CommitIndex.load(repo.repo)
     comments = []
 
     if not repo.branches.has_branch("STU"):
@@ -58,25 +39,25 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     if not repo.branches.has_branch("ABC"):
         comments.append(BRANCH_MISSING.format(branch="ABC"))
     else:
-        abc_commits = repo.branches.branch("ABC").commits
         abc_branch = repo.branches.branch("ABC").branch
         remote_abc = abc_branch.tracking_branch()
         if not remote_abc or remote_abc.name != "origin/ABC":
             comments.append(BRANCH_NOT_TRACKING.format(branch="ABC"))
-        elif not get_commit_from_hexsha(abc_commits, remote_abc.commit.hexsha):
+        elif remote_abc.commit.hexsha not in commits.reachable("refs/heads/ABC"):
             comments.append(REMOTE_COMMIT_MISSING.format(branch="ABC"))
 
     if not repo.branches.has_branch("DEF"):
         comments.append(BRANCH_MISSING.format(branch="DEF"))
     else:
-        def_commits = repo.branches.branch("DEF").commits
-        if not get_commit_from_message(def_commits, "Add 'documentation'"):
+        if not commits.by_message(
+            "Add 'documentation'", reachable_from="refs/heads/DEF"
+        ):
             comments.append(LOCAL_COMMIT_MISSING)
         def_branch = repo.branches.branch("DEF").branch
         remote_def = def_branch.tracking_branch()
         if not remote_def or remote_def.name != "origin/DEF":
             comments.append(BRANCH_NOT_TRACKING.format(branch="DEF"))
-        elif not get_commit_from_hexsha(def_commits, remote_def.commit.hexsha):
+        elif remote_def.commit.hexsha not in commits.reachable("refs/heads/DEF"):
             comments.append(REMOTE_COMMIT_MISSING.format(branch="DEF"))
 
     if comments:
@@ -1,10 +1,12 @@
-import re
 from git_autograder import (
     GitAutograderOutput,
     GitAutograderExercise,
     GitAutograderStatus,
 )
 
+from exercise_utils.reflog_index import ReflogIndex
+from exercise_utils.remotes import RemoteSnapshot
+
 STU_BRANCH = "STU"
 RENAMED_BRANCH = "S-to-Z"
 
@@ -20,42 +22,13 @@ RESET_MESSAGE = (
 )
 
 
-def branch_has_rename_evidence(
-    exercise: GitAutograderExercise, new_branch: str, old_branch: str
-) -> bool:
-    """Performs a DFS on the branch renames starting with STU till S-to-Z.
-
-    This is necessary since the renames could be performed in parts:
-
-    STU -> S-to-U -> S-to-Z
-    """
-    branch = exercise.repo.branches.branch(new_branch)
-
-    rename_regex = re.compile("^renamed refs/heads/(.+) to refs/heads/(.+)$")
-    for entry in branch.reflog[::-1]:
-        match_group = rename_regex.match(entry.message)
-        if match_group is None:
-            continue
-        original = match_group.group(1)
-        new = match_group.group(2)
-        if original == old_branch:
-            old_branch = new
-
-    return old_branch == new_branch
-
-
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     local_raw = exercise.repo.repo.git.branch("--list")
     local_branches = [
         line.strip().lstrip("* ").strip() for line in local_raw.splitlines()
     ]
 
-    remote_raw = exercise.repo.repo.git.ls_remote("--heads", "origin")
-    remote_branches = []
-    for line in remote_raw.splitlines():
-        parts = line.split()
-        if len(parts) == 2 and parts[1].startswith("refs/heads/"):
-            remote_branches.append(parts[1].split("/")[-1])
+    remote_branches = RemoteSnapshot(exercise.repo.repo).heads("origin")
 
     comments = []
 
@@ -74,7 +47,8 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     if comments:
         raise exercise.wrong_answer(comments)
 
-    if not branch_has_rename_evidence(exercise, RENAMED_BRANCH, STU_BRANCH):
+    reflogs = ReflogIndex.load(exercise.repo.repo, refs=[RENAMED_BRANCH])
+    if not reflogs.was_renamed(STU_BRANCH, RENAMED_BRANCH):
         raise exercise.wrong_answer([NO_RENAME_EVIDENCE, RESET_MESSAGE])
 
     return exercise.to_output(
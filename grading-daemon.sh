@@ -0,0 +1,3 @@
+#!/bin/bash
+
+PYTHONPATH=. uv run python scripts/grading-daemon.py "$@"
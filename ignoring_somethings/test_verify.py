@@ -1,3 +1,4 @@
+from exercise_utils.gitignore import GitIgnore, check_ignored
 from exercise_utils.test import GitAutograderTestLoader, GitMasteryHelper, assert_output
 from git_autograder import GitAutograderStatus
 from repo_smith.repo_smith import RepoSmith
@@ -9,6 +10,7 @@ from .verify import (
     NOT_IGNORING_RUNAWAY,
     NOT_PATTERN_MATCHING_RUNAWAY,
     STILL_HIDING,
+    SIMULATED_FILES,
     STILL_IGNORING_FILE_22,
     verify,
 )
@@ -232,3 +234,19 @@ def test_no_commit_latest_update():
             GitAutograderStatus.UNSUCCESSFUL,
             [MISSING_COMMITS],
         )
+
+
+def test_gitignore_matches_git():
+    gitignores = [
+        "many/*\n!many/file22.txt\nignore_me.txt\nthis/**/runaway.txt\n",
+        "many/\n!many/file22.txt\n",
+        "*.txt\n!find_me.txt\n/why_am_i_hidden.txt\n",
+        "this/\n!this/is/very/nested/find_me.txt\n",
+        "many/file[0-9].txt\nmany/file?2.txt\n**/nested/*\n",
+        "many/file[!1-5]*.txt\n**/runaway.txt\nthis/*/very\n",
+    ]
+    for contents in gitignores:
+        gitignore = GitIgnore.from_text(contents)
+        assert gitignore.ignored(SIMULATED_FILES) == check_ignored(
+            {".gitignore": contents}, SIMULATED_FILES
+        )
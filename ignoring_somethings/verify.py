@@ -1,16 +1,14 @@
 import os
-
-import tempfile
-from pathlib import Path
 from typing import List
 
-from git import Repo
 from git_autograder import (
     GitAutograderExercise,
     GitAutograderOutput,
     GitAutograderStatus,
 )
 
+from exercise_utils.gitignore import GitIgnore
+
 MISSING_COMMITS = "You have not committed the relevant changes yet!"
 STILL_IGNORING_FILE_22 = "You are still ignoring many/file22.txt."
 STILL_HIDING = (
@@ -29,6 +27,13 @@ NOT_IGNORING_REST_OF_MANY = (
 IGNORING_FIND_ME = "You should not be ignoring this/is/very/nested/find_me.txt!"
 MISSING_GITIGNORE = "You are missing the .gitignore file! Try to reset the exercise using gitmastery progress reset"
 
+SIMULATED_FILES = [
+    "why_am_i_hidden.txt",
+    "ignore_me.txt",
+    "this/is/very/nested/find_me.txt",
+    "this/is/very/nested/runaway.txt",
+] + [f"many/file{i}.txt" for i in range(1, 101)]
+
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     main_branch = exercise.repo.branches.branch("main")
@@ -55,54 +60,39 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
         ):
             no_user_commit = True
 
-    # Verify the state of the ignore by recreating the necessary files and checking if
-    # Git ignores them directly in a separate temporary Git repository
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
-        (tmp_path / ".gitignore").write_text(gitignore_file_contents)
-
-        simulated_files = [
-            "why_am_i_hidden.txt",
-            "ignore_me.txt",
-            "this/is/very/nested/find_me.txt",
-            "this/is/very/nested/runaway.txt",
-        ] + [f"many/file{i}.txt" for i in range(1, 101)]
-        for file in simulated_files:
-            (tmp_path / file).parent.mkdir(parents=True, exist_ok=True)
-            (tmp_path / file).touch()
-
-        test_repo: Repo = Repo.init(tmp_path)
-        ignored = {f for f in simulated_files if test_repo.ignored(f)}
-
-        comments: List[str] = []
-        if "many/file22.txt" in ignored:
-            comments.append(STILL_IGNORING_FILE_22)
-
-        for i in range(1, 101):
-            if f"many/file{i}.txt" and i != 22 and f"many/file{i}.txt" not in ignored:
-                comments.append(NOT_IGNORING_REST_OF_MANY)
-                break
-
-        if "why_am_i_hidden.txt" in ignored:
-            comments.append(STILL_HIDING)
-
-        if "ignore_me.txt" not in ignored:
-            comments.append(NOT_IGNORING_IGNORE_ME)
-
-        if "this/is/very/nested/find_me.txt" in ignored:
-            comments.append(IGNORING_FIND_ME)
-
-        if "this/is/very/nested/runaway.txt" not in ignored:
-            comments.append(NOT_IGNORING_RUNAWAY)
-        elif "this/**/runaway.txt" not in gitignore_file_contents.splitlines():
-            comments.append(NOT_PATTERN_MATCHING_RUNAWAY)
-
-        if no_user_commit:
-            comments.append(MISSING_COMMITS)
-
-        if comments:
-            raise exercise.wrong_answer(comments)
-
-        return exercise.to_output(
-            ["Great work using .gitignore!"], status=GitAutograderStatus.SUCCESSFUL
-        )
+    # Verify the state of the ignore by evaluating it against the exercise files
+    gitignore = GitIgnore.from_text(gitignore_file_contents)
+    ignored = gitignore.ignored(SIMULATED_FILES)
+
+    comments: List[str] = []
+    if "many/file22.txt" in ignored:
+        comments.append(STILL_IGNORING_FILE_22)
+
+    for i in range(1, 101):
+        if f"many/file{i}.txt" and i != 22 and f"many/file{i}.txt" not in ignored:
+            comments.append(NOT_IGNORING_REST_OF_MANY)
+            break
+
+    if "why_am_i_hidden.txt" in ignored:
+        comments.append(STILL_HIDING)
+
+    if "ignore_me.txt" not in ignored:
+        comments.append(NOT_IGNORING_IGNORE_ME)
+
+    if "this/is/very/nested/find_me.txt" in ignored:
+        comments.append(IGNORING_FIND_ME)
+
+    if "this/is/very/nested/runaway.txt" not in ignored:
+        comments.append(NOT_IGNORING_RUNAWAY)
+    elif "this/**/runaway.txt" not in gitignore_file_contents.splitlines():
+        comments.append(NOT_PATTERN_MATCHING_RUNAWAY)
+
+    if no_user_commit:
+        comments.append(MISSING_COMMITS)
+
+    if comments:
+        raise exercise.wrong_answer(comments)
+
+    return exercise.to_output(
+        ["Great work using .gitignore!"], status=GitAutograderStatus.SUCCESSFUL
+    )
@@ -1,30 +1,9 @@
 from sys import exit
+from typing import Any, Dict, List
 
 from exercise_utils.cli import run_command
-from exercise_utils.git import checkout, merge_with_message
-
-
-def commit(
-    author: str,
-    email: str,
-    date: str,
-    message: str,
-    verbose: bool,
-) -> None:
-    run_command(
-        [
-            "git",
-            "commit",
-            "--allow-empty",
-            "--date",
-            date,
-            "--author",
-            f"{author} <{email}>",
-            "-m",
-            message,
-        ],
-        verbose,
-    )
+from exercise_utils.determinism import seeded_random
+from exercise_utils.repo_spec import apply_spec
 
 
 def replace_sha_in_file(verbose: bool = False):
@@ -43,10 +22,8 @@ def replace_sha_in_file(verbose: bool = False):
     # Exclude the very first commit (the root commit)
     commits_without_root = commits[1:10] + commits[11:]
 
-    # Pick one at random
-    import random
-
-    chosen_sha = random.choice(commits_without_root)
+    # Pick one at random, the same one for the same seed
+    chosen_sha = seeded_random().choice(commits_without_root)
 
     if verbose:
         print(f"Chosen commit: {chosen_sha}")
@@ -68,8 +45,8 @@ def replace_sha_in_file(verbose: bool = False):
         print("answers.txt updated.")
 
 
-ANON = ("Anonymous", "anon@example.com")
-CRIMINAL = ("Josh Badur", "josh.badur@example.com")
+ANON = "Anonymous <anon@example.com>"
+CRIMINAL = "Josh Badur <josh.badur@example.com>"
 
 
 def setup(verbose: bool = False):
@@ -86,15 +63,26 @@ def setup(verbose: bool = False):
         "Robbed Alice Bakersfield",
         "Stole guitar from pawn shop",
     ]
-
-    for i, msg in enumerate(crimes, start=1):
-        commit(*ANON, f"2024-01-{i:02d} 08:00", msg, verbose)
+    history: List[Dict[str, Any]] = [
+        {"commit": msg, "date": f"2024-01-{i:02d} 08:00"}
+        for i, msg in enumerate(crimes, start=1)
+    ]
 
     # Branch: the criminal tries to hide crimes
-    checkout("rewrite", True, verbose)
-    commit(*CRIMINAL, "2024-02-10 10:00", "Rewrite the comments", verbose)
-    commit(*CRIMINAL, "2024-02-11 09:00", "Covering my tracks", verbose)
-    checkout("main", False, verbose)
+    history += [
+        {
+            "commit": "Rewrite the comments",
+            "branch": "rewrite",
+            "author": CRIMINAL,
+            "date": "2024-02-10 10:00",
+        },
+        {
+            "commit": "Covering my tracks",
+            "branch": "rewrite",
+            "author": CRIMINAL,
+            "date": "2024-02-11 09:00",
+        },
+    ]
 
     # Escalation of crimes
     more_crimes = [
@@ -104,12 +92,15 @@ def setup(verbose: bool = False):
         "Oh no what have I done",
         "Currently hiding at the abandoned warehouse at docks",
     ]
-
-    for j, msg in enumerate(more_crimes, start=1):
-        commit(*ANON, f"2024-03-{j:02d} 07:00", msg, verbose)
+    history += [
+        {"commit": msg, "date": f"2024-03-{j:02d} 07:00"}
+        for j, msg in enumerate(more_crimes, start=1)
+    ]
 
     # Merge rewrite branch back, creates a real graph
-    merge_with_message("rewrite", False, "Merge branch 'rewrite'", verbose)
+    history.append(
+        {"merge": "rewrite", "message": "Merge branch 'rewrite'", "date": "2024-03-06"}
+    )
 
     # Add a few final commits after merge
     aftermath = [
@@ -117,7 +108,12 @@ def setup(verbose: bool = False):
         "Wanted posters distributed",
         "Citywide curfew announced",
     ]
-    for k, msg in enumerate(aftermath, start=1):
-        commit(*ANON, f"2024-04-{k:02d} 12:00", msg, verbose)
+    history += [
+        {"commit": msg, "date": f"2024-04-{k:02d} 12:00"}
+        for k, msg in enumerate(aftermath, start=1)
+    ]
+
+    # The whole history is imported at once instead of one git call per commit
+    apply_spec({"author": ANON, "head": "main", "history": history}, verbose)
 
     replace_sha_in_file(verbose)
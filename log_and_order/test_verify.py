@@ -101,3 +101,39 @@ def test_wrong_target_sha():
             GitAutograderStatus.UNSUCCESSFUL,
             [OneOfValueRule.MISMATCH_VALUE.format(question=QUESTION_THREE)],
         )
+
+
+# Dates and identities in repo specs are pinned, so the SHAs are stable
+CRIME_SPREE_SPEC = {
+    "history": [
+        {"commit": "Stole bicycle from Main Street", "id": "bicycle"},
+        {"commit": "Rewrite the comments", "branch": "rewrite", "id": "rewrite"},
+        {"commit": "Broke into bakery overnight"},
+        {"merge": "rewrite", "id": "merge"},
+    ],
+}
+BICYCLE_SHA = "8a87e0b5672e543b518e33e436d5e93ea8356e3f"
+REWRITE_SHA = "30be09b247a76404303726b63f7be35eb61cc75c"
+MERGE_SHA = "e668c6de28f28281a1efb5e20236809243f8edd8"
+CRIME_SPREE_FINGERPRINT = (
+    "6b7132a67de968b64ab7f94816aadc92eef3b60fc64667c69d07be558127ee70"
+)
+
+
+def test_spec_history():
+    with loader.start(
+        spec=CRIME_SPREE_SPEC,
+        mock_answers={
+            QUESTION_ONE: MERGE_SHA[:7],
+            QUESTION_TWO.format(SHA=BICYCLE_SHA): "Stole bicycle from Main Street",
+            QUESTION_THREE: REWRITE_SHA,
+        },
+    ) as (test, _):
+        assert test.spec_commits == {
+            "bicycle": BICYCLE_SHA,
+            "rewrite": REWRITE_SHA,
+            "merge": MERGE_SHA,
+        }
+        assert test.fingerprint().digest == CRIME_SPREE_FINGERPRINT
+        output = test.run()
+        assert_output(output, GitAutograderStatus.SUCCESSFUL)
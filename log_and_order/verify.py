@@ -9,6 +9,8 @@ from git_autograder.answers import GitAutograderAnswersRecord
 from git_autograder.answers.rules import HasExactValueRule, NotEmptyRule
 from git_autograder.answers.rules.answer_rule import AnswerRule
 
+from exercise_utils.commit_index import CommitIndex
+
 QUESTION_ONE = "What is the SHA of the commit HEAD points to? You can use the full length SHA or the short SHA (i.e. first 7 characters of the SHA)"
 QUESTION_TWO = "What is the commit message of the commit {SHA}?"
 QUESTION_TWO_REGEX = re.compile(
@@ -47,30 +49,15 @@ def get_head_message(exercise: GitAutograderExercise) -> str:
     return ensure_str(exercise.repo.repo.head.commit.message).strip()
 
 
-def get_target_commit_message(exercise: GitAutograderExercise, sha: str) -> str:
-    target_commit = next(
-        (
-            c
-            for c in exercise.repo.repo.iter_commits(all=True)
-            if c.hexsha.strip() == sha
-        ),
-        None,
-    )
+def get_target_commit_message(commits: CommitIndex, sha: str) -> str:
+    target_commit = commits.get(sha)
     if target_commit is None:
         raise Exception(f"Could not find commit with SHA '{sha}'")
-    return ensure_str(target_commit.message).strip()
-
-
-def get_target_commit_sha(exercise: GitAutograderExercise) -> str:
-    target_msg = "Rewrite the comments"
-    target_commit = next(
-        (
-            c
-            for c in exercise.repo.repo.iter_commits(all=True)
-            if c.message.strip() == target_msg
-        ),
-        None,
-    )
+    return target_commit.message.strip()
+
+
+def get_target_commit_sha(commits: CommitIndex) -> str:
+    target_commit = commits.by_message("Rewrite the comments")
     if target_commit is None:
         raise Exception("Could not find commit with message 'Rewrite the comments'")
     return target_commit.hexsha
@@ -86,9 +73,10 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     assert sha_match is not None
     sha = sha_match.group(1)
 
-    target_message = get_target_commit_message(exercise, sha)
+    commits = CommitIndex.load(exercise.repo.repo)
+    target_message = get_target_commit_message(commits, sha)
 
-    target_sha = get_target_commit_sha(exercise)
+    target_sha = get_target_commit_sha(commits)
     target_sha_short = target_sha[:7]
 
     exercise.answers.add_validation(
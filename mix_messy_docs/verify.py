@@ -1,10 +1,11 @@
-from git import Commit
 from git_autograder import (
     GitAutograderOutput,
     GitAutograderExercise,
     GitAutograderStatus,
 )
 
+from exercise_utils.commit_graph import CommitGraph
+
 MISSING_DEVELOPMENT_BRANCH = "You are missing the 'development' branch!"
 WRONG_BRANCH_POINT = "You did not branch from the commit with tag v1.0!"
 FEATURE_SEARCH_BRANCH_STILL_EXISTS = (
@@ -40,15 +41,6 @@ EXPECTED_LINES = [
 ]
 
 
-def _get_commit_message(commit: Commit) -> str:
-    """Normalize commit message to string."""
-    if commit.message is None:
-        return ""
-    if isinstance(commit.message, (bytes, bytearray, memoryview)):
-        return bytes(commit.message).decode("utf-8", errors="ignore")
-    return commit.message
-
-
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     # Step 1: create development branch from tag v1.0
     development_branch = exercise.repo.branches.branch_or_none("development")
@@ -60,22 +52,16 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
 
     # Check if development branch was created from v1.0
     main_branch = exercise.repo.branches.branch("main")  # main branch must exist
-    merge_base = exercise.repo.repo.git.merge_base(
+    graph = CommitGraph.load(exercise.repo.repo)
+    merge_base = graph.merge_base(
         main_branch.latest_commit.hexsha, development_commit.hexsha
     )
-    commits_between = list(
-        exercise.repo.repo.iter_commits(f"{tag_commit.hexsha}..{merge_base}")
-    )
-    if commits_between:
+    if merge_base is None or graph.only_in(merge_base, tag_commit.hexsha):
         # There are commits on main after v1.0 that are ancestors of development
         # This means development wasn't created from v1.0
         raise exercise.wrong_answer([WRONG_BRANCH_POINT])
 
-    commits_since_tag = list(
-        exercise.repo.repo.iter_commits(
-            f"{tag_commit.hexsha}..{development_commit.hexsha}"
-        )
-    )
+    commits_since_tag = graph.only_in(development_commit.hexsha, tag_commit.hexsha)
     merge_commits = [commit for commit in commits_since_tag if len(commit.parents) > 1]
 
     # Step 2: merge feature-search to development branch, delete feature-search branch
@@ -83,7 +69,7 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
         commit
         for commit in merge_commits
         if all(
-            keyword in _get_commit_message(commit).lower()
+            keyword in commit.message.lower()
             for keyword in ["feature-search", "merge", "development"]
         )
     ]
@@ -101,7 +87,7 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
         commit
         for commit in merge_commits
         if all(
-            keyword in _get_commit_message(commit).lower()
+            keyword in commit.message.lower()
             for keyword in ["feature-delete", "merge", "development"]
         )
     ]
@@ -118,7 +104,7 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     search_merge = feature_search_merges[-1]
     delete_merge = feature_delete_merges[-1]
 
-    if not exercise.repo.repo.is_ancestor(search_merge, delete_merge):
+    if not graph.is_ancestor(search_merge.hexsha, delete_merge.hexsha):
         raise exercise.wrong_answer([MERGE_WRONG_ORDER, RESET_MESSAGE])
 
     with exercise.repo.files.file_or_none("features.md") as features_file:
@@ -255,14 +255,15 @@ def test_branches_not_deleted():
 
 def test_features_content_invalid():
     with loader.start() as (test, rs):
-        rs.git.commit(message="Add features.md", allow_empty=True)
+        rs.files.create_or_update("features.md", FEATURES_FILE_CONTENT_DELETE_COMMIT[0])
+        rs.git.add(all=True)
+        rs.git.commit(message="Add features.md")
         rs.helper(GitMasteryHelper).create_start_tag()
         rs.git.commit(message="Mention feature for creating books", allow_empty=True)
         rs.git.tag("v1.0")
         rs.git.commit(message="Fix phrasing of heading", allow_empty=True)
         rs.git.commit(message="Add the search feature", allow_empty=True)
         rs.git.commit(message="Add the delete feature", allow_empty=True)
-        rs.files.create_or_update("features.md", FEATURES_FILE_CONTENT_DELETE_COMMIT[0])
 
         output = test.run()
         assert_output(
@@ -1,12 +1,14 @@
-from typing import Optional, List
+from typing import List, Optional
 from git_autograder import (
     GitAutograderOutput,
     GitAutograderExercise,
     GitAutograderStatus,
-    GitAutograderCommit,
 )
 from itertools import zip_longest
 
+from exercise_utils.commit_index import CommitIndex, IndexedCommit
+from exercise_utils.revision_files import RevisionFileReader
+
 SQUASH_NOT_USED = (
     "You should be using squash merges for both 'feature-search' and 'feature-delete'"
 )
@@ -79,53 +81,38 @@ def ensure_str(val) -> str:
     return str(val).strip()
 
 
-def get_commit_from_message(
-    commits: List[GitAutograderCommit], message: str
-) -> Optional[GitAutograderCommit]:
-    """Find a commit with the given message from a list of commits."""
-    for commit in commits:
-        if message.strip() == commit.commit.message.strip():
-            return commit
-    return None
-
-
 def verify_commit_file_content(
     exercise: GitAutograderExercise,
-    commit: GitAutograderCommit | None,
+    files: RevisionFileReader,
+    commit: Optional[IndexedCommit],
     file_name: str,
     expected_content: List[str],
 ):
-    """Checkout to specific commit and verify that the file content of the given commit matches the expected content."""
+    """Verify that the file content of the given commit matches the expected content."""
     if not commit:
         return
-    commit.checkout()
-    with exercise.repo.files.file_or_none(file_name) as file:
-        if file is None:
-            raise exercise.wrong_answer([MISSING_FEATURES_FILE])
+    contents = files.read_lines(commit.hexsha, file_name)
+    if contents is None:
+        raise exercise.wrong_answer([MISSING_FEATURES_FILE])
 
-        contents = [line.strip() for line in file.readlines() if line.strip() != ""]
-        if contents != expected_content:
-            raise exercise.wrong_answer(
-                [
-                    FEATURES_FILE_CONTENT_INVALID.format(
-                        commit=commit.commit.message.strip()
-                    )
-                ]
-            )
-    exercise.repo.branches.branch("main").checkout()
+    if contents != expected_content:
+        raise exercise.wrong_answer(
+            [FEATURES_FILE_CONTENT_INVALID.format(commit=commit.message.strip())]
+        )
 
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
-    main_branch = exercise.repo.branches.branch("main")
+    # Fails with the usual message if main is missing
+    exercise.repo.branches.branch("main")
+    commits = CommitIndex.load(exercise.repo.repo)
+    main_commits = commits.history("main")
 
     # Verify that there are no merge commits
-    merge_commits = [c for c in main_branch.commits if len(c.parents) > 1]
-    if merge_commits:
+    if any(len(c.parents) > 1 for c in main_commits):
         raise exercise.wrong_answer([SQUASH_NOT_USED])
 
     # Verify that the commit messages are correct
-    commits = main_branch.commits
-    commit_messages = [ensure_str(c.commit.message) for c in commits][::-1]
+    commit_messages = [ensure_str(c.message) for c in main_commits][::-1]
     for expected, given in zip_longest(EXPECTED_COMMIT_MESSAGES, commit_messages):
         if expected != given:
             raise exercise.wrong_answer(
@@ -151,33 +138,51 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     if branch_exists_messages:
         raise exercise.wrong_answer(branch_exists_messages)
 
-    # Verify that the features.md file is correct
-    # Checkout to specific commit to verify the contents of features.md
-    features_commit = get_commit_from_message(commits, "Add features.md")
+    # Verify that the features.md file is correct at each commit
+    files = RevisionFileReader(exercise.repo.repo)
+    features_commit = commits.by_message("Add features.md", reachable_from="main")
     verify_commit_file_content(
-        exercise, features_commit, "features.md", EXPECTED_LINES_FEATURES_COMMIT
+        exercise, files, features_commit, "features.md", EXPECTED_LINES_FEATURES_COMMIT
     )
 
-    create_books_commit = get_commit_from_message(
-        commits, "Mention feature for creating books"
+    create_books_commit = commits.by_message(
+        "Mention feature for creating books", reachable_from="main"
     )
     verify_commit_file_content(
-        exercise, create_books_commit, "features.md", EXPECTED_LINES_CREATE_BOOK_COMMIT
+        exercise,
+        files,
+        create_books_commit,
+        "features.md",
+        EXPECTED_LINES_CREATE_BOOK_COMMIT,
     )
 
-    fix_heading_commit = get_commit_from_message(commits, "Fix phrasing of heading")
+    fix_heading_commit = commits.by_message(
+        "Fix phrasing of heading", reachable_from="main"
+    )
     verify_commit_file_content(
-        exercise, fix_heading_commit, "features.md", EXPECTED_LINES_FIX_HEADING_COMMIT
+        exercise,
+        files,
+        fix_heading_commit,
+        "features.md",
+        EXPECTED_LINES_FIX_HEADING_COMMIT,
     )
 
-    add_search_commit = get_commit_from_message(commits, "Add the search feature")
+    add_search_commit = commits.by_message(
+        "Add the search feature", reachable_from="main"
+    )
     verify_commit_file_content(
-        exercise, add_search_commit, "features.md", EXPECTED_LINES_SEARCH_COMMIT
+        exercise, files, add_search_commit, "features.md", EXPECTED_LINES_SEARCH_COMMIT
     )
 
-    delete_feature_commit = get_commit_from_message(commits, "Add the delete feature")
+    delete_feature_commit = commits.by_message(
+        "Add the delete feature", reachable_from="main"
+    )
     verify_commit_file_content(
-        exercise, delete_feature_commit, "features.md", EXPECTED_LINES_DELETE_COMMIT
+        exercise,
+        files,
+        delete_feature_commit,
+        "features.md",
+        EXPECTED_LINES_DELETE_COMMIT,
     )
 
     return exercise.to_output(
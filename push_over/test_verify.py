@@ -1,12 +1,95 @@
-from exercise_utils.test import GitAutograderTestLoader
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Tuple
 
-from .verify import verify
+from git_autograder import GitAutograderOutput, GitAutograderStatus
+from git_autograder.helpers.remote_helper import RemoteHelper
+from repo_smith.repo_smith import RepoSmith
+
+from exercise_utils.test import (
+    GitAutograderTest,
+    GitAutograderTestLoader,
+    assert_output,
+)
+
+from .verify import MISSING_COMMIT, MISSING_COMMIT_REMOTE, verify
 
 REPOSITORY_NAME = "push-over"
 
 loader = GitAutograderTestLoader(REPOSITORY_NAME, verify)
 
 
-def test():
-    with loader.start():
-        pass
+@contextmanager
+def base_setup() -> Iterator[Tuple[GitAutograderTest, RepoSmith, RepoSmith]]:
+    with loader.start(include_remote_repo=True) as (test, rs, rs_remote):
+        # The remote is pushed to while main is checked out in it
+        rs_remote.repo.git.config("receive.denyCurrentBranch", "ignore")
+        rs_remote.repo.git.commit(message="Set initial state", allow_empty=True)
+        rs_remote.repo.git.branch("other")
+        rs_remote.repo.git.tag("v1.0")
+
+        rs.git.remote_add("origin", str(rs_remote.repo.git_dir))
+        rs.repo.git.fetch("origin", "main", no_tags=True)
+        rs.git.reset("origin/main", hard=True)
+
+        yield test, rs, rs_remote
+
+
+def run_verify(test: GitAutograderTest, rs: RepoSmith) -> GitAutograderOutput:
+    # The verify is run from the exercise folder, as it is by the app
+    current_dir = os.getcwd()
+    os.chdir(Path(rs.repo.working_dir).parent)
+    try:
+        return test.run()
+    finally:
+        os.chdir(current_dir)
+
+
+def test_base():
+    with base_setup() as (test, rs, _):
+        rs.git.commit(message="Add notes", allow_empty=True)
+        rs.git.push("origin", "main")
+
+        output = run_verify(test, rs)
+        assert_output(output, GitAutograderStatus.SUCCESSFUL)
+
+
+def test_fetches_only_main():
+    with base_setup() as (test, rs, _):
+        rs.git.commit(message="Add notes", allow_empty=True)
+        rs.git.push("origin", "main")
+        rs.repo.git.update_ref("-d", "refs/remotes/origin/main")
+
+        output = run_verify(test, rs)
+        assert_output(output, GitAutograderStatus.SUCCESSFUL)
+        refs = rs.repo.git.for_each_ref(format="%(refname)").splitlines()
+        assert refs == ["refs/heads/main", "refs/remotes/origin/main"]
+
+
+def test_no_commit():
+    with base_setup() as (test, rs, _):
+        output = run_verify(test, rs)
+        assert_output(output, GitAutograderStatus.UNSUCCESSFUL, [MISSING_COMMIT])
+
+
+def test_commit_not_pushed():
+    with base_setup() as (test, rs, _):
+        rs.git.commit(message="Add notes", allow_empty=True)
+
+        output = run_verify(test, rs)
+        assert_output(output, GitAutograderStatus.UNSUCCESSFUL, [MISSING_COMMIT_REMOTE])
+
+
+def test_missing_origin():
+    with base_setup() as (test, rs, _):
+        rs.git.commit(message="Add notes", allow_empty=True)
+        rs.git.push("origin", "main")
+        rs.git.remote_remove("origin")
+
+        output = run_verify(test, rs)
+        assert_output(
+            output,
+            GitAutograderStatus.ERROR,
+            [RemoteHelper.MISSING_REMOTE.format(remote="origin")],
+        )
@@ -6,6 +6,11 @@ from git_autograder import (
     GitAutograderStatus,
 )
 
+from exercise_utils.remotes import fetch_refs
+
+# The only remote ref read by the verify
+REMOTE_REFS = ["main"]
+
 MISSING_REPO = "You should have {repo} in your exercise folder. You might want to re-download the exercise."
 MISSING_COMMIT = "You should have made a separate commit!"
 MISSING_COMMIT_REMOTE = (
@@ -23,8 +28,9 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     if len(main_branch.commits) == 1:
         raise exercise.wrong_answer([MISSING_COMMIT])
 
-    origin_remote = exercise.repo.remotes.remote("origin")
-    origin_remote.remote.fetch()
+    # Fails with the usual message if origin is missing
+    exercise.repo.remotes.remote("origin")
+    fetch_refs(exercise.repo.repo, "origin", REMOTE_REFS, negotiation_tips=["main"])
     remote_branch = exercise.repo.repo.refs["origin/main"]
     remote_commits = list(exercise.repo.repo.iter_commits(remote_branch))
 
@@ -108,3 +108,19 @@ def test_improve_loading_remote_missing():
             GitAutograderStatus.UNSUCCESSFUL,
             [IMPROVE_LOADING_REMOTE_MISSING],
         )
+
+
+def test_local_and_remote_failures_reported():
+    with base_setup() as (test, rs):
+        rs.git.branch("improve-loading")
+
+        output = test.run()
+        assert_output(
+            output,
+            GitAutograderStatus.UNSUCCESSFUL,
+            [
+                IMPROVE_LOADING_LOCAL_STILL_EXISTS,
+                IMPROVE_LOADING_REMOTE_OLD_PRESENT,
+                IMPROVE_LOADING_REMOTE_MISSING,
+            ],
+        )
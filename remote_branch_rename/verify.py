@@ -1,5 +1,4 @@
-import re
-from typing import List
+from typing import Any, Dict, List
 
 from git import Repo
 from git_autograder import (
@@ -8,6 +7,10 @@ from git_autograder import (
     GitAutograderStatus,
 )
 
+from exercise_utils.checks import CheckRunner
+from exercise_utils.reflog_index import ReflogIndex
+from exercise_utils.remotes import RemoteSnapshot
+
 IMPROVE_LOADING_LOCAL_STILL_EXISTS = "Local branch 'improve-loadding' still exists! Remember to rename it to 'improve-loading'"
 IMPROVE_LOADING_LOCAL_MISSING = "Local branch 'improve-loading' is missing, did you correctly rename the branch 'improve-loadding' to 'improve-loading'?"
 NO_RENAME_EVIDENCE_IMPROVE_LOADING = (
@@ -17,44 +20,14 @@ IMPROVE_LOADING_REMOTE_MISSING = "Remote branch 'improve-loading' is missing, di
 IMPROVE_LOADING_REMOTE_OLD_PRESENT = "Remote branch 'improve-loadding' still exists! Remember to rename it to 'improve-loading'"
 
 
-def branch_has_rename_evidence(
-    exercise: GitAutograderExercise, new_branch: str, old_branch: str
-) -> bool:
-    """Performs a DFS on the branch renames starting with login till feature/login.
-
-    This is necessary since the renames could be performed in parts:
-
-    login -> feat/login -> feature/login
-    """
-    branch = exercise.repo.branches.branch_or_none(new_branch)
-    if branch is None:
-        # If new_branch not present at all
-        return False
-
-    rename_regex = re.compile("^renamed refs/heads/(.+) to refs/heads/(.+)$")
-    for entry in branch.reflog[::-1]:
-        match_group = rename_regex.match(entry.message)
-        if match_group is None:
-            continue
-        original = match_group.group(1)
-        new = match_group.group(2)
-        if original == old_branch:
-            old_branch = new
-
-    return old_branch == new_branch
-
-
-def fetch_remotes(repo: Repo) -> None:
-    # Fetch latest remote state
-    for remote in repo.remotes:
-        remote.fetch(prune=True)
-
-
 def get_remotes(repo: Repo) -> List[str]:
-    remote_branches = []
-    for remote in repo.remotes:
-        remote_branches.extend([ref.name for ref in remote.refs])
-    return remote_branches
+    # Lists the latest branches of every remote without fetching them
+    remotes = RemoteSnapshot.load(repo)
+    return [
+        f"{name}/{branch}"
+        for name, refs in remotes.remotes.items()
+        for branch in refs.heads
+    ]
 
 
 def has_remote(remotes: List[str], target: str) -> bool:
@@ -63,28 +36,45 @@ def has_remote(remotes: List[str], target: str) -> bool:
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     repo: Repo = exercise.repo.repo
+    checks = CheckRunner(exercise)
 
     # improve-loadding -> improve-loading
-    local_branches = [h.name for h in repo.heads]
-    if "improve-loadding" in local_branches:
-        raise exercise.wrong_answer([IMPROVE_LOADING_LOCAL_STILL_EXISTS])
-
-    if "improve-loading" not in local_branches:
-        raise exercise.wrong_answer([IMPROVE_LOADING_LOCAL_MISSING])
-
-    if not branch_has_rename_evidence(exercise, "improve-loading", "improve-loadding"):
-        raise exercise.wrong_answer([NO_RENAME_EVIDENCE_IMPROVE_LOADING])
-
-    fetch_remotes(repo)
-
-    # Remote branch checks
-    remote_branches = get_remotes(repo)
-
-    if has_remote(remote_branches, "improve-loadding"):
-        raise exercise.wrong_answer([IMPROVE_LOADING_REMOTE_OLD_PRESENT])
-
-    if not has_remote(remote_branches, "improve-loading"):
-        raise exercise.wrong_answer([IMPROVE_LOADING_REMOTE_MISSING])
+    @checks.check("local_branches")
+    def local_branches(results: Dict[str, Any]) -> List[str]:
+        return [h.name for h in repo.heads]
+
+    @checks.check("old_local_removed", requires=["local_branches"])
+    def old_local_removed(results: Dict[str, Any]) -> None:
+        if "improve-loadding" in results["local_branches"]:
+            raise exercise.wrong_answer([IMPROVE_LOADING_LOCAL_STILL_EXISTS])
+
+    @checks.check("new_local_present", requires=["local_branches"])
+    def new_local_present(results: Dict[str, Any]) -> None:
+        if "improve-loading" not in results["local_branches"]:
+            raise exercise.wrong_answer([IMPROVE_LOADING_LOCAL_MISSING])
+
+    @checks.check("rename_evidence", requires=["new_local_present"])
+    def rename_evidence(results: Dict[str, Any]) -> None:
+        reflogs = ReflogIndex.load(repo, refs=["improve-loading"])
+        if not reflogs.was_renamed("improve-loadding", "improve-loading"):
+            raise exercise.wrong_answer([NO_RENAME_EVIDENCE_IMPROVE_LOADING])
+
+    # Listing the remote branches overlaps with the local checks
+    @checks.check("remote_branches", io_bound=True)
+    def remote_branches(results: Dict[str, Any]) -> List[str]:
+        return get_remotes(repo)
+
+    @checks.check("old_remote_removed", requires=["remote_branches"])
+    def old_remote_removed(results: Dict[str, Any]) -> None:
+        if has_remote(results["remote_branches"], "improve-loadding"):
+            raise exercise.wrong_answer([IMPROVE_LOADING_REMOTE_OLD_PRESENT])
+
+    @checks.check("new_remote_present", requires=["remote_branches"])
+    def new_remote_present(results: Dict[str, Any]) -> None:
+        if not has_remote(results["remote_branches"], "improve-loading"):
+            raise exercise.wrong_answer([IMPROVE_LOADING_REMOTE_MISSING])
+
+    checks.run()
 
     return exercise.to_output(
         [
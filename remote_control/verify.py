@@ -1,5 +1,3 @@
-import os
-import subprocess
 from typing import Optional
 
 from git_autograder import (
@@ -8,42 +6,16 @@ from git_autograder import (
     GitAutograderStatus,
 )
 
+from exercise_utils.github_facts import github_facts
+
 
-# TODO: We should unify how we call gh from within Python
 def get_github_username() -> Optional[str]:
-    try:
-        result = subprocess.run(
-            ["gh", "api", "user", "-q", ".login"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError:
-        return None
+    return github_facts().username
 
 
 def has_public_repo(username: str) -> bool:
-    try:
-        result = subprocess.run(
-            [
-                "gh",
-                "repo",
-                "view",
-                f"{username}/gitmastery-{username}-remote-control",
-                "--json",
-                "visibility",
-                "--jq",
-                ".visibility",
-            ],
-            capture_output=True,
-            text=True,
-            check=True,
-            env=dict(os.environ, **{"GH_PAGER": "cat"}),
-        )
-        return result.stdout.strip() == "PUBLIC"
-    except subprocess.CalledProcessError:
-        return False
+    repo_name = f"gitmastery-{username}-remote-control"
+    return github_facts(repo_name).repo(repo_name).visibility == "PUBLIC"
 
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
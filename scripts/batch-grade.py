@@ -0,0 +1,208 @@
+# Script to grade many downloaded exercises, such as the submissions of a class, at once
+#
+# Submissions are the exercise folders under the given directories, or those listed in a
+# manifest file with one folder per line. Each is verified in a pool of worker processes
+# that import the verify of every exercise once, and one JSON line with the status,
+# comments and timing of each is written as soon as it finishes. A submission that
+# takes longer than the timeout has its worker replaced and is reported as an error.
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+from exercise_utils.grading import (
+    EXERCISE_CONFIG_FILE_NAME,
+    exercise_name_of,
+    grade,
+    output_record,
+)
+from exercise_utils.verify_cache import CACHE_ENABLED_ENV
+
+DEFAULT_TIMEOUT_SECONDS = 120.0
+
+
+@dataclass
+class Worker:
+    process: multiprocessing.Process
+    connection: Connection
+    submission: Optional[Path] = None
+    started_at: float = 0.0
+
+
+def find_submissions(paths: List[Path]) -> List[Path]:
+    """Returns the exercise folders in the given directories and manifests."""
+    submissions: List[Path] = []
+    for path in paths:
+        if path.is_file():
+            with open(path, "r") as manifest:
+                submissions.extend(
+                    (path.parent / line.strip()).absolute()
+                    for line in manifest
+                    if line.strip() and not line.startswith("#")
+                )
+            continue
+        for root, dirs, files in os.walk(path):
+            if EXERCISE_CONFIG_FILE_NAME in files:
+                submissions.append(Path(root).absolute())
+                # The exercise repository is never another submission
+                dirs.clear()
+            else:
+                dirs[:] = sorted(dir for dir in dirs if dir != ".git")
+    return submissions
+
+
+def work(connection: Connection) -> None:
+    # Every submission is verified afresh, rather than from results cached by an
+    # earlier batch or by the student's own runs
+    os.environ[CACHE_ENABLED_ENV] = "0"
+    # Verifiers that print, and the git processes they run, would otherwise write
+    # into the records on stdout, and none of them may wait for input
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    with open(os.devnull, "r") as devnull:
+        os.dup2(devnull.fileno(), 0)
+    while True:
+        submission = connection.recv()
+        if submission is None:
+            return
+        connection.send(output_record(grade(submission)))
+
+
+def start_worker() -> Worker:
+    connection, worker_connection = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=work, args=(worker_connection,))
+    process.start()
+    worker_connection.close()
+    return Worker(process, connection)
+
+
+def stop_worker(worker: Worker) -> None:
+    if worker.process.is_alive():
+        worker.process.terminate()
+    worker.process.join()
+    worker.connection.close()
+
+
+def error_record(submission: Path, comment: str) -> Dict[str, Any]:
+    try:
+        exercise_name: Optional[str] = exercise_name_of(submission)
+    except (OSError, ValueError, KeyError):
+        exercise_name = None
+    return {
+        "exercise": exercise_name,
+        "status": "ERROR",
+        "comments": [comment],
+        "started_at": None,
+        "completed_at": None,
+    }
+
+
+def batch_grade(
+    submissions: List[Path], jobs: int, timeout: float
+) -> Iterator[Dict[str, Any]]:
+    """Grades the submissions and yields their records in the order they finish."""
+    pending = list(reversed(submissions))
+    workers = [start_worker() for _ in range(min(jobs, len(submissions)))]
+    try:
+        while pending or any(worker.submission is not None for worker in workers):
+            for worker in workers:
+                if worker.submission is None and pending:
+                    worker.submission = pending.pop()
+                    worker.started_at = time.perf_counter()
+                    worker.connection.send(str(worker.submission))
+
+            busy = [worker for worker in workers if worker.submission is not None]
+            deadline = min(worker.started_at for worker in busy) + timeout
+            ready = wait(
+                [worker.connection for worker in busy],
+                timeout=max(deadline - time.perf_counter(), 0),
+            )
+            for i, worker in enumerate(workers):
+                if worker.submission is None:
+                    continue
+                seconds = time.perf_counter() - worker.started_at
+                if worker.connection in ready:
+                    try:
+                        record = worker.connection.recv()
+                    except EOFError:
+                        # The worker died, such as from a crash in a native library
+                        record = error_record(worker.submission, "Verification crashed")
+                        stop_worker(worker)
+                        workers[i] = start_worker()
+                elif seconds >= timeout:
+                    # A verify stuck on the network or in a loop cannot be
+                    # interrupted, so its worker is replaced
+                    record = error_record(
+                        worker.submission,
+                        f"Verification timed out after {timeout:g} seconds",
+                    )
+                    stop_worker(worker)
+                    workers[i] = start_worker()
+                else:
+                    continue
+                yield {
+                    "submission": str(worker.submission),
+                    **record,
+                    "seconds": round(seconds, 3),
+                }
+                worker.submission = None
+    finally:
+        for worker in workers:
+            if worker.submission is None and worker.process.is_alive():
+                worker.connection.send(None)
+            stop_worker(worker)
+
+
+def write_records(records: Iterator[Dict[str, Any]], output: TextIO) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for record in records:
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Grades many exercise folders")
+    parser.add_argument(
+        "submissions",
+        nargs="+",
+        type=Path,
+        help="Directories of exercise folders, or manifests listing one per line",
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT_SECONDS,
+        help="Seconds a single submission may take",
+    )
+    parser.add_argument("--output", type=Path, help="JSONL file, stdout if not given")
+    args = parser.parse_args()
+
+    submissions = find_submissions(args.submissions)
+    if not submissions:
+        print("No submissions found", file=sys.stderr)
+        sys.exit(1)
+
+    records = batch_grade(submissions, max(args.jobs, 1), args.timeout)
+    if args.output is None:
+        counts = write_records(records, sys.stdout)
+    else:
+        with open(args.output, "w") as output:
+            counts = write_records(records, output)
+    print(
+        f"Graded {len(submissions)} submission(s): "
+        + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())),
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+# Script to check that verifiers scale within their declared bounds on large repositories
+#
+# The solved states come from the exercises' own tests: every test in test_verify.py is
+# run with a synthetic bulk of commits, branches, files or reflog entries added under
+# the state it builds, or on a branch of its own, and the verifies that still succeed
+# on top of the bulk are measured. Three costs of verify() count: its CPU time, with that
+# of the git processes it runs, the bytes it reads from git, as command output and as
+# objects, and its peak memory. None depend on how busy the machine is, and the bytes
+# read from git do not vary between runs at all. The growth of each over the baseline
+# without bulk is fitted to a power law, and an exercise fails when a fitted exponent
+# exceeds its bound. Growth too small to tell from noise fits an exponent of 0, and each
+# row shows the growth at the largest size so that such rows can be told apart from
+# verifiers never exercised.
+#
+# The check runs in CI on every pull request, as the complexity job.
+#
+# Usage: ./test-complexity.sh [exercise ...] [--dimension commits] [--scale 0.5]
+import argparse
+import contextlib
+import functools
+import importlib
+import inspect
+import io
+import math
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Literal, Optional, Set, Tuple
+from unittest import mock
+
+from git import Git, Repo
+from git_autograder import (
+    GitAutograderException,
+    GitAutograderExercise,
+    GitAutograderOutput,
+    GitAutograderStatus,
+)
+
+from exercise_utils.budgets import ExerciseBudgets
+from exercise_utils.synthetic_repo import SYNTHETIC_BRANCH_PREFIX, add_synthetic_history
+from exercise_utils.test import GitAutograderTest
+
+SIZES: Dict[str, List[int]] = {
+    "commits": [0, 250, 500, 1000, 2000],
+    "branches": [0, 25, 50, 100, 200],
+    "files": [0, 250, 500, 1000, 2000],
+    "reflog": [0, 500, 1000, 2000, 4000],
+}
+
+DIMENSION_ARGUMENTS = {
+    "commits": "commits",
+    "branches": "branches",
+    "files": "files",
+    "reflog": "reflog_entries",
+}
+
+# Exponent of the fitted power law that verifiers must stay under, 1.0 being linear.
+# The slack absorbs timing noise and n log n behaviour.
+DEFAULT_BOUND = 1.3
+
+# Per exercise and dimension overrides, for verifiers whose work is inherently worse
+BOUNDS: Dict[str, Dict[str, float]] = {}
+
+# The bulk goes under the solution on its branch where the solution survives that, and
+# otherwise on a branch of its own, which verifiers that look at every ref still read
+Placement = Literal["under", "aside"]
+PLACEMENTS: List[Placement] = ["under", "aside"]
+
+# Exercises whose tests clone from GitHub cannot be measured offline, those whose tests
+# stand in for GitHub call verify directly rather than through a test repository, and
+# undo_init is solved by deleting the repository
+EXEMPTION_LIST: Set[str] = {
+    "clone_repo",
+    "fetch_and_pull",
+    "fork_repo",
+    "remote_control",
+    "sensors_reset",
+    "sensors_revert",
+    "tags_push",
+    "undo_init",
+}
+
+# Growth below these, or below a fraction of the baseline, is indistinguishable from
+# noise and is treated as constant
+TIME_FLOOR_SECONDS = 0.02
+MEMORY_FLOOR_BYTES = 256 * 1024
+GIT_READ_FLOOR_BYTES = 16 * 1024
+RELATIVE_NOISE = 0.25
+MIN_FIT_POINTS = 3
+
+
+@dataclass
+class Cost:
+    cpu_seconds: float
+    git_read_bytes: int
+    peak_bytes: int
+
+
+@dataclass
+class Measurement:
+    size: int
+    cost: Cost
+
+
+@dataclass
+class ScalingResult:
+    exercise: str
+    dimension: str
+    placement: Placement
+    tests: List[str]
+    time_exponent: float
+    git_read_exponent: float
+    memory_exponent: float
+    # Growth over the baseline at the largest size, which shows whether an exponent
+    # of 0 is a verifier that does not grow or one that was not exercised
+    growth: Cost
+    bound: float
+
+    @property
+    def within_bound(self) -> bool:
+        exponents = [self.time_exponent, self.git_read_exponent, self.memory_exponent]
+        return max(exponents) <= self.bound
+
+
+def fit_exponent(points: List[Tuple[int, float]], floor: float) -> float:
+    """Fits growth over the size 0 baseline to a power law and returns its exponent."""
+    baseline = next(value for size, value in points if size == 0)
+    floor = max(floor, baseline * RELATIVE_NOISE)
+    growth = [(size, value - baseline) for size, value in points if size > 0]
+    if max(value for _, value in growth) < floor:
+        return 0.0
+
+    logs = [
+        (math.log(size), math.log(value)) for size, value in growth if value >= floor
+    ]
+    # A slope through the two largest sizes alone, just over the floor, is mostly noise
+    if len(logs) < MIN_FIT_POINTS:
+        return 0.0
+    mean_x = sum(x for x, _ in logs) / len(logs)
+    mean_y = sum(y for _, y in logs) / len(logs)
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in logs)
+    denominator = sum((x - mean_x) ** 2 for x, _ in logs)
+    return numerator / denominator if denominator else 0.0
+
+
+def cpu_seconds() -> float:
+    """Returns the CPU time of this process and of the child processes it reaped."""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+@contextlib.contextmanager
+def counting_git_reads(counts: List[int]) -> Iterator[None]:
+    """Adds the bytes read from git, through GitPython or git run directly, to counts."""
+    execute = Git.execute
+    get_object_header = Git.get_object_header
+    stream_object_data = Git.stream_object_data
+    run = subprocess.run
+
+    def counted(output: object) -> object:
+        if isinstance(output, (str, bytes)):
+            counts.append(len(output))
+        elif isinstance(output, tuple) and isinstance(output[1], (str, bytes)):
+            counts.append(len(output[1]))
+        return output
+
+    def counting_execute(self: Git, *args, **kwargs):
+        return counted(execute(self, *args, **kwargs))
+
+    def counting_get_object_header(self: Git, ref: str):
+        header = get_object_header(self, ref)
+        counts.append(len(" ".join(map(str, header))) + 1)
+        return header
+
+    def counting_stream_object_data(self: Git, ref: str):
+        data = stream_object_data(self, ref)
+        counts.append(data[2])
+        return data
+
+    def counting_run(args, *other_args, **kwargs):
+        result = run(args, *other_args, **kwargs)
+        if isinstance(args, list) and args[:1] == ["git"]:
+            counted(result.stdout)
+        return result
+
+    with (
+        mock.patch.object(Git, "execute", counting_execute),
+        mock.patch.object(Git, "get_object_header", counting_get_object_header),
+        mock.patch.object(Git, "stream_object_data", counting_stream_object_data),
+        mock.patch.object(subprocess, "run", counting_run),
+    ):
+        yield
+
+
+def measure(
+    verify: Callable[[GitAutograderExercise], GitAutograderOutput],
+    exercise: GitAutograderExercise,
+) -> Tuple[GitAutograderOutput, Cost]:
+    reads: List[int] = []
+    tracemalloc.start()
+    started_at = cpu_seconds()
+    try:
+        with counting_git_reads(reads):
+            output = verify(exercise)
+    finally:
+        # Closing the repository reaps the git processes GitPython keeps running,
+        # so that their CPU time is counted
+        exercise.repo.repo.close()
+        seconds = cpu_seconds() - started_at
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return output, Cost(seconds, sum(reads), peak)
+
+
+def measured(
+    verify: Callable[[GitAutograderExercise], GitAutograderOutput],
+    repeats: int,
+    runs: List[Optional[Cost]],
+) -> Callable[[GitAutograderExercise], GitAutograderOutput]:
+    """Wraps verify to record the cost of every successful run in runs."""
+
+    @functools.wraps(verify)
+    def measured_verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
+        runs.append(None)
+        output, cost = measure(verify, exercise)
+        if output.status != GitAutograderStatus.SUCCESSFUL:
+            return output
+        for _ in range(repeats - 1):
+            try:
+                repeat, repeat_cost = measure(
+                    verify, GitAutograderExercise(exercise_path=exercise.exercise_path)
+                )
+            except GitAutograderException:
+                repeat = None
+            # Verifiers that change the repository, such as by checking out a
+            # branch, may not succeed a second time
+            if repeat is None or repeat.status != GitAutograderStatus.SUCCESSFUL:
+                break
+            cost = Cost(
+                min(cost.cpu_seconds, repeat_cost.cpu_seconds),
+                min(cost.git_read_bytes, repeat_cost.git_read_bytes),
+                max(cost.peak_bytes, repeat_cost.peak_bytes),
+            )
+        runs[-1] = cost
+        return output
+
+    return measured_verify
+
+
+def git(args: List[str], cwd: Path) -> None:
+    subprocess.run(["git", *args], cwd=cwd, capture_output=True, check=True)
+
+
+def add_bulk(repo: Repo, dimension: str, size: int, placement: Placement) -> None:
+    """Adds the bulk under the current branch, or on a branch of its own."""
+    repo_path = Path(repo.working_dir)
+    arguments = {DIMENSION_ARGUMENTS[dimension]: size}
+    if placement == "under":
+        if not repo.head.is_valid():
+            git(["commit", "--allow-empty", "-m", "Set initial state"], repo_path)
+        add_synthetic_history(repo_path, **arguments)
+        return
+
+    head = repo.active_branch.name
+    had_commits = repo.head.is_valid()
+    git(["switch", "--orphan", SYNTHETIC_BRANCH_PREFIX], repo_path)
+    git(["commit", "--allow-empty", "-m", "Set initial state"], repo_path)
+    add_synthetic_history(repo_path, **arguments)
+    git(["switch", head] if had_commits else ["switch", "--orphan", head], repo_path)
+
+
+@contextlib.contextmanager
+def bulk_tests(
+    dimension: str,
+    size: int,
+    placement: Placement,
+    repeats: int,
+    runs: List[Optional[Cost]],
+) -> Iterator[None]:
+    """Adds the bulk under the state every test builds and measures its verifies."""
+    enter = GitAutograderTest.__enter__
+
+    def bulk_enter(test: GitAutograderTest):
+        entered = enter(test)
+        add_bulk(test.rs.repo, dimension, size, placement)
+        # Budgets are for the usual test repositories, not for the bulk
+        test.budgets = ExerciseBudgets()
+        test.grade_func = measured(test.grade_func, repeats, runs)
+        return entered
+
+    with mock.patch.object(GitAutograderTest, "__enter__", bulk_enter):
+        yield
+
+
+def run_tests(
+    exercise: str,
+    dimension: str,
+    size: int,
+    placement: Placement,
+    repeats: int,
+    names: Optional[Set[str]] = None,
+) -> Dict[str, Cost]:
+    """Runs the tests of the exercise on the bulk and returns the cost of those whose
+    verifies all succeeded."""
+    module = importlib.import_module(f"{exercise}.test_verify")
+    tests = {
+        name: test
+        for name, test in inspect.getmembers(module, inspect.isfunction)
+        if name.startswith("test_") and test.__module__ == module.__name__
+    }
+
+    costs: Dict[str, Cost] = {}
+    current_dir = os.getcwd()
+    for name, test in tests.items():
+        if names is not None and name not in names:
+            continue
+        runs: List[Optional[Cost]] = []
+        try:
+            with (
+                bulk_tests(dimension, size, placement, repeats, runs),
+                contextlib.redirect_stdout(io.StringIO()),
+            ):
+                test()
+        except Exception:
+            # The bulk may well turn a solution into a wrong answer
+            pass
+        finally:
+            os.chdir(current_dir)
+
+        solved = [run for run in runs if run is not None]
+        if solved and len(solved) == len(runs):
+            costs[name] = Cost(
+                sum(run.cpu_seconds for run in solved),
+                sum(run.git_read_bytes for run in solved),
+                max(run.peak_bytes for run in solved),
+            )
+    return costs
+
+
+def check_exercise(
+    exercise: str, dimension: str, placement: Placement, scale: float, repeats: int
+) -> Optional[ScalingResult]:
+    sizes = [int(size * scale) for size in SIZES[dimension]]
+    costs: List[Dict[str, Cost]] = []
+    names: Set[str] = set()
+    for size in sizes:
+        costs.append(
+            run_tests(exercise, dimension, size, placement, repeats, names or None)
+        )
+        names = set(costs[-1])
+        if not names:
+            return None
+
+    # Only the tests that stayed solved at every size are compared
+    points = [
+        Measurement(
+            size,
+            Cost(
+                sum(size_costs[name].cpu_seconds for name in names),
+                sum(size_costs[name].git_read_bytes for name in names),
+                max(size_costs[name].peak_bytes for name in names),
+            ),
+        )
+        for size, size_costs in zip(sizes, costs)
+    ]
+    baseline, largest = points[0].cost, points[-1].cost
+    return ScalingResult(
+        exercise=exercise,
+        dimension=dimension,
+        placement=placement,
+        tests=sorted(names),
+        time_exponent=fit_exponent(
+            [(m.size, m.cost.cpu_seconds) for m in points], TIME_FLOOR_SECONDS
+        ),
+        git_read_exponent=fit_exponent(
+            [(m.size, m.cost.git_read_bytes) for m in points], GIT_READ_FLOOR_BYTES
+        ),
+        memory_exponent=fit_exponent(
+            [(m.size, m.cost.peak_bytes) for m in points], MEMORY_FLOOR_BYTES
+        ),
+        growth=Cost(
+            largest.cpu_seconds - baseline.cpu_seconds,
+            largest.git_read_bytes - baseline.git_read_bytes,
+            largest.peak_bytes - baseline.peak_bytes,
+        ),
+        bound=BOUNDS.get(exercise, {}).get(dimension, DEFAULT_BOUND),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Checks how verifiers scale")
+    parser.add_argument("exercises", nargs="*", help="Exercise folders, all if empty")
+    parser.add_argument("--dimension", choices=sorted(SIZES), action="append")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplies sizes")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    exercises = [e.replace("-", "_") for e in args.exercises] or sorted(
+        dir
+        for dir in os.listdir(".")
+        if os.path.isfile(Path(dir) / "test_verify.py") and dir not in EXEMPTION_LIST
+    )
+    dimensions = args.dimension or sorted(SIZES)
+
+    results: List[ScalingResult] = []
+    unsolved: List[str] = []
+    for exercise in exercises:
+        for dimension in dimensions:
+            result = None
+            for placement in PLACEMENTS:
+                result = check_exercise(
+                    exercise, dimension, placement, args.scale, args.repeats
+                )
+                if result is not None:
+                    break
+            if result is None:
+                unsolved.append(f"{exercise} {dimension}")
+                print(f"skip {exercise:<24} {dimension:<9} no test stays solved")
+                continue
+            results.append(result)
+            print(
+                f"{'ok  ' if result.within_bound else 'FAIL'} "
+                f"{exercise:<24} {dimension:<9} "
+                f"time^{result.time_exponent:.2f} "
+                f"({result.growth.cpu_seconds:+.3f}s) "
+                f"git^{result.git_read_exponent:.2f} "
+                f"({result.growth.git_read_bytes / 2**10:+.0f}KiB) "
+                f"memory^{result.memory_exponent:.2f} "
+                f"({result.growth.peak_bytes / 2**20:+.1f}MiB) (bound {result.bound}) "
+                f"over {len(result.tests)} test(s), bulk {result.placement}"
+            )
+
+    print(f"{len(results)} measured, {len(unsolved)} without a solved test")
+    failures = [result for result in results if not result.within_bound]
+    if failures:
+        print(f"{len(failures)} verifier(s) scale worse than their declared bound")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
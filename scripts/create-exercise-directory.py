@@ -1,30 +1,18 @@
 import json
-import os
 from collections import defaultdict
 
-OUTPUT_FILE = "exercise-directory.md"
-
+from exercise_utils.registry import ExerciseRegistry
 
-def find_config_files(base_dir="."):
-    config_files = []
-    for entry in os.listdir(base_dir):
-        full_path = os.path.join(base_dir, entry)
-        if os.path.isdir(full_path):
-            config_path = os.path.join(full_path, ".gitmastery-exercise.json")
-            if os.path.isfile(config_path):
-                config_files.append(config_path)
-    return config_files
+OUTPUT_FILE = "exercise-directory.md"
 
 
-def parse_configs(config_files):
+def parse_configs(registry):
     configs = []
-    for path in config_files:
-        try:
-            with open(path, "r") as f:
-                data = json.load(f)
-            configs.append(data)
-        except Exception as e:
-            print(f"Error reading {path}: {e}")
+    for exercise in registry.exercises.values():
+        if exercise.config is None:
+            print(f"Error reading {exercise.folder}: {exercise.error}")
+            continue
+        configs.append(exercise.config)
     return configs
 
 
@@ -54,8 +42,7 @@ def generate_markdown(tag_map):
 
 
 def main():
-    config_files = find_config_files()
-    configs = parse_configs(config_files)
+    configs = parse_configs(ExerciseRegistry.load())
     tag_map = generate_tag_map(configs)
     markdown = generate_markdown(tag_map)
 
@@ -0,0 +1,166 @@
+# Script to run a long-lived grading daemon, and to send it exercises to verify
+#
+# "serve" imports every exercise's verify up front and then grades exercise folders sent
+# over a Unix socket, one at a time, with the same grading path as scripts/batch-grade.py.
+# The repository of each exercise is kept open between requests, so GitPython's git
+# cat-file helper processes stay warm for students who verify again and again. Requests
+# and responses are JSON lines:
+#
+#   {"exercise_path": "/home/alice/gitmastery/branch-bender"}
+#   {"exercise_path": "...", "status": "UNSUCCESSFUL", "comments": [...],
+#    "latency_seconds": 0.031, ...}
+#
+# "verify" sends one exercise folder to a running daemon and prints the response.
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from git import Repo
+
+from exercise_utils.grading import grade, load_verify, output_record
+from exercise_utils.registry import ExerciseRegistry
+
+DEFAULT_SOCKET_NAME = f"gitmastery-grader-{os.getuid()}.sock"
+MAX_OPEN_REPOS = 32
+
+
+def default_socket_path() -> Path:
+    return Path(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()) / (
+        DEFAULT_SOCKET_NAME
+    )
+
+
+class WarmRepos:
+    """Reuses the Repo opened for a repository until its .git folder is replaced."""
+
+    def __init__(self, max_open: int = MAX_OPEN_REPOS) -> None:
+        self.max_open = max_open
+        self.__repos: OrderedDict[str, Tuple[Tuple[int, int], Repo]] = OrderedDict()
+
+    def open(self, path: str | os.PathLike) -> Repo:
+        key = os.path.realpath(path)
+        try:
+            stat = os.stat(Path(key) / ".git")
+        except OSError:
+            # Let Repo raise the error the one-shot path would
+            return Repo(path)
+        identity = (stat.st_dev, stat.st_ino)
+
+        cached = self.__repos.pop(key, None)
+        if cached is not None and cached[0] == identity:
+            repo = cached[1]
+        else:
+            if cached is not None:
+                # Re-created with git init, so the helpers read a stale database
+                cached[1].close()
+            repo = Repo(path)
+        self.__repos[key] = (identity, repo)
+        while len(self.__repos) > self.max_open:
+            _, (_, evicted) = self.__repos.popitem(last=False)
+            evicted.close()
+        return repo
+
+    def close(self) -> None:
+        for _, repo in self.__repos.values():
+            repo.close()
+        self.__repos.clear()
+
+
+class GradingServer(socketserver.UnixStreamServer):
+    # Requests are graded one at a time, as grading changes the working directory
+    def __init__(self, socket_path: Path) -> None:
+        self.warm_repos = WarmRepos()
+        super().__init__(str(socket_path), GradingHandler)
+
+
+class GradingHandler(socketserver.StreamRequestHandler):
+    server: GradingServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            received_at = time.perf_counter()
+            try:
+                exercise_path = json.loads(line)["exercise_path"]
+            except (ValueError, KeyError, TypeError):
+                response: Dict[str, Any] = {"error": "Expected an exercise_path"}
+            else:
+                response = {"exercise_path": exercise_path, **self.grade(exercise_path)}
+            response["latency_seconds"] = round(time.perf_counter() - received_at, 4)
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+    def grade(self, exercise_path: str) -> Dict[str, Any]:
+        return output_record(
+            grade(exercise_path, open_repo=self.server.warm_repos.open)
+        )
+
+
+def preload_verifiers() -> int:
+    count = 0
+    for exercise in ExerciseRegistry.load().exercises.values():
+        if (exercise.path / "verify.py").is_file():
+            load_verify(exercise.folder)
+            count += 1
+    return count
+
+
+def serve(socket_path: Path) -> None:
+    started_at = time.perf_counter()
+    count = preload_verifiers()
+    if socket_path.exists():
+        socket_path.unlink()
+    # Stopping the daemon with kill also removes its socket
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with GradingServer(socket_path) as server:
+        print(
+            f"Loaded {count} verifiers in {time.perf_counter() - started_at:.2f}s, "
+            f"listening on {socket_path}",
+            file=sys.stderr,
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.warm_repos.close()
+            socket_path.unlink(missing_ok=True)
+
+
+def verify(socket_path: Path, exercise_path: Path) -> None:
+    started_at = time.perf_counter()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        request = {"exercise_path": str(exercise_path.absolute())}
+        client.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with client.makefile("r", encoding="utf-8") as responses:
+            response = json.loads(responses.readline())
+    response["round_trip_seconds"] = round(time.perf_counter() - started_at, 4)
+    print(json.dumps(response))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Grades exercises from a daemon")
+    parser.add_argument("--socket", type=Path, default=default_socket_path())
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("serve", help="Starts the daemon")
+    verify_parser = subparsers.add_parser("verify", help="Grades an exercise folder")
+    verify_parser.add_argument("exercise_path", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.socket)
+    else:
+        verify(args.socket, args.exercise_path)
+
+
+if __name__ == "__main__":
+    main()
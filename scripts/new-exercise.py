@@ -18,12 +18,20 @@ class ExerciseConfig:
         fork_all_branches: Optional[bool]
         init: Optional[bool]
 
+    @dataclass
+    class ExerciseBudgets:
+        max_download_seconds: Optional[float]
+        max_verify_seconds: Optional[float]
+        max_subprocesses: Optional[int]
+        max_peak_memory_mb: Optional[float]
+
     exercise_name: str
     tags: List[str]
     requires_git: bool
     requires_github: bool
     base_files: Dict[str, str]
     exercise_repo: ExerciseRepoConfig
+    budgets: Optional[ExerciseBudgets] = None
 
     def to_json(self) -> str:
         return json.dumps(self, default=lambda o: o.__dict__, sort_keys=False, indent=2)
@@ -80,6 +88,15 @@ def get_exercise_config() -> ExerciseConfig:
         create_fork = confirm("Create fork of repository?", True)
         if create_fork:
             fork_all_branches = confirm("Copy all branches?", False)
+    budgets: Optional[ExerciseConfig.ExerciseBudgets] = None
+    if confirm("Declare performance budgets?", False):
+        budgets = ExerciseConfig.ExerciseBudgets(
+            max_download_seconds=float(prompt("Maximum download seconds", "10")),
+            max_verify_seconds=float(prompt("Maximum verify seconds", "5")),
+            max_subprocesses=int(prompt("Maximum subprocesses", "50")),
+            max_peak_memory_mb=float(prompt("Maximum peak memory (MB)", "100")),
+        )
+
     return ExerciseConfig(
         exercise_name=exercise_name,
         tags=tags,
@@ -94,6 +111,7 @@ def get_exercise_config() -> ExerciseConfig:
             fork_all_branches=fork_all_branches,
             init=init,
         ),
+        budgets=budgets,
     )
 
 
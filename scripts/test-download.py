@@ -1,10 +1,29 @@
-import json
+import argparse
+import fnmatch
+import glob
+import multiprocessing
 import os
 import shutil
 import subprocess
 import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from exercise_utils.budgets import ExerciseBudgets, budget_violations, measure_usage
+from exercise_utils.determinism import commit_env
+from exercise_utils.profiling import profile
+from exercise_utils.registry import ExerciseRegistry
+
+REGISTRY = ExerciseRegistry.load()
+
+DEFAULT_DOWNLOAD_ROOT = Path("test-downloads")
+
+# Left out of --all and globs, such as hands-ons that are meant to fail
+EXEMPTION_LIST: Set[str] = {"hp_test"}
 
 
 def get_username() -> str:
@@ -61,7 +80,12 @@ def add_all() -> None:
 
 
 def commit(message: str) -> None:
-    subprocess.run(["git", "commit", "-m", message], capture_output=True, text=True)
+    subprocess.run(
+        ["git", "commit", "-m", message],
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, **commit_env()),
+    )
 
 
 def empty_commit(message: str) -> None:
@@ -69,6 +93,7 @@ def empty_commit(message: str) -> None:
         ["git", "commit", "-m", message, "--allow-empty"],
         capture_output=True,
         text=True,
+        env=dict(os.environ, **commit_env()),
     )
 
 
@@ -80,38 +105,43 @@ def delete_repo(repository_name: str) -> None:
     )
 
 
-def download_exercise(exercise_folder_name: str) -> None:
-    os.makedirs("test-downloads", exist_ok=True)
-    test_folder_name = os.path.join("test-downloads", exercise_folder_name)
-    shutil.rmtree(test_folder_name, ignore_errors=True)
-    os.makedirs(test_folder_name, exist_ok=True)
+@contextmanager
+def working_directory(path: str | Path) -> Iterator[None]:
+    current_dir = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(current_dir)
+
+
+def download_exercise(
+    exercise_folder_name: str, root: Path = DEFAULT_DOWNLOAD_ROOT
+) -> None:
+    exercise = REGISTRY.exercise(exercise_folder_name)
+    assert exercise is not None and exercise.config is not None
+    config = exercise.config
+
+    # Paths are absolute, as the setup runs from inside the exercise repository
+    test_folder = root.absolute() / exercise_folder_name
+    shutil.rmtree(test_folder, ignore_errors=True)
+    os.makedirs(test_folder, exist_ok=True)
 
     starting_files = [".gitmastery-exercise.json", "README.md"]
     for file in starting_files:
-        shutil.copyfile(
-            os.path.join(exercise_folder_name, file),
-            os.path.join(test_folder_name, file),
-        )
-
-    config = {}
-    with open(
-        os.path.join(exercise_folder_name, ".gitmastery-exercise.json"), "r"
-    ) as exercise_config_file:
-        config = json.load(exercise_config_file)
+        shutil.copyfile(exercise.path / file, test_folder / file)
 
     base_files = config["base_files"]
     for resource, path in base_files.items():
-        os.makedirs(Path(path).parent, exist_ok=True)
-        shutil.copyfile(
-            os.path.join(exercise_folder_name, "res", resource),
-            os.path.join(test_folder_name, path),
-        )
+        os.makedirs((test_folder / path).parent, exist_ok=True)
+        shutil.copyfile(exercise.path / "res" / resource, test_folder / path)
 
     repo_name = config["exercise_repo"]["repo_name"]
     repo_title = config["exercise_repo"]["repo_title"]
     repo_type = config["exercise_repo"]["repo_type"]
+    repo_folder = test_folder / repo_name
     if repo_type == "local":
-        os.makedirs(os.path.join(test_folder_name, repo_name), exist_ok=True)
+        os.makedirs(repo_folder, exist_ok=True)
     elif repo_type == "remote":
         username = get_username()
         exercise_repo = f"git-mastery/{repo_title}"
@@ -120,83 +150,202 @@ def download_exercise(exercise_folder_name: str) -> None:
             if has_fork(fork_name):
                 delete_repo(fork_name)
             fork(exercise_repo, fork_name)
-            cur_dir = os.getcwd()
-            os.chdir(os.path.join(test_folder_name))
-            clone_with_custom_name(f"{username}/{fork_name}", repo_name)
-            os.chdir(cur_dir)
+            with working_directory(test_folder):
+                clone_with_custom_name(f"{username}/{fork_name}", repo_name)
         else:
-            cur_dir = os.getcwd()
-            os.chdir(os.path.join(test_folder_name))
-            clone_with_custom_name(exercise_repo, repo_name)
-            os.chdir(cur_dir)
+            with working_directory(test_folder):
+                clone_with_custom_name(exercise_repo, repo_name)
 
     if repo_type != "ignore":
-        namespace: Dict[str, Any] = {}
-        with open(
-            os.path.join(exercise_folder_name, "download.py"), "r"
-        ) as download_script_file:
-            contents = download_script_file.read()
-            exec(contents, namespace)
+        namespace: Dict[str, Any] = vars(exercise.download_module())
 
         download_resources = namespace.get("__resources__", {})
         if download_resources:
             for resource, path in download_resources.items():
-                os.makedirs(Path(path).parent, exist_ok=True)
-                shutil.copyfile(
-                    os.path.join(exercise_folder_name, "res", resource),
-                    os.path.join(test_folder_name, repo_name, path),
-                )
+                os.makedirs((repo_folder / path).parent, exist_ok=True)
+                shutil.copyfile(exercise.path / "res" / resource, repo_folder / path)
+
+        with working_directory(repo_folder):
+            if config["exercise_repo"]["init"]:
+                init()
+                initial_commit_message = "Set initial state"
+                if download_resources:
+                    add_all()
+                    commit(initial_commit_message)
+                else:
+                    empty_commit(initial_commit_message)
+
+            if "setup" in namespace:
+                budgets = ExerciseBudgets.from_config(config)
+                with measure_usage() as usage, profile("download", test_folder):
+                    namespace["setup"]()
+                violations = budget_violations(budgets, usage, "download")
+                if violations:
+                    for violation in violations:
+                        print(f"- {exercise_folder_name}: {violation}")
+                    sys.exit(1)
+
+
+def download_hands_on(
+    hands_on_folder_name: str, root: Path = DEFAULT_DOWNLOAD_ROOT
+) -> None:
+    hands_on = REGISTRY.hands_on(hands_on_folder_name)
+    assert hands_on is not None
+
+    test_folder = root.absolute() / hands_on.folder
+    shutil.rmtree(test_folder, ignore_errors=True)
+    os.makedirs(test_folder, exist_ok=True)
+
+    namespace: Dict[str, Any] = vars(hands_on.module())
+    if "download" in namespace:
+        with working_directory(test_folder):
+            namespace["download"](False)
 
-        os.chdir(os.path.join(test_folder_name, repo_name))
-        if config["exercise_repo"]["init"]:
-            init()
-            initial_commit_message = "Set initial state"
-            if download_resources:
-                add_all()
-                commit(initial_commit_message)
-            else:
-                empty_commit(initial_commit_message)
-
-        if "setup" in namespace:
-            namespace["setup"]()
-
-
-def download_hands_on(hands_on_folder_name: str) -> None:
-    os.makedirs("test-downloads", exist_ok=True)
-    hands_on_folder = f"hp-{hands_on_folder_name.replace('_', '-')}"
-    test_folder_name = os.path.join("test-downloads", hands_on_folder)
-    shutil.rmtree(test_folder_name, ignore_errors=True)
-    os.makedirs(test_folder_name, exist_ok=True)
-
-    namespace: Dict[str, Any] = {}
-    with open(
-        os.path.join("hands_on", f"{hands_on_folder_name}.py"), "r"
-    ) as download_script_file:
-        contents = download_script_file.read()
-        exec(contents, namespace)
 
-    if "download" in namespace:
-        os.chdir(test_folder_name)
-        namespace["download"](False)
+def download(name: str, root: Path = DEFAULT_DOWNLOAD_ROOT) -> None:
+    """Downloads an exercise, or a hands-on when the name starts with hp_."""
+    # Downloads live inside this repository, so a setup whose clone failed would
+    # otherwise run its git commands against the exercises repository itself
+    os.environ["GIT_CEILING_DIRECTORIES"] = str(root.absolute())
+    if name.startswith("hp_"):
+        download_hands_on(name[3:], root)
+    else:
+        download_exercise(name, root)
+
+
+@dataclass
+class DownloadResult:
+    name: str
+    seconds: float
+    error: Optional[str] = None
+
+
+def timed_download(name: str, root: Path) -> DownloadResult:
+    started_at = time.perf_counter()
+    error: Optional[str] = None
+    try:
+        download(name, root)
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            error = f"exited with {e.code}"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return DownloadResult(name, time.perf_counter() - started_at, error)
+
+
+def match_names(patterns: List[str]) -> List[str]:
+    names = [*REGISTRY.exercises, *(f"hp_{name}" for name in REGISTRY.hands_ons)]
+    return [
+        name
+        for name in names
+        if name not in EXEMPTION_LIST
+        and any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+    ]
+
+
+def requires_github(name: str) -> bool:
+    if name.startswith("hp_"):
+        hands_on = REGISTRY.hands_on(name[3:])
+        return hands_on is not None and hands_on.requires_github
+    exercise = REGISTRY.exercise(name)
+    return (
+        exercise is not None
+        and exercise.config is not None
+        and bool(exercise.config.get("requires_github", False))
+    )
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
+def download_all(names: List[str], root: Path, jobs: int) -> List[DownloadResult]:
+    # Downloads that need GitHub share forks, such as the samplerepo-preferences
+    # fork deleted and recreated by every tags hands-on, so they run one at a time
+    # alongside the local downloads
+    github_names = [name for name in names if requires_github(name)]
+    local_names = [name for name in names if name not in github_names]
+    lanes = [
+        (local_names, max(jobs - 1, 1) if github_names else jobs),
+        (github_names, 1),
+    ]
+
+    # Every download gets a fresh process, so no working directory, imported
+    # download module or budget patch carries over to the next one
+    with ExitStack() as stack:
+        futures: Dict[Future[DownloadResult], str] = {}
+        for lane_names, workers in lanes:
+            if not lane_names:
+                continue
+            executor = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=1,
+                )
+            )
+            for name in lane_names:
+                futures[executor.submit(timed_download, name, root)] = name
+
+        results: List[DownloadResult] = []
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # The worker itself died
+                results.append(DownloadResult(futures[future], 0.0, str(e)))
+    return sorted(results, key=lambda result: result.name)
+
+
+def print_summary(results: List[DownloadResult]) -> None:
+    width = max(len(result.name) for result in results)
+    print(f"{'':<4} {'download':<{width}} {'seconds':>8}  error")
+    for result in results:
         print(
-            "Missing exercise/hands-on folder name: ./test-download.py <exercise/hands-on folder name>"
+            f"{'ok' if result.error is None else 'FAIL':<4} "
+            f"{result.name:<{width}} {result.seconds:>8.2f}  {result.error or ''}"
         )
-        sys.exit(1)
+    failures = sum(result.error is not None for result in results)
+    print(f"{len(results) - failures} downloaded, {failures} failed")
 
-    arg = sys.argv[1]
-    arg = arg.replace("-", "_")
 
-    if arg.startswith("hp_"):
-        if not os.path.isfile(os.path.join("hands_on", f"{arg[3:]}.py")):
-            print("Invalid hands-on folder name")
-            sys.exit(1)
-        download_hands_on(arg[3:])
-    else:
-        if not os.path.isdir(arg):
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Downloads exercises for testing")
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help="Exercise or hands-on (hp-) folder names, or globs such as 'branch_*'",
+    )
+    parser.add_argument(
+        "--all", action="store_true", help="Downloads every exercise and hands-on"
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--root", type=Path, default=DEFAULT_DOWNLOAD_ROOT)
+    args = parser.parse_args()
+
+    names = [name.replace("-", "_") for name in args.names]
+    if not args.all and len(names) == 1 and not glob.has_magic(names[0]):
+        # A single download runs in this process, as it always has
+        name = names[0]
+        if name.startswith("hp_"):
+            if REGISTRY.hands_on(name[3:]) is None:
+                print("Invalid hands-on folder name")
+                sys.exit(1)
+        elif REGISTRY.exercise(name) is None:
             print("Invalid exercise folder name")
             sys.exit(1)
-        download_exercise(arg)
+        download(name, args.root)
+        return
+
+    matched = match_names(["*"] if args.all else names)
+    if not matched:
+        print(
+            "Missing exercise/hands-on folder name: ./test-download.py "
+            "<exercise/hands-on folder name or glob> | --all"
+        )
+        sys.exit(1)
+
+    results = download_all(matched, args.root, max(args.jobs, 1))
+    print_summary(results)
+    if any(result.error is not None for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,40 @@
 # Script to verify that all exercise configurations are compliant with the expected format
+import argparse
 import json
 import os
 import pathlib
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Set
+from typing import Any, Dict, List, Optional, Set
+
+from exercise_utils.registry import ExerciseRegistry
+from exercise_utils.user_cache import user_cache_dir
 
 # List of exercises to exempt, maybe because these have not been updated or are deprecated exercises
 EXEMPTION_LIST: Set[str] = set()
 
+# Remote exercise repositories are looked for under this prefix, which can be pointed
+# at a folder of local mirrors to validate offline
+REMOTE_PREFIX_ENV = "GITMASTERY_REMOTE_PREFIX"
+DEFAULT_REMOTE_PREFIX = "https://github.com/git-mastery/"
+PROBE_TIMEOUT_SECONDS = 30.0
+PROBE_CACHE_TTL_SECONDS = 300
+PROBE_CACHE_PATH = user_cache_dir("validate") / "ls-remote.json"
+
+# Optional performance budgets, see exercise_utils/budgets.py
+BUDGET_KEYS: Set[str] = {
+    "max_download_seconds",
+    "max_verify_seconds",
+    "max_subprocesses",
+    "max_peak_memory_mb",
+}
+
+# Optional verify result caching, see exercise_utils/verify_cache.py
+VERIFY_CACHE_KEYS: Set[str] = {"enabled", "ttl_seconds"}
+
 
 @dataclass
 class ValidationIssue:
@@ -17,69 +42,190 @@ class ValidationIssue:
     issue: str
 
 
+def probe_remote(url: str, timeout: float) -> Optional[bool]:
+    """Returns whether the repository exists, or None if it did not answer in time."""
+    try:
+        return (
+            subprocess.run(
+                ["git", "ls-remote", "--quiet", url],
+                capture_output=True,
+                timeout=timeout,
+                # A missing repository must not turn into a credentials prompt
+                env=dict(os.environ, GIT_TERMINAL_PROMPT="0"),
+            ).returncode
+            == 0
+        )
+    except subprocess.TimeoutExpired:
+        return None
+
+
+def probe_remotes(
+    urls: List[str], timeout: float, cache_path: Optional[pathlib.Path]
+) -> Dict[str, Optional[bool]]:
+    """Probes each repository once, in parallel, reusing recent results."""
+    cache: Dict[str, Dict[str, Any]] = {}
+    if cache_path is not None:
+        try:
+            cache = json.loads(cache_path.read_text())
+        except (OSError, ValueError):
+            cache = {}
+    now = time.time()
+    results: Dict[str, Optional[bool]] = {
+        url: cache[url]["exists"]
+        for url in urls
+        if url in cache and now - cache[url]["checked_at"] < PROBE_CACHE_TTL_SECONDS
+    }
+
+    pending = [url for url in urls if url not in results]
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(len(pending), 8)) as executor:
+            for url, exists in zip(
+                pending, executor.map(lambda url: probe_remote(url, timeout), pending)
+            ):
+                results[url] = exists
+                # Only found repositories are remembered, so that a repository
+                # that was missing, or a network that was down, is asked again
+                if exists:
+                    cache[url] = {"exists": exists, "checked_at": now}
+
+    if cache_path is not None and pending:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps(cache))
+        except OSError:
+            pass
+    return results
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Validates exercise configurations")
+    parser.add_argument(
+        "--remote-prefix",
+        default=os.environ.get(REMOTE_PREFIX_ENV, DEFAULT_REMOTE_PREFIX),
+        help="Prefix of remote exercise repositories, such as a folder of mirrors",
+    )
+    parser.add_argument("--timeout", type=float, default=PROBE_TIMEOUT_SECONDS)
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Probes every repository again"
+    )
+    args = parser.parse_args()
+    remote_prefix: str = args.remote_prefix
+
     issues: List[ValidationIssue] = []
-    for dir in os.listdir("."):
-        if dir in EXEMPTION_LIST or not os.path.isfile(
-            pathlib.Path(dir) / ".gitmastery-exercise.json"
-        ):
+    remote_exercises: Dict[str, List[str]] = {}
+    for exercise in ExerciseRegistry.load().exercises.values():
+        dir = exercise.folder
+        if dir in EXEMPTION_LIST:
             continue
-        config = {}
-        with open(pathlib.Path(dir) / ".gitmastery-exercise.json", "r") as config_file:
-            config = json.loads(config_file.read())
+        if exercise.config is None:
+            issues.append(
+                ValidationIssue(
+                    dir, f"Unreadable .gitmastery-exercise.json: {exercise.error}"
+                )
+            )
+            continue
+        config = exercise.config
 
-            if config["exercise_name"].strip() == "":
-                issues.append(
-                    ValidationIssue(dir, "Empty exercise_name is not permitted")
+        if config["exercise_name"].strip() == "":
+            issues.append(ValidationIssue(dir, "Empty exercise_name is not permitted"))
+
+        if config.get("exercise_repo", {}).get(
+            "repo_type", "local"
+        ) == "remote" and not config.get("requires_github", False):
+            issues.append(
+                ValidationIssue(
+                    dir,
+                    "Cannot use 'remote' repo_type if require_github is disabled",
+                )
+            )
+
+        if (
+            config.get("exercise_repo", {}).get("repo_type", "local") == "local"
+            and not config.get("requires_git", False)
+            and config.get("exercise_repo", {}).get("init", False)
+        ):
+            issues.append(
+                ValidationIssue(
+                    dir,
+                    "Cannot use 'local' repo_type with init: true if require_git is disabled",
                 )
+            )
+
+        if config.get("exercise_repo", {}).get("repo_type", "local") == "remote":
+            url = remote_prefix + str(config["exercise_repo"]["repo_title"])
+            remote_exercises.setdefault(url, []).append(dir)
 
-            if config.get("exercise_repo", {}).get(
-                "repo_type", "local"
-            ) == "remote" and not config.get("requires_github", False):
+        # Seeds downloads for exercise_utils/determinism.py
+        seed = config.get("seed")
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+            issues.append(ValidationIssue(dir, "seed must be an integer"))
+
+        budgets = config.get("budgets")
+        if budgets is not None and not isinstance(budgets, dict):
+            issues.append(ValidationIssue(dir, "budgets must be an object"))
+        for key, value in (budgets if isinstance(budgets, dict) else {}).items():
+            if key not in BUDGET_KEYS:
+                issues.append(ValidationIssue(dir, f"Unknown budget {key}"))
+            elif value is not None and (
+                isinstance(value, bool)
+                or not isinstance(value, (int, float))
+                or value <= 0
+            ):
                 issues.append(
-                    ValidationIssue(
-                        dir,
-                        "Cannot use 'remote' repo_type if require_github is disabled",
-                    )
+                    ValidationIssue(dir, f"Budget {key} must be a positive number")
                 )
 
-            if (
-                config.get("exercise_repo", {}).get("repo_type", "local") == "local"
-                and not config.get("requires_git", False)
-                and config.get("exercise_repo", {}).get("init", False)
+        verify_cache = config.get("verify_cache")
+        if verify_cache is not None and not isinstance(verify_cache, dict):
+            issues.append(ValidationIssue(dir, "verify_cache must be an object"))
+        if isinstance(verify_cache, dict):
+            for key in verify_cache.keys() - VERIFY_CACHE_KEYS:
+                issues.append(
+                    ValidationIssue(dir, f"Unknown verify_cache option {key}")
+                )
+            if not isinstance(verify_cache.get("enabled", True), bool):
+                issues.append(
+                    ValidationIssue(dir, "verify_cache.enabled must be a boolean")
+                )
+            ttl_seconds = verify_cache.get("ttl_seconds")
+            if ttl_seconds is not None and (
+                isinstance(ttl_seconds, bool)
+                or not isinstance(ttl_seconds, (int, float))
+                or ttl_seconds <= 0
             ):
                 issues.append(
                     ValidationIssue(
-                        dir,
-                        "Cannot use 'local' repo_type with init: true if require_git is disabled",
+                        dir, "verify_cache.ttl_seconds must be a positive number"
                     )
                 )
 
-            if (
-                config.get("exercise_repo", {}).get("repo_type", "local") == "remote"
-                and subprocess.call(
-                    [
-                        "git",
-                        "ls-remote",
-                        f"https://github.com/git-mastery/{config['exercise_repo']['repo_title']}",
-                        "--quiet",
-                    ]
+        for file in config["base_files"].keys():
+            if not os.path.isfile(pathlib.Path(dir) / "res" / file):
+                issues.append(ValidationIssue(dir, f"Missing file {file} from res/"))
+
+    # Several exercises share a repository, which is probed only once
+    probes = probe_remotes(
+        list(remote_exercises),
+        args.timeout,
+        None if args.no_cache else PROBE_CACHE_PATH,
+    )
+    for url, dirs in remote_exercises.items():
+        for dir in dirs:
+            if probes[url] is None:
+                issues.append(
+                    ValidationIssue(
+                        dir, f"Timed out checking the Github repository {url}"
+                    )
                 )
-                != 0
-            ):
+            elif not probes[url]:
                 issues.append(
                     ValidationIssue(
                         dir, "Missing Github repository to fetch for remote exercise"
                     )
                 )
 
-            for file in config["base_files"].keys():
-                if not os.path.isfile(pathlib.Path(dir) / "res" / file):
-                    issues.append(
-                        ValidationIssue(dir, f"Missing file {file} from res/")
-                    )
-
     if len(issues) > 0:
+        issues.sort(key=lambda issue: issue.dir_name)
         for issue in issues:
             print(f"- {issue.dir_name}: {issue.issue}")
         sys.exit(1)
@@ -6,6 +6,8 @@ from git_autograder import (
     GitAutograderStatus,
 )
 
+from exercise_utils.status import RepoStatus
+
 CONTAINS_TASK_ONE_COMMITS = "It seems like the last two commits for Jan 14 and Jan 15 are still present in the commit history."
 CONTAINS_TASK_TWO_COMMIT = (
     "It seems like the commit from Jan 13 is still present in the commit history."
@@ -22,24 +24,13 @@ WRONG_FILES_IN_WORKING_DIRECTORY = (
 WRONG_HEAD_COMMIT = "The head commit should be the commit from Jan 11."
 
 
-def get_staged_files(exercise: GitAutograderExercise) -> List[str | None]:
-    """Get files that are staged (differ between index and HEAD)."""
-    repo = exercise.repo.repo
-    return [diff_item.a_path for diff_item in repo.head.commit.diff()]
-
-
-def get_unstaged_files(exercise: GitAutograderExercise) -> List[str | None]:
-    """Get files that have unstaged changes (differ between working tree and index)."""
-    repo = exercise.repo.repo
-    return [d.a_path for d in repo.index.diff(None)]
-
-
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     branch = exercise.repo.branches.branch("main")
     commit_messages = [str(c.commit.message.strip()) for c in branch.commits]
 
-    staged_files = get_staged_files(exercise)
-    unstaged_files = get_unstaged_files(exercise)
+    status = RepoStatus.load(exercise.repo.repo)
+    staged_files = status.staged
+    unstaged_files = status.unstaged
 
     # Task 1: Commits should be removed, changes should not be in staging or working directory
     if any(
@@ -199,3 +199,31 @@ def test_add_not_fixed():
 
         output = test.run()
         assert_output(output, GitAutograderStatus.UNSUCCESSFUL, [CALCULATOR_NOT_FIXED])
+
+
+def test_add_raises():
+    with loader.start() as (test, rs):
+        rs.git.commit(message="Empty", allow_empty=True)
+        rs.helper(GitMasteryHelper).create_start_tag()
+        rs.git.checkout("bug-fix", branch=True)
+        rs.files.create_or_update(
+            "greet.py",
+            """
+            def greet(name):
+                print(f"Hi {name}")
+            """,
+        )
+        rs.files.create_or_update(
+            "calculator.py",
+            """
+            def add(a, b):
+                return a + c
+            """,
+        )
+        rs.git.commit(message="Empty", allow_empty=True)
+        rs.git.add(["greet.py", "calculator.py"])
+        rs.git.commit(message="Add")
+        rs.git.checkout("main")
+
+        output = test.run()
+        assert_output(output, GitAutograderStatus.UNSUCCESSFUL, [CALCULATOR_NOT_FIXED])
@@ -1,9 +1,6 @@
-import io
 import os
-import sys
-from contextlib import redirect_stdout
 from pathlib import Path
-from typing import Any, Dict, Optional, cast
+from typing import cast
 
 from git_autograder import (
     GitAutograderExercise,
@@ -14,6 +11,8 @@ from git_autograder import (
     GitAutograderWrongAnswerException,
 )
 
+from exercise_utils.sandbox import run_function_cases
+
 MISSING_BUG_FIX_BRANCH = "You are missing the bug-fix branch"
 MISSING_COMMITS = "You do not have 2 commits on the bug-fix branch"
 UNCOMMITTED_CHANGES = "You still have uncommitted changes. Commit them first on the appropriate branch first!"
@@ -26,19 +25,6 @@ CALCULATOR_NOT_FIXED = "You have not fixed the add function in calculator.py"
 SUCCESS_MESSAGE = "Great work with using git branch and git checkout to fix the bugs!"
 
 
-def execute_function(
-    filepath: str | Path, func_name: str, args: Dict[str, Any]
-) -> Optional[Any]:
-    with open(filepath, "r") as f:
-        sys.dont_write_bytecode = True
-        code = f.read()
-        namespace: Dict = {}
-        exec(code, namespace)
-        result = namespace[func_name](**args)
-        sys.dont_write_bytecode = False
-        return result
-
-
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     try:
         active_branch_name = exercise.repo.repo.active_branch.name
@@ -57,27 +43,25 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
 
         repo_path: str | os.PathLike = cast(GitAutograderRepo, exercise.repo).repo_path
         # Ensure that they applied the right fix by testing the greet function
-        fixed_greet = True
-        for name in ["James", "Hi", "Alice", "Bob"]:
-            buf = io.StringIO()
-            with redirect_stdout(buf):
-                execute_function(Path(repo_path) / "greet.py", "greet", {"name": name})
-            print(buf.getvalue().strip())
-            if buf.getvalue().strip() != f"Hi {name}":
-                fixed_greet = False
-                break
+        names = ["James", "Hi", "Alice", "Bob"]
+        greet_results = run_function_cases(
+            Path(repo_path) / "greet.py", "greet", [{"name": name} for name in names]
+        )
+        fixed_greet = all(
+            result.ok and result.stdout.strip() == f"Hi {name}"
+            for name, result in zip(names, greet_results)
+        )
 
-        fixed_calculator = True
-        for a, b in zip([1, 2, 3, 4, 5], [11, 123, 9, 10, 1]):
-            result = execute_function(
-                Path(repo_path) / "calculator.py", "add", {"a": a, "b": b}
-            )
-            if result is None:
-                fixed_calculator = False
-                break
-            if result != a + b:
-                fixed_calculator = False
-                break
+        pairs = list(zip([1, 2, 3, 4, 5], [11, 123, 9, 10, 1]))
+        add_results = run_function_cases(
+            Path(repo_path) / "calculator.py",
+            "add",
+            [{"a": a, "b": b} for a, b in pairs],
+        )
+        fixed_calculator = all(
+            result.ok and result.value == a + b
+            for (a, b), result in zip(pairs, add_results)
+        )
 
         comments = []
         if not fixed_greet:
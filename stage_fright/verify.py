@@ -4,17 +4,15 @@ from git_autograder import (
     GitAutograderStatus,
 )
 
+from exercise_utils.status import RepoStatus
+
 EXPECTED_FILES = {"alice.txt", "bob.txt", "jim.txt", "joe.txt", "carrey.txt"}
 
 NOT_ADDED = "Did not add {file}"
 
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
-    staged_diff = exercise.repo.repo.index.diff("HEAD")
-
-    added_files = set()
-    for diff_item in staged_diff:
-        added_files.add(diff_item.a_path)
+    added_files = set(RepoStatus.load(exercise.repo.repo).staged)
 
     if len(added_files & EXPECTED_FILES) != len(EXPECTED_FILES):
         missing_files = EXPECTED_FILES.difference(added_files)
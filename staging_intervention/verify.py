@@ -4,6 +4,8 @@ from git_autograder import (
     GitAutograderStatus,
 )
 
+from exercise_utils.status import RepoStatus
+
 EXPECTED_UNTRACKED = {
     "josh.txt",
     "adam.txt",
@@ -18,7 +20,7 @@ MISSING_FILES_UNSTAGED = (
 
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
-    untracked_files = set(exercise.repo.repo.untracked_files)
+    untracked_files = set(RepoStatus.load(exercise.repo.repo).untracked)
     comments = []
 
     extra_files_unstaged = untracked_files.difference(EXPECTED_UNTRACKED)
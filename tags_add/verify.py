@@ -1,11 +1,11 @@
-from typing import List, Optional
 from git_autograder import (
-    GitAutograderCommit,
     GitAutograderExercise,
     GitAutograderOutput,
     GitAutograderStatus,
 )
 
+from exercise_utils.commit_index import CommitIndex
+
 FIRST_TAG_NOT_LIGHTWEIGHT = (
     '"first-pilot" should be a lightweight tag, not an annotated tag.'
 )
@@ -21,17 +21,9 @@ MISSING_FIRST_COMMIT = "Missing commit that adds January duty roster."
 MISSING_MARCH_COMMIT = "Missing commit that updates March duty roster."
 
 
-def get_commit_from_message(
-    commits: List[GitAutograderCommit], message: str
-) -> Optional[GitAutograderCommit]:
-    """Find a commit with the given message from a list of commits."""
-    for commit in commits:
-        if message.strip() == commit.commit.message.strip():
-            return commit
-    return None
-
-
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
+    commits = CommitIndex.load(exercise.repo.repo)
+
     # Task 1: Verify lightweight tag "first-pilot" on the first commit
     tags = exercise.repo.repo.tags
     if "first-pilot" not in tags:
@@ -42,8 +34,9 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     if first_pilot_tag.tag is not None:
         raise exercise.wrong_answer([FIRST_TAG_NOT_LIGHTWEIGHT])
 
-    main_branch = exercise.repo.branches.branch("main")
-    main_branch_commits = main_branch.commits
+    # Fails with the usual message if main is missing
+    exercise.repo.branches.branch("main")
+    main_branch_commits = commits.history("main")
     if len(main_branch_commits) == 0:
         raise exercise.wrong_answer([MISSING_FIRST_COMMIT])
 
@@ -61,9 +54,7 @@ def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
     if v1_tag.tag is None:
         raise exercise.wrong_answer([SECOND_TAG_NOT_ANNOTATED])
 
-    march_commit = get_commit_from_message(
-        main_branch_commits, "Update roster for March"
-    )
+    march_commit = commits.by_message("Update roster for March", reachable_from="main")
     if march_commit is None:
         raise exercise.wrong_answer([MISSING_MARCH_COMMIT])
 
@@ -1,5 +1,3 @@
-import os
-import subprocess
 from typing import List, Optional
 
 from git_autograder import (
@@ -8,6 +6,9 @@ from git_autograder import (
     GitAutograderStatus,
 )
 
+from exercise_utils.github_facts import github_facts
+from exercise_utils.remotes import RemoteSnapshot
+
 IMPROPER_GH_CLI_SETUP = "Your Github CLI is not setup correctly"
 
 TAG_1_NAME = "v1.0"
@@ -19,29 +20,12 @@ TAG_2_MISSING = f"Tag {TAG_2_NAME} is missing, did you push it to the remote?"
 TAG_DELETE_NOT_REMOVED = f"Tag {TAG_DELETE_NAME} is still on the remote!"
 
 
-def run_command(command: List[str]) -> Optional[str]:
-    try:
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            check=True,
-            env=dict(os.environ, **{"GH_PAGER": "cat"}),
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError:
-        return None
-
-
 def get_username() -> Optional[str]:
-    return run_command(["gh", "api", "user", "-q", ".login"])
+    return github_facts().username
 
 
 def get_remote_tags(username: str, exercise: GitAutograderExercise) -> List[str]:
-    raw_tags = exercise.repo.repo.git.ls_remote("--tags")
-    if raw_tags is None:
-        return []
-    return [line.split("/")[2] for line in raw_tags.strip().splitlines()]
+    return list(RemoteSnapshot(exercise.repo.repo).tags("origin"))
 
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
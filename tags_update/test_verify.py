@@ -152,3 +152,21 @@ def test_first_update_tag_not_renamed():
             GitAutograderStatus.UNSUCCESSFUL,
             [OLD_FIRST_UPDATE_TAG, MISSING_JANUARY_TAG],
         )
+
+
+def test_all_failures_reported():
+    with loader.start() as (test, rs):
+        rs.git.commit(message="Add January duty roster", allow_empty=True)
+        rs.git.tag("first-update")
+        rs.git.commit(message="Update duty roster for February", allow_empty=True)
+        rs.git.commit(message="Update roster for March", allow_empty=True)
+        rs.git.commit(message="Update duty roster for April", allow_empty=True)
+        rs.git.commit(message="Update roster for May", allow_empty=True)
+        rs.git.tag("april-update")
+
+        output = test.run()
+        assert_output(
+            output,
+            GitAutograderStatus.UNSUCCESSFUL,
+            [OLD_FIRST_UPDATE_TAG, MISSING_JANUARY_TAG, WRONG_APRIL_TAG_COMMIT],
+        )
@@ -1,12 +1,14 @@
-from typing import List, Optional
+from typing import Any, Dict
 
 from git_autograder import (
     GitAutograderExercise,
     GitAutograderOutput,
     GitAutograderStatus,
-    GitAutograderCommit,
 )
 
+from exercise_utils.checks import CheckRunner
+from exercise_utils.commit_index import CommitIndex
+
 MISSING_JANUARY_TAG = "You are missing the 'january-update' tag."
 WRONG_JANUARY_TAG_COMMIT = "The 'january-update' tag is pointing to the wrong commit. It should point to the January commit."
 MISSING_APRIL_TAG = "You are missing the 'april-update' tag."
@@ -16,54 +18,60 @@ SUCCESS_MESSAGE = "Great work! You have successfully updated the tags to point t
 MISSING_COMMIT_MESSAGE = "Could not find a commit with '{message}' in the message."
 
 
-def get_commit_from_message(
-    commits: List[GitAutograderCommit], message: str
-) -> Optional[GitAutograderCommit]:
-    """Find a commit with the given message from a list of commits."""
-    for commit in commits:
-        if message.strip() == commit.commit.message.strip():
-            return commit
-    return None
+def find_commit(
+    exercise: GitAutograderExercise, commits: CommitIndex, message: str, month: str
+) -> str:
+    commit = commits.by_message(message, reachable_from="main")
+    if commit is None:
+        raise exercise.wrong_answer([MISSING_COMMIT_MESSAGE.format(message=month)])
+    return commit.hexsha
 
 
 def verify(exercise: GitAutograderExercise) -> GitAutograderOutput:
-    comments: List[str] = []
     tags = exercise.repo.repo.tags
-    main_branch_commits = exercise.repo.branches.branch("main").commits
+    # Fails with the usual message if main is missing
+    exercise.repo.branches.branch("main")
+    commits = CommitIndex.load(exercise.repo.repo)
+    checks = CheckRunner(exercise)
 
     # Verify first-update is renamed to january-update
-    if "first-update" in tags:
-        comments.append(OLD_FIRST_UPDATE_TAG)
-
-    if "january-update" not in tags:
-        comments.append(MISSING_JANUARY_TAG)
+    @checks.check("first_tag_removed")
+    def first_tag_removed(results: Dict[str, Any]) -> None:
+        if "first-update" in tags:
+            raise exercise.wrong_answer([OLD_FIRST_UPDATE_TAG])
 
-    if comments:
-        raise exercise.wrong_answer(comments)
+    @checks.check("january_tag")
+    def january_tag(results: Dict[str, Any]) -> str:
+        if "january-update" not in tags:
+            raise exercise.wrong_answer([MISSING_JANUARY_TAG])
+        return tags["january-update"].commit.hexsha
 
-    january_commit = get_commit_from_message(
-        main_branch_commits, "Add January duty roster"
-    )
-    if january_commit is None:
-        raise exercise.wrong_answer([MISSING_COMMIT_MESSAGE.format(message="January")])
+    @checks.check("january_commit")
+    def january_commit(results: Dict[str, Any]) -> str:
+        return find_commit(exercise, commits, "Add January duty roster", "January")
 
-    january_tag_commit = tags["january-update"].commit
-    if january_tag_commit.hexsha != january_commit.hexsha:
-        raise exercise.wrong_answer([WRONG_JANUARY_TAG_COMMIT])
+    @checks.check("january_tag_commit", requires=["january_tag", "january_commit"])
+    def january_tag_commit(results: Dict[str, Any]) -> None:
+        if results["january_tag"] != results["january_commit"]:
+            raise exercise.wrong_answer([WRONG_JANUARY_TAG_COMMIT])
 
     # Verify april-update is moved to correct commit
-    if "april-update" not in tags:
-        raise exercise.wrong_answer([MISSING_APRIL_TAG])
+    @checks.check("april_tag")
+    def april_tag(results: Dict[str, Any]) -> str:
+        if "april-update" not in tags:
+            raise exercise.wrong_answer([MISSING_APRIL_TAG])
+        return tags["april-update"].commit.hexsha
 
-    april_commit = get_commit_from_message(
-        main_branch_commits, "Update duty roster for April"
-    )
-    if april_commit is None:
-        raise exercise.wrong_answer([MISSING_COMMIT_MESSAGE.format(message="April")])
+    @checks.check("april_commit")
+    def april_commit(results: Dict[str, Any]) -> str:
+        return find_commit(exercise, commits, "Update duty roster for April", "April")
+
+    @checks.check("april_tag_commit", requires=["april_tag", "april_commit"])
+    def april_tag_commit(results: Dict[str, Any]) -> None:
+        if results["april_tag"] != results["april_commit"]:
+            raise exercise.wrong_answer([WRONG_APRIL_TAG_COMMIT])
 
-    april_tag_commit = tags["april-update"].commit
-    if april_tag_commit.hexsha != april_commit.hexsha:
-        raise exercise.wrong_answer([WRONG_APRIL_TAG_COMMIT])
+    checks.run()
 
     return exercise.to_output(
         [SUCCESS_MESSAGE],